@@ -0,0 +1,92 @@
+"""
+Benchmark the bztransmit line classifier against the three regexes that
+BzTransmit._process_line used to run over every line.
+
+The lines are synthetic, but have the same shape as a real bztransmit log, where
+only a small fraction of the lines are ones that BzTransmit acts on.
+
+    python benchmarks/bench_bz_transmit.py --lines 1000000
+"""
+import re
+import time
+
+import click
+
+from backblaze_status.bz_transmit import classify_line
+
+FILE_NAME = "/Volumes/CameraHDD/SecuritySpy/Front Door/2024-02-02/C_Front Door {}.m4v"
+
+NOISE_LINES = (
+    "2024-02-02 10:11:12 - bztransmit.cpp:1234 - BzTransmit::SendChunk - sent "
+    "10485760 bytes in 2.1 seconds: " + FILE_NAME,
+    "2024-02-02 10:11:12 - bzhttp.cpp:512 - HttpClient::Post - status 200 from "
+    "https://pod-000-1001-02.backblaze.com/bz_upload_file_part",
+    "2024-02-02 10:11:12 - bztransmit.cpp:987 - BzTransmit::Loop - totalBytes=",
+)
+MATCHING_LINES = (
+    "2024-02-02 10:11:12 - Entering PrepareBzLargeFileDirWithLargeFile: " + FILE_NAME,
+    "2024-02-02 10:11:12 - chunk 0000a for this largefile was deduped: " + FILE_NAME,
+    "2024-02-02 10:11:12 - Leaving MakeBzDoneFileToDataCenter",
+)
+
+
+def build_lines(line_count: int) -> list[str]:
+    # One line in a hundred is one that BzTransmit acts on
+    lines = []
+    for number in range(line_count):
+        if number % 100 == 0:
+            line = MATCHING_LINES[(number // 100) % len(MATCHING_LINES)]
+        else:
+            line = NOISE_LINES[number % len(NOISE_LINES)]
+        lines.append(line.format(number) + "\n")
+    return lines
+
+
+def classify_with_regexes(lines: list[str]) -> int:
+    # The checks that BzTransmit._process_line used to make for every line
+    prepare_match_re = re.compile(".*Entering PrepareBzLargeFileDirWithLargeFile.*")
+    dedup_search_re = re.compile("chunk ([^ ]*) for this largefile")
+    new_to_do_file_re = re.compile("Leaving MakeBzDoneFileToDataCenter")
+
+    count = 0
+    for line in lines:
+        line = line.strip()
+        if prepare_match_re.match(line) is not None:
+            count += 1
+        if dedup_search_re.search(line) is not None:
+            count += 1
+        if new_to_do_file_re.search(line) is not None:
+            count += 1
+    return count
+
+
+def classify_with_markers(lines: list[str]) -> int:
+    count = 0
+    for line in lines:
+        if classify_line(line) is not None:
+            count += 1
+    return count
+
+
+@click.command()
+@click.option("--lines", default=1_000_000, help="Number of synthetic log lines")
+def main(lines: int) -> None:
+    log_lines = build_lines(lines)
+    print(f"{lines:,} lines")
+
+    start = time.perf_counter()
+    regex_count = classify_with_regexes(log_lines)
+    regexes = time.perf_counter() - start
+    print(f"regexes: {regexes:8.3f}s  {lines / regexes:12,.0f} lines/s")
+
+    start = time.perf_counter()
+    marker_count = classify_with_markers(log_lines)
+    markers = time.perf_counter() - start
+    print(f"markers: {markers:8.3f}s  {lines / markers:12,.0f} lines/s")
+    print(f"speedup: {regexes / markers:8.1f}x")
+
+    assert regex_count == marker_count
+
+
+if __name__ == "__main__":
+    main()
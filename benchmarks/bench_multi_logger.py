@@ -0,0 +1,61 @@
+"""
+Benchmark MultiLogger.log for the DEBUG lines that the parsers log for every log
+line, against the way it used to work out the caller with inspect.stack() and
+format the Qt string before looking at the level.
+
+    python benchmarks/bench_multi_logger.py --calls 100000
+"""
+import inspect
+import logging
+import tempfile
+import time
+from datetime import datetime
+
+import click
+
+from backblaze_status.utils import MultiLogger
+
+
+def log_before(multi_log: MultiLogger, message: str, level: int) -> None:
+    # What MultiLogger.log did for every call
+    module = inspect.stack()[1].function
+    timestamp = datetime.now().strftime("%-I:%M:%S %p")
+    html_log_string = (
+        f'<span style="color:yellow">{timestamp}</span> '
+        f'<span style="color:magenta"> ({module})</span> '
+        f'<span style="color:white"> {str(message)} </span> '
+    )
+    multi_log.logger.log(level, f"<{module}> {message}")
+
+
+def time_calls(calls: int, log, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        log(*args)
+    return (time.perf_counter() - start) / calls
+
+
+@click.command()
+@click.option("--calls", default=100_000, help="Number of calls to time")
+def main(calls: int) -> None:
+    with tempfile.TemporaryDirectory() as logfile_dir:
+        multi_log = MultiLogger("BenchMultiLogger", logfile_dir=logfile_dir)
+        message = "2024-02-02 10:11:12 - a line from the log"
+
+        # inspect.stack() is slow enough that fewer calls give a steady figure
+        before_calls = max(calls // 100, 1)
+        before = time_calls(
+            before_calls, log_before, multi_log, message, logging.DEBUG
+        )
+        print(f"before, DEBUG disabled: {before * 1e6:10.2f} us/call")
+
+        after = time_calls(calls, multi_log.log, message, logging.DEBUG)
+        print(f"after,  DEBUG disabled: {after * 1e6:10.2f} us/call")
+        print(f"speedup:                {before / after:10.1f}x")
+
+        enabled = time_calls(calls, multi_log.log, message, logging.INFO)
+        print(f"after,  INFO enabled:   {enabled * 1e6:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
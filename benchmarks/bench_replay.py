@@ -0,0 +1,93 @@
+"""
+Replay synthetic lastfilestransmitted and bztransmit logs through the parsers, and
+report their throughput.
+
+The logs are built from the file names in tests/bz_todo_20240202_0.dat, so that
+the files they mention are on the to_do list, with the same mix of single files,
+chunks of large files and batches that a real backup produces.
+
+    python benchmarks/bench_replay.py --files 20000
+"""
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import click
+
+from backblaze_status.replay import run_replay
+
+FIXTURE = Path(__file__).parent.parent / "tests" / "bz_todo_20240202_0.dat"
+
+THROTTLE = " -  large  - throttle auto     11 - "
+
+
+def build_logs(directory: Path, file_count: int) -> tuple[Path, Path]:
+    names = [
+        line.split("\t")[5]
+        for line in FIXTURE.read_text().splitlines()[:file_count]
+    ]
+
+    last_files = directory / "lastfilestransmitted.log"
+    transmit = directory / "bztransmit.log"
+    moment = datetime(2024, 2, 2, 10, 0, 0)
+    with last_files.open("w") as last_fd, transmit.open("w") as transmit_fd:
+        for number, name in enumerate(names):
+            moment += timedelta(seconds=1)
+            local = moment.strftime("%Y-%m-%d %H:%M:%S")
+            utc = moment.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+            # Plenty of bztransmit lines that are ignored
+            for noise in range(20):
+                transmit_fd.write(
+                    f"{utc} - bzhttp.cpp:512 - HttpClient::Post - status 200 {noise}\n"
+                )
+
+            match number % 10:
+                case 0:
+                    # A large file, sent in chunks, some of them deduplicated
+                    transmit_fd.write(
+                        f"{utc} - Entering PrepareBzLargeFileDirWithLargeFile: "
+                        f"{name}\n"
+                    )
+                    for chunk in range(5):
+                        if chunk % 2:
+                            transmit_fd.write(
+                                f"{utc} - chunk {chunk:05x} for this largefile was "
+                                f"deduped: {name}\n"
+                            )
+                        last_fd.write(
+                            f"{local}{THROTTLE}32091 kBits/sec - 10485760 bytes - "
+                            f"Chunk {chunk:05x} of {name}\n"
+                        )
+                case 1:
+                    # A batch of small files
+                    last_fd.write(
+                        f"{local}{THROTTLE}30985 kBits/sec -  6859241 bytes - "
+                        f"Multiple small files batched in one request, the 1 files "
+                        f"are listed below:\n"
+                    )
+                    last_fd.write(f"{local} -  - {name}\n")
+                case _:
+                    last_fd.write(
+                        f"{local}{THROTTLE}19780 kBits/sec -    81720 bytes - {name}\n"
+                    )
+    return last_files, transmit
+
+
+@click.command()
+@click.option("--files", default=20_000, help="Files mentioned in the synthetic logs")
+@click.option("--speed", default=0.0, help="Times real time, or 0 for full speed")
+def main(files: int, speed: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        last_files, transmit = build_logs(Path(directory), files)
+        result = run_replay(FIXTURE, last_files, transmit, speed=speed)
+
+    elapsed = max(result.elapsed, 1e-9)
+    print(f"{result.total_lines:,} lines in {result.elapsed:.3f}s")
+    print(f"{result.total_lines / elapsed:12,.0f} lines/s")
+    print(f"{result.total_events / elapsed:12,.0f} events/s")
+    print(f"peak memory {result.peak_memory / 1024 / 1024:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the bulk to_do file parser, in one process and split across a process
+pool, against the original line by line parse.
+
+The tests/bz_todo_20240202_0.dat fixture is scaled up synthetically, by repeating
+its lines with a copy number added to each filename so that every line is unique.
+
+    python benchmarks/bench_to_do_parser.py --lines 3000000
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from backblaze_status.to_do_parser import parse_to_do_file
+
+FIXTURE = Path(__file__).parent.parent / "tests" / "bz_todo_20240202_0.dat"
+
+
+def build_to_do_file(destination: Path, line_count: int) -> None:
+    fixture_lines = FIXTURE.read_bytes().splitlines()
+    with destination.open("wb") as to_do:
+        written = 0
+        copy = 0
+        while written < line_count:
+            for line in fixture_lines:
+                if written == line_count:
+                    break
+                to_do.write(line + f".{copy}\n".encode())
+                written += 1
+            copy += 1
+
+
+def parse_line_by_line(file_name: Path) -> int:
+    # The parse that ToDoFiles._read used to do for every line
+    count = 0
+    with open(file_name, "r") as tdf:
+        for todo_line in tdf:
+            todo_fields = todo_line.strip().split("\t")
+            todo_filename = Path(todo_fields[5])
+            todo_file_size = int(todo_fields[4])
+            count += 1
+    return count
+
+
+@click.command()
+@click.option("--lines", default=1_000_000, help="Lines in the synthetic to_do file")
+def main(lines: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        to_do_file = Path(directory) / "bz_todo_bench.dat"
+        build_to_do_file(to_do_file, lines)
+        size = to_do_file.stat().st_size
+        print(f"{lines:,} lines, {size / 1024 / 1024:,.1f} MB")
+
+        start = time.perf_counter()
+        count = parse_line_by_line(to_do_file)
+        line_by_line = time.perf_counter() - start
+        print(f"line by line: {line_by_line:8.3f}s  {count / line_by_line:12,.0f} lines/s")
+
+        start = time.perf_counter()
+        entries = parse_to_do_file(to_do_file, parallel=False)
+        bulk = time.perf_counter() - start
+        print(f"bulk mmap:    {bulk:8.3f}s  {len(entries) / bulk:12,.0f} lines/s")
+
+        start = time.perf_counter()
+        entries = parse_to_do_file(to_do_file, parallel=True)
+        parallel = time.perf_counter() - start
+        print(f"parallel:     {parallel:8.3f}s  {len(entries) / parallel:12,.0f} lines/s")
+        print(f"speedup:      {line_by_line / bulk:8.1f}x bulk, "
+              f"{line_by_line / parallel:.1f}x parallel")
+
+
+if __name__ == "__main__":
+    main()
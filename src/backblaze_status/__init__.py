@@ -1,11 +1,6 @@
 import sys
 from importlib.metadata import version
 
-import rich.traceback
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
-
-from .qt_backup_status import QTBackupStatus
 from .bz_batch import BzBatch
 from .backup_file import BackupFile
 
@@ -13,10 +8,26 @@ from .backup_file import BackupFile
 __version__ = version("backblaze_status")
 __extra_version__ = "v0.10.1"
 
-rich.traceback.install(show_locals=False)
+
+def __getattr__(name: str):
+    # The GUI is only imported when it is asked for, so that the Qt-free core can
+    # be used without loading Qt
+    if name == "QTBackupStatus":
+        from .qt_backup_status import QTBackupStatus
+
+        return QTBackupStatus
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def run():
+    import rich.traceback
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QIcon
+
+    from .qt_backup_status import QTBackupStatus
+
+    rich.traceback.install(show_locals=False)
+
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("backblaze_status.png"))
     app.setApplicationName("Backblaze Status")
@@ -1,19 +1,28 @@
 from _datetime import datetime
 from dataclasses import dataclass, field
+from itertools import count
 from pathlib import Path
-from typing import Optional
-
-from PyQt6.QtGui import QColor
+from typing import TYPE_CHECKING, ClassVar, Optional
 
 from .bz_batch import BzBatch
+from .chunk_states import ChunkState, ChunkStates, ChunkView
 from .configuration import Configuration
-from .dev_debug import DevDebug
 
+if TYPE_CHECKING:
+    from .to_do_stats import RunTotals
+
+
+# The ids given to BackupFiles as they are created
+_backup_file_ids = count()
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class BackupFile:
     """
     Class to store To Do File Information
+
+    Each BackupFile gets its own id when it is created, and is hashed and compared
+    by it, so that it stays the same in a set or dict while its chunks change.
     """
 
     file_name: Path
@@ -29,9 +38,9 @@ class BackupFile:
     _total_bytes_processed: int = 0
     is_large_file: bool = False
     _chunks_total: int = 0
-    _prepared_chunks: set = field(default_factory=set)
-    _deduped_chunks: set = field(default_factory=set)
-    _transmitted_chunks: set = field(default_factory=set)
+    # The state of each chunk. A chunk that is deduped after it was transmitted
+    # counts as deduped, and a transmitted or deduped chunk is still prepared.
+    _chunk_states: ChunkStates = field(default_factory=ChunkStates, repr=False)
     _current_chunk: int = 0
     batch: BzBatch = None
     _rate: str = str()
@@ -40,20 +49,30 @@ class BackupFile:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
 
-    row_color: Optional[QColor] = field(default=None)
-    file_name_color: Optional[QColor] = field(default=None)
-    file_size_color: Optional[QColor] = field(default=None)
-    start_time_color: Optional[QColor] = field(default=None)
-    rate_color: Optional[QColor] = field(default=None)
+    # Color names, which the GUI turns into QColors, so that the to_do list
+    # doesn't depend on Qt. They are the same for every file.
+    row_color: ClassVar[str] = "White"
+    file_name_color: ClassVar[Optional[str]] = None
+    file_size_color: ClassVar[Optional[str]] = None
+    start_time_color: ClassVar[Optional[str]] = None
+    rate_color: ClassVar[Optional[str]] = None
+
+    # The totals of the run the file was completed in, which are told about any
+    # chunks added after that
+    run_totals: Optional["RunTotals"] = field(default=None, repr=False)
+
+    id: int = field(init=False, repr=False)
 
     def __post_init__(self):
-        self.debug = DevDebug()
-        self.debug.disable("lock")
-        if self.row_color is None:
-            self.row_color = QColor("White")
+        self.id = next(_backup_file_ids)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BackupFile):
+            return NotImplemented
+        return self.id == other.id
 
-    def __hash__(self):
-        return hash(repr(self))
+    def __hash__(self) -> int:
+        return self.id
 
     def __rich_repr__(self):
         yield "file_name", self.file_name
@@ -66,9 +85,9 @@ class BackupFile:
         yield "total_chunk_count", self.total_chunk_count
         yield "current_chunk", self.current_chunk
 
-        yield "chunks_prepared", self._prepared_chunks
-        yield "chunks_deduped", self._deduped_chunks
-        yield "chunks_transmitted", self._transmitted_chunks
+        yield "chunks_prepared", len(self.prepared_chunks)
+        yield "chunks_deduped", self.deduped_count
+        yield "chunks_transmitted", len(self.transmitted_chunks)
 
         yield "deduped_bytes", self.deduped_bytes
         yield "transmitted_bytes", self.transmitted_bytes
@@ -77,56 +96,62 @@ class BackupFile:
         yield "rate", self.rate
 
     def add_prepared(self, chunk_number: int):
-        self._prepared_chunks.add(chunk_number)
+        self._chunk_states.set(chunk_number, ChunkState.PREPARED)
         self.current_chunk = chunk_number
 
     def add_deduped(self, chunk_number: int):
-        self._deduped_chunks.add(chunk_number)
+        old_state = self._chunk_states.set(chunk_number, ChunkState.DEDUPED)
+        if self.run_totals is not None and old_state != ChunkState.DEDUPED:
+            self.run_totals.add_chunk(
+                self,
+                deduped=True,
+                was_transmitted=old_state == ChunkState.TRANSMITTED,
+            )
         self.current_chunk = chunk_number
 
     def add_transmitted(self, chunk_number: int):
-        if chunk_number not in self._deduped_chunks:
-            self._transmitted_chunks.add(chunk_number)
+        old_state = self._chunk_states.set(chunk_number, ChunkState.TRANSMITTED)
+        if old_state != ChunkState.DEDUPED:
+            if self.run_totals is not None and old_state != ChunkState.TRANSMITTED:
+                self.run_totals.add_chunk(self, deduped=False)
             self.current_chunk = chunk_number
 
     @property
     def deduped_count(self) -> int:
-        return len(self._deduped_chunks)
+        return self._chunk_states.count(ChunkState.DEDUPED)
 
     @property
     def max_prepared(self) -> int:
-        if len(self._prepared_chunks) > 0:
-            return max(self._prepared_chunks)
-        else:
-            return 0
+        return self._chunk_states.max(ChunkState.PREPARED)
 
     @property
     def max_deduped(self) -> int:
-        if len(self._deduped_chunks) > 0:
-            return max(self._deduped_chunks)
-        else:
-            return 0
+        return self._chunk_states.max(ChunkState.DEDUPED)
 
     @property
     def max_transmitted(self) -> int:
-        if len(self._transmitted_chunks) > 0:
-            return max(self._transmitted_chunks)
-        else:
-            return 0
+        return self._chunk_states.max(ChunkState.TRANSMITTED)
 
     @property
     def total_chunk_size(self) -> int:
         return (
-            len(self._transmitted_chunks) + len(self._deduped_chunks)
+            self._chunk_states.count(ChunkState.TRANSMITTED)
+            + self._chunk_states.count(ChunkState.DEDUPED)
         ) * Configuration.default_chunk_size
 
     @property
     def transmitted_chunk_size(self) -> int:
-        return len(self._transmitted_chunks) * Configuration.default_chunk_size
+        return (
+            self._chunk_states.count(ChunkState.TRANSMITTED)
+            * Configuration.default_chunk_size
+        )
 
     @property
     def total_deduped_size(self) -> int:
-        return len(self._deduped_chunks) * Configuration.default_chunk_size
+        return (
+            self._chunk_states.count(ChunkState.DEDUPED)
+            * Configuration.default_chunk_size
+        )
 
     @property
     def current_chunk(self) -> int:
@@ -161,19 +186,23 @@ class BackupFile:
         self._transmitted_bytes = transmitted_bytes
 
     @property
-    def deduped_chunks(self) -> list:
-        chunks = list(self._deduped_chunks)
-        return chunks
+    def deduped_chunks(self) -> ChunkView:
+        return self._chunk_states.chunks(ChunkState.DEDUPED)
 
     @property
-    def transmitted_chunks(self) -> list:
-        chunks = list(self._transmitted_chunks)
-        return chunks
+    def transmitted_chunks(self) -> ChunkView:
+        return self._chunk_states.chunks(ChunkState.TRANSMITTED)
 
     @property
-    def prepared_chunks(self) -> list:
-        chunks = list(self._prepared_chunks)
-        return chunks
+    def prepared_chunks(self) -> ChunkView:
+        return self._chunk_states.chunks(ChunkState.PREPARED, at_least=True)
+
+    def chunk_raster(self, cells: int) -> bytes:
+        """
+        Return the ChunkState of each of cells cells that the chunks of the file
+        are spread over, one per byte
+        """
+        return self._chunk_states.raster(self.total_chunk_count, cells)
 
     @property
     def total_bytes_processed(self) -> int:
@@ -1,101 +1,579 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
-from typing import List, Optional, Iterator
-
-from PyQt6.QtCore import QReadWriteLock
+from itertools import repeat
+from pathlib import Path
+from typing import Iterator, Optional
 
 from .backup_file import BackupFile
+from .configuration import Configuration
+from .path_table import PathTable
+from .prefix_sums import FenwickTree
+from .rwlock import ReadWriteLock
+
+# Flags stored for each row in the _flags column
+FLAG_LARGE_FILE = 0x01
+FLAG_COMPLETED = 0x02
+FLAG_DEDUPED = 0x04
+FLAG_REMOVED = 0x80
+
+# Translation table that turns a _flags column into a 0/1 large file mask
+_LARGE_FILE_MASK = bytes(flag & FLAG_LARGE_FILE for flag in range(256))
 
 
 @dataclass
 class BackupFileList:
-    _file_list: List[BackupFile] = field(default_factory=list, init=False)
-    _file_dict: dict[str, BackupFile] = field(default_factory=dict, init=False)
+    """
+    An ordered list of BackupFiles that can also be looked up by file name.
+
+    The list is stored in columns, so that millions of to_do files don't each need
+    a BackupFile object. Every file gets a row, and the sizes, chunk counts, flags
+    and completed runs are kept in typed arrays. File names are interned in a
+    PathTable, which can be shared between lists, and each row just holds the id of
+    its path. The _order column holds the row of each list position. A BackupFile
+    is only created for a row when something asks for it, and then it is kept,
+    since it is where the backup progress for that file is recorded.
+
+    The totals over the whole list are kept as rows are added, changed and
+    removed, so that they don't need a pass over the columns. Totals over part of
+    the list come from Fenwick trees over the rows, which are kept up to date the
+    same way.
+
+    The list position of every row is kept in _positions. Removing a file only
+    marks its row as removed, and the positions are brought up to date, in one
+    pass however many files were removed, the next time something needs them.
+    """
+
+    paths: PathTable = field(default_factory=PathTable)
+    _path_ids: array = field(default_factory=lambda: array("q"), init=False)
+    _sizes: array = field(default_factory=lambda: array("q"), init=False)
+    _chunk_counts: array = field(default_factory=lambda: array("q"), init=False)
+    _flags: bytearray = field(default_factory=bytearray, init=False)
+    _runs: array = field(default_factory=lambda: array("l"), init=False)
+    _order: array = field(default_factory=lambda: array("q"), init=False)
+    # The row of each path id, or -1 if the path isn't on this list
+    _rows: array = field(default_factory=lambda: array("i"), init=False)
+    _views: dict[int, BackupFile] = field(default_factory=dict, init=False)
+    # The row of each BackupFile in _views, by its id, so that a BackupFile can be
+    # found without looking up its name
+    _view_rows: dict[int, int] = field(default_factory=dict, init=False)
+    # The list position of each row, or -1 if the row has been removed
+    _positions: array = field(default_factory=lambda: array("q"), init=False)
+    # How many removed rows are still in _order, and the first of them
+    _tombstones: int = field(default=0, init=False)
+    _first_tombstone: int = field(default=0, init=False)
     _current_index: int = field(default=0, init=False)
-    _lock: QReadWriteLock = field(default_factory=QReadWriteLock, init=False)
+    _size_sum: int = field(default=0, init=False)
+    _large_size_sum: int = field(default=0, init=False)
+    _chunk_sum: int = field(default=0, init=False)
+    _large_count: int = field(default=0, init=False)
+    # Prefix sums by row of the sizes, chunk counts, and the sizes and count of
+    # the large files
+    _size_index: FenwickTree = field(default_factory=FenwickTree, init=False)
+    _chunk_index: FenwickTree = field(default_factory=FenwickTree, init=False)
+    _large_size_index: FenwickTree = field(default_factory=FenwickTree, init=False)
+    _large_index: FenwickTree = field(default_factory=FenwickTree, init=False)
+    _lock: ReadWriteLock = field(default_factory=ReadWriteLock, init=False)
 
     def __repr__(self) -> str:
-        return str([str(file.file_name) for file in self._file_list])
+        self._compact()
+        return str([self._name(row) for row in self._order])
 
     def __len__(self) -> int:
-        return len(self._file_list)
+        return len(self._order) - self._tombstones
 
     def __getitem__(self, index) -> BackupFile | None | list[BackupFile]:
+        self._compact()
         if isinstance(index, int):
-            return self._file_list[index]
+            return self._view(self._order[index])
         elif isinstance(index, str):
-            return self._file_dict.get(index)
+            return self.get(index)
         elif isinstance(index, slice):
-            return self._file_list[index]
+            return [self._view(row) for row in self._order[index]]
         else:
             raise TypeError("Invalid argument type")
 
     def __iter__(self) -> Iterator[BackupFile]:
-        return iter(self._file_list)
+        self._compact()
+        return (self._view(row) for row in self._order)
+
+    def __contains__(self, file_name: str) -> bool:
+        return self._find_row(file_name) is not None
 
     def __next__(self):
-        if self._current_index < len(self._file_list):
-            item = self._file_list[self._current_index]
+        if self._current_index < len(self):
+            item = self[self._current_index]
             self._current_index += 1
             return item
         raise StopIteration
 
     def __add__(self, other):
         if isinstance(other, BackupFileList):
-            return self._file_list + other.file_list
+            return list(self) + list(other)
         elif isinstance(other, list):
-            return self._file_list + other
+            return list(self) + other
         else:
             raise TypeError("Invalid argument type")
 
+    def _view(self, row: int) -> BackupFile:
+        """
+        Return the BackupFile for a row, creating it from the columns the first time
+        """
+        view = self._views.get(row)
+        if view is not None:
+            return view
+
+        # Two threads must never end up with different BackupFiles for the same
+        # row, so check again once I have the lock
+        self._lock.lockForWrite()
+        try:
+            view = self._views.get(row)
+            if view is None:
+                view = BackupFile(
+                    Path(self._name(row)),
+                    self._sizes[row],
+                    list_index=self._position(row),
+                )
+                if self._flags[row] & FLAG_LARGE_FILE:
+                    view.is_large_file = True
+                    view.total_chunk_count = self._chunk_counts[row]
+                self._add_view(row, view)
+        finally:
+            self._lock.unlock()
+        return view
+
+    def _add_view(self, row: int, view: BackupFile) -> None:
+        self._views[row] = view
+        self._view_rows[view.id] = row
+
+    def _name(self, row: int) -> str:
+        return self.paths[self._path_ids[row]]
+
+    def _find_row(self, file_name: str) -> Optional[int]:
+        path_id = self.paths.find(file_name)
+        if path_id is None or path_id >= len(self._rows):
+            return None
+        row = self._rows[path_id]
+        return None if row < 0 else row
+
+    def _position(self, row: int) -> int:
+        # The rows before the first removed one haven't moved
+        if self._tombstones and row >= self._first_tombstone:
+            self._compact()
+        return self._positions[row]
+
+    def _compact(self) -> None:
+        """
+        Take the removed rows out of _order, and update the positions of the rows
+        after them
+        """
+        if not self._tombstones:
+            return
+
+        self._lock.lockForWrite()
+        try:
+            if not self._tombstones:
+                return
+            # The rows in _order are always ascending, since rows are only ever
+            # added to the end, so nothing before the first removed row moves
+            start = bisect_left(self._order, self._first_tombstone)
+            flags = self._flags
+            remaining = [
+                row for row in self._order[start:] if not flags[row] & FLAG_REMOVED
+            ]
+            del self._order[start:]
+            self._order.extend(remaining)
+            positions = self._positions
+            for position, row in enumerate(remaining, start):
+                positions[row] = position
+            self._tombstones = 0
+        finally:
+            self._lock.unlock()
+
+    def _row_range(self, start: int, stop: Optional[int]) -> tuple[int, int]:
+        """
+        Convert a range of list positions into a range of rows. Removed rows have
+        their sizes and chunk counts zeroed, so they can be left in the range.
+        """
+        self._compact()
+        start, stop, _ = slice(start, stop).indices(len(self._order))
+        if start >= stop:
+            return 0, 0
+        if stop < len(self._order):
+            return self._order[start], self._order[stop]
+        return self._order[start], len(self._path_ids)
+
+    def _is_whole_list(self, start: int, stop: Optional[int]) -> bool:
+        return start == 0 and (stop is None or stop >= len(self))
+
+    @staticmethod
+    def _file_flags(file: BackupFile) -> int:
+        flags = 0
+        if file.is_large_file:
+            flags |= FLAG_LARGE_FILE
+        if file.completed:
+            flags |= FLAG_COMPLETED
+        if file.is_deduped:
+            flags |= FLAG_DEDUPED
+        return flags
+
+    def _add_row(self, name: str, size: int, chunk_count: int, flags: int) -> int:
+        row = len(self._path_ids)
+        path_id = self.paths.intern(name)
+        if path_id >= len(self._rows):
+            self._rows.extend(repeat(-1, path_id + 1 - len(self._rows)))
+        self._path_ids.append(path_id)
+        self._rows[path_id] = row
+        self._sizes.append(size)
+        self._chunk_counts.append(chunk_count)
+        self._flags.append(flags)
+        self._runs.append(0)
+        self._positions.append(len(self))
+        self._order.append(row)
+
+        self._size_sum += size
+        self._chunk_sum += chunk_count
+        if flags & FLAG_LARGE_FILE:
+            self._large_size_sum += size
+            self._large_count += 1
+        return row
+
+    def _count_large(self, row: int, sign: int) -> None:
+        """
+        Add (sign 1) or take away (sign -1) a row from the large file totals
+        """
+        if self._flags[row] & FLAG_LARGE_FILE:
+            self._large_size_sum += sign * self._sizes[row]
+            self._large_count += sign
+            self._large_size_index.add(row, sign * self._sizes[row])
+            self._large_index.add(row, sign)
+
+    def _index_rows(self) -> None:
+        """
+        Add the rows added since the last call to the prefix sums
+        """
+        start = len(self._size_index)
+        sizes = self._sizes[start:]
+        large_mask = self._flags[start:].translate(_LARGE_FILE_MASK)
+        self._size_index.extend(sizes)
+        self._chunk_index.extend(self._chunk_counts[start:])
+        self._large_size_index.extend(
+            size if large else 0 for size, large in zip(sizes, large_mask)
+        )
+        self._large_index.extend(large_mask)
+
     def append(self, file: BackupFile) -> None:
         self._lock.lockForWrite()
-        index = len(self._file_list)
-        file.list_index = index
-        self._file_list.append(file)
-        self._file_dict[str(file.file_name)] = file
+        file.list_index = len(self)
+        row = self._add_row(
+            str(file.file_name),
+            file.file_size,
+            file.total_chunk_count,
+            self._file_flags(file),
+        )
+        self._runs[row] = file.completed_run
+        self._add_view(row, file)
+        self._index_rows()
+        self._lock.unlock()
+
+    def extend(self, files: list[BackupFile]) -> None:
+        """
+        Append a batch of files while taking the lock only once
+        """
+        self._lock.lockForWrite()
+        for file in files:
+            file.list_index = len(self)
+            row = self._add_row(
+                str(file.file_name),
+                file.file_size,
+                file.total_chunk_count,
+                self._file_flags(file),
+            )
+            self._runs[row] = file.completed_run
+            self._add_view(row, file)
+        self._index_rows()
+        self._lock.unlock()
+
+    def extend_entries(self, names: list[str], sizes: array) -> None:
+        """
+        Append files straight into the columns, without creating a BackupFile for
+        each of them. Files larger than a chunk are marked as large files.
+        """
+        chunk_size = Configuration.default_chunk_size
+        self._lock.lockForWrite()
+        for name, size in zip(names, sizes):
+            if size > chunk_size:
+                self._add_row(name, size, int(size / chunk_size), FLAG_LARGE_FILE)
+            else:
+                self._add_row(name, size, 0, 0)
+        self._index_rows()
+        self._lock.unlock()
+
+    def refresh(self, file: BackupFile) -> None:
+        """
+        Copy the state of a BackupFile back into the columns
+        """
+        row = self._find_row(str(file.file_name))
+        if row is None:
+            return
+        self._lock.lockForWrite()
+        chunk_delta = file.total_chunk_count - self._chunk_counts[row]
+        self._chunk_sum += chunk_delta
+        self._chunk_index.add(row, chunk_delta)
+        self._chunk_counts[row] = file.total_chunk_count
+        self._count_large(row, -1)
+        self._flags[row] = self._file_flags(file)
+        self._count_large(row, 1)
+        self._runs[row] = file.completed_run
         self._lock.unlock()
 
     def remove(self, item) -> None:
-        if isinstance(item, BackupFile):
-            self._lock.lockForWrite()
-            self._file_list.remove(item)
-            del self._file_dict[str(item.file_name)]
-            self._lock.unlock()
-        elif isinstance(item, int):
-            self._lock.lockForWrite()
-            item_instance: BackupFile = self._file_list[item]
-            del self._file_dict[str(item_instance.file_name)]
-            del self._file_list[item]
+        self._lock.lockForWrite()
+        try:
+            if isinstance(item, BackupFile):
+                # Found by its row, so that removing files one after another
+                # doesn't update the positions in between
+                row = self._row_of(item)
+            elif isinstance(item, int):
+                self._compact()
+                row = self._order[item]
+            else:
+                raise TypeError("Invalid argument type")
+        except BaseException:
             self._lock.unlock()
-        else:
-            raise TypeError("Invalid argument type")
+            raise
+
+        path_id = self._path_ids[row]
+        if self._rows[path_id] == row:
+            self._rows[path_id] = -1
+        view = self._views.pop(row, None)
+        if view is not None:
+            self._view_rows.pop(view.id, None)
+
+        # Leave the row in _order for _compact() to take out
+        self._positions[row] = -1
+        if not self._tombstones or row < self._first_tombstone:
+            self._first_tombstone = row
+        self._tombstones += 1
+
+        # Zero out the row, so that totals over a range of rows can include it
+        self._size_sum -= self._sizes[row]
+        self._chunk_sum -= self._chunk_counts[row]
+        self._size_index.add(row, -self._sizes[row])
+        self._chunk_index.add(row, -self._chunk_counts[row])
+        self._count_large(row, -1)
+        self._sizes[row] = 0
+        self._chunk_counts[row] = 0
+        self._flags[row] = FLAG_REMOVED
+        self._lock.unlock()
 
     def index(self, file: str) -> int:
-        backup_file = self._file_dict.get(file)
-        if backup_file is None:
+        row = self._find_row(file)
+        if row is None:
             raise ValueError(f"'{file}' is not in list")
-        backup_index = self._file_list.index(backup_file)
-        return backup_index
+        return self._position(row)
+
+    def position(self, file: BackupFile) -> int:
+        """
+        Return the list position of a BackupFile
+        """
+        return self._position(self._row_of(file))
+
+    def _row_of(self, file: BackupFile) -> int:
+        """
+        Return the row of a BackupFile. The BackupFiles from this list are found
+        by identity, without looking up their names.
+        """
+        row = self._view_rows.get(file.id)
+        if row is not None and self._views.get(row) is file:
+            return row
+        row = self._find_row(str(file.file_name))
+        if row is None:
+            raise ValueError(f"'{file.file_name}' is not in list")
+        return row
 
     def exists(self, item: str) -> bool:
         self._lock.lockForRead()
-        result = item in self._file_dict.keys()
+        result = self._find_row(item) is not None
         self._lock.unlock()
         return result
 
     def clear(self):
         self._lock.lockForWrite()
-        self._file_list.clear()
-        self._file_dict.clear()
+        del self._path_ids[:]
+        del self._sizes[:]
+        del self._chunk_counts[:]
+        self._flags.clear()
+        del self._runs[:]
+        del self._order[:]
+        del self._rows[:]
+        del self._positions[:]
+        self._tombstones = 0
+        self._views.clear()
+        self._view_rows.clear()
+        self._size_sum = 0
+        self._large_size_sum = 0
+        self._chunk_sum = 0
+        self._large_count = 0
+        self._size_index.clear()
+        self._chunk_index.clear()
+        self._large_size_index.clear()
+        self._large_index.clear()
         self._lock.unlock()
 
+    def move_paths(self, paths: PathTable) -> None:
+        """
+        Intern the names of the rows in paths from now on, in place of the current
+        table, so that a shared table holding names that are no longer on any list
+        can be dropped
+        """
+        self._lock.lockForWrite()
+        try:
+            old_paths = self.paths
+            old_rows = self._rows
+            path_ids = array("q", (paths.intern(old_paths[i]) for i in self._path_ids))
+            rows = array("i", repeat(-1, len(paths)))
+            for row, (old_path_id, path_id) in enumerate(zip(self._path_ids, path_ids)):
+                # Removed rows keep their path id, but aren't found by it
+                if old_rows[old_path_id] == row:
+                    rows[path_id] = row
+            self.paths = paths
+            self._path_ids = path_ids
+            self._rows = rows
+        finally:
+            self._lock.unlock()
+
     def get(self, file_name: str) -> Optional[BackupFile]:
-        return self._file_dict.get(file_name)
+        row = self._find_row(file_name)
+        if row is None:
+            return None
+        return self._view(row)
+
+    def entries(self) -> Iterator[tuple[str, int]]:
+        """
+        Iterate over the (file name, file size) of every file in list order,
+        without creating BackupFiles for them
+        """
+        self._compact()
+        sizes = self._sizes
+        return ((self._name(row), sizes[row]) for row in self._order)
+
+    def size_total(
+        self, start: int = 0, stop: Optional[int] = None, large_file: bool = None
+    ) -> int:
+        """
+        Total size of the files between the list positions start and stop. If
+        large_file is set, only count the large (or only the regular) files.
+        """
+        if self._is_whole_list(start, stop):
+            if large_file is None:
+                return self._size_sum
+            if large_file:
+                return self._large_size_sum
+            return self._size_sum - self._large_size_sum
+
+        row_start, row_stop = self._row_range(start, stop)
+        if large_file is None:
+            return self._size_index.range_sum(row_start, row_stop)
+
+        large_total = self._large_size_index.range_sum(row_start, row_stop)
+        if large_file:
+            return large_total
+        return self._size_index.range_sum(row_start, row_stop) - large_total
+
+    def chunk_total(self, start: int = 0, stop: Optional[int] = None) -> int:
+        """
+        Total number of chunks of the files between the list positions start and
+        stop
+        """
+        if self._is_whole_list(start, stop):
+            return self._chunk_sum
+
+        row_start, row_stop = self._row_range(start, stop)
+        return self._chunk_index.range_sum(row_start, row_stop)
+
+    def file_count(
+        self, start: int = 0, stop: Optional[int] = None, large_file: bool = None
+    ) -> int:
+        """
+        Number of files between the list positions start and stop. If large_file is
+        set, only count the large (or only the regular) files.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        count = max(stop - start, 0)
+        if large_file is None or count == 0:
+            return count
+
+        if self._is_whole_list(start, stop):
+            large_count = self._large_count
+            return large_count if large_file else count - large_count
+
+        row_start, row_stop = self._row_range(start, stop)
+        large_count = self._large_index.range_sum(row_start, row_stop)
+        return large_count if large_file else count - large_count
 
     @property
-    def file_list(self) -> list[BackupFile]:
-        return self._file_list
+    def file_list(self) -> "BackupFileSequence":
+        return BackupFileSequence(self)
 
     @property
-    def file_dict(self) -> dict[str, BackupFile]:
-        return self._file_dict
+    def file_dict(self) -> "BackupFileMapping":
+        return BackupFileMapping(self)
+
+
+class BackupFileSequence(Sequence):
+    """
+    A read only, list-like view of a BackupFileList in list order
+    """
+
+    def __init__(self, backup_file_list: BackupFileList):
+        self._list = backup_file_list
+
+    def __len__(self) -> int:
+        return len(self._list)
+
+    def __getitem__(self, index):
+        return self._list[index]
+
+    def __iter__(self) -> Iterator[BackupFile]:
+        return iter(self._list)
+
+    def __contains__(self, item) -> bool:
+        return isinstance(item, BackupFile) and self._list.exists(str(item.file_name))
+
+    def index(self, item: BackupFile, *args) -> int:
+        return self._list.position(item)
+
+
+class BackupFileMapping(Mapping):
+    """
+    A read only, dict-like view of a BackupFileList by file name
+    """
+
+    def __init__(self, backup_file_list: BackupFileList):
+        self._list = backup_file_list
+
+    def __len__(self) -> int:
+        return sum(1 for row in self._list._rows if row >= 0)
+
+    def __getitem__(self, file_name: str) -> BackupFile:
+        backup_file = self._list.get(file_name)
+        if backup_file is None:
+            raise KeyError(file_name)
+        return backup_file
+
+    def __iter__(self) -> Iterator[str]:
+        paths = self._list.paths
+        return (
+            paths[path_id]
+            for path_id, row in enumerate(self._list._rows)
+            if row >= 0
+        )
+
+    def __contains__(self, file_name) -> bool:
+        return self._list._find_row(file_name) is not None
+
+    def get(self, file_name: str, default=None) -> Optional[BackupFile]:
+        backup_file = self._list.get(file_name)
+        return default if backup_file is None else backup_file
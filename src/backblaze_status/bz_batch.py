@@ -1,4 +1,4 @@
-from PyQt6.QtCore import QReadWriteLock
+from .rwlock import ReadWriteLock
 
 
 class BzBatch:
@@ -6,7 +6,7 @@ class BzBatch:
         self.size: int = size
         self.timestamp: str = timestamp
         self.files: set = set()
-        self.lock = QReadWriteLock(recursionMode=QReadWriteLock.RecursionMode.Recursive)
+        self.lock = ReadWriteLock()
 
     def add_file(self, filename: str):
         self.lock.lockForWrite()
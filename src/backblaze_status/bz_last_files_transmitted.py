@@ -1,20 +1,30 @@
 import logging
 import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
 
 from .backup_file import BackupFile
 from .bz_batch import BzBatch
 from .bz_log_file_watcher import BzLogFileWatcher
+from .checkpoint import LAST_FILES_TRANSMITTED
 from .main_backup_status import BackupStatus
-from .qt_backup_status import QTBackupStatus
-from .to_do_files import ToDoFiles
+from .timestamps import parse_line_timestamp, parse_timestamp
+from .to_do_store import ToDoStore
+from .transmitted_record import RecordKind, decode_line
+from .update_bus import UpdateBus
 from .utils import MultiLogger
 from .configuration import Configuration
 from .dev_debug import DevDebug
+from .file_watcher import create_watcher
+from .log_directory import LogDirectoryIndex
+from .log_tail import TailReader, find_first_line_since
 from rich.pretty import pprint
 
+if TYPE_CHECKING:
+    from .qt_backup_status import QTBackupStatus
+
 
 @dataclass
 class BzLastFilesTransmitted:
@@ -22,9 +32,9 @@ class BzLastFilesTransmitted:
     Continuously scan the lastfiletransmitted file to get information about the state of the backup
     """
 
-    backup_status: QTBackupStatus
+    backup_status: "QTBackupStatus"
 
-    to_do_files: ToDoFiles | None = field(default=None, init=False)
+    to_do_files: ToDoStore | None = field(default=None, init=False)
     _total_lines: int = field(default=0, init=False)
     _dedups: int = field(default=0, init=False)
     _blank_lines: int = field(default=0, init=False)
@@ -35,6 +45,7 @@ class BzLastFilesTransmitted:
     _previous_filename: str | None = field(default=None, init=False)
     _current_large_filename: str | None = field(default=None)
     _first_pass: bool = field(default=True, init=False)
+    _backfilling: bool = field(default=False, init=False)
     _batch: BzBatch | None = field(default=None, init=False)
     _file_size: int = field(default=0, init=False)
     BZ_LOG_DIR: str = field(
@@ -52,24 +63,17 @@ class BzLastFilesTransmitted:
         self.go_to_end = True
         self.debug = self.backup_status.debug
         self.signals = self.backup_status.signals
+        self._log_index = LogDirectoryIndex(self.BZ_LOG_DIR)
 
     def _get_latest_logfile_name(self) -> Path:
         """
-        Scan the log directory for any files that end in .log, and return the one with the newest modification time
+        Return the .log file in the log directory with the newest modification
+        time. The directory is only scanned again when files are added to or
+        removed from it.
 
         :return:
         """
-        # return Path(self.BZ_LOG_DIR) / "28.log"
-        last_file = None
-        _dir = Path(self.BZ_LOG_DIR)
-        for _file in _dir.iterdir():
-            if _file.suffix == ".log":
-                if not last_file:
-                    last_file = _file
-                else:
-                    if _file.stat().st_mtime > last_file.stat().st_mtime:
-                        last_file = _file
-        return last_file
+        return self._log_index.latest()
 
     def _process_line(self, _line: str, _tell: int) -> None:
         _filename: str | None = None
@@ -143,75 +147,69 @@ class BzLastFilesTransmitted:
           
         """
 
-        _fields = _line.split(" - ")
-        # Sometimes filenames will have hyphens in them, and in that case treat it as
-        # a single filename
-        if len(_fields) > 6:
-            new_field = _fields[:5]
-            new_field.append(" - ".join(_fields[5:]))
-            _fields = new_field
-
-        match len(_fields):
-            case 6:
-                self._batch = None  # Since it's not just 3 fields, reset the batch
-                _timestamp, _size, _type, _rate, _bytes_str, _filename = _fields
-
-                # Convert bytes to int, if we can
-                try:
-                    _bytes = int(_bytes_str.strip().split(" ")[0])
-                except:
-                    _bytes = 0
-
-                match _filename[0:5]:
-                    # If it's a chunk, process it that way. Chunks are hex numbers I convert into ints
-                    case "Chunk":
-                        _chunk_number = int(_filename[6:11], base=16)
-                        _filename = _filename[15:]
-                        chunk = True
-                        self._is_batch = False
-
-                    # If it's a multiple file batch, create a new batch construct
-                    #  I don't think that I'm actually using this for anything,
-                    case "Multi":
-                        self._batch = BzBatch(size=_bytes, timestamp=_timestamp)
-                        self._batch_count += 1
-                        self._is_batch = True
-                        # Since we don't do anything with the multi line, return now
-                        return
-            case 3:
-                # This is a file within the batch
-                _timestamp, _, _filename = _fields
-                _bytes = 0
-                self._batch.add_file(_filename)
-            case _:
-                print(f"Unrecognized line: {_line}")
+        record = decode_line(_line)
+        if record is None:
+            print(f"Unrecognized line: {_line}")
+            return
+
+        match record.kind:
+            case RecordKind.SINGLE:
+                self._batch = None  # Since it's not a batch member, reset the batch
+            case RecordKind.CHUNK:
+                self._batch = None
+                chunk = True
+                self._is_batch = False
+            case RecordKind.BATCH_HEADER:
+                # If it's a multiple file batch, create a new batch construct
+                #  I don't think that I'm actually using this for anything,
+                self._batch = BzBatch(
+                    size=record.byte_count, timestamp=record.timestamp
+                )
+                self._batch_count += 1
+                self._is_batch = True
+                # Since we don't do anything with the multi line, return now
                 return
+            case RecordKind.BATCH_MEMBER:
+                # This is a file within the batch. When reading starts part of the
+                # way through a batch, I won't have seen its header.
+                if self._batch is not None:
+                    self._batch.add_file(record.file_name)
+
+        _timestamp = record.timestamp
+        _filename = record.file_name
+        _rate = record.rate
+        _bytes = record.byte_count
+        _chunk_number = record.chunk_number
 
         # At this point we have a filename. I take a look at the timestamp, because when I start up the monitor,
         #  there can be a lot of older information that I don't care about, so I discard anything over 4 hours old
 
-        _datetime = datetime.strptime(_timestamp, "%Y-%m-%d %H:%M:%S")
+        _datetime = parse_timestamp(_timestamp)
 
         # If it's a while ago, don't add it to the to do list
         now = datetime.now()
-        if (now - _datetime).seconds > 60 * 60 * 4:
+        if (now - _datetime).total_seconds() > Configuration.backfill_window:
             return
 
-        # If the file we are backing up is not on the to_do list, then we add it
-        if not self.to_do_files.exists(_filename):
+        # Get the file off of the to_do list. If the file we are backing up is not
+        # on the to_do list, then we add it
+        backup_file = self.to_do_files.get_file(_filename)  # type: BackupFile
+        if backup_file is None:
             print(f"Unexpected file {_filename} being backed up")
             self.to_do_files.add_file(
                 _filename,
                 is_chunk=chunk,
             )  # No lock here because add_file locks
 
-            self.to_do_files.current_file = self.to_do_files.get_file(_filename)
+            backup_file = self.to_do_files.get_file(_filename)
+            self.to_do_files.current_file = backup_file
 
         if self._previous_filename is None:
             self._previous_filename = _filename
 
             # We have started transmitting, so set the marker for that
-            self.signals.transmitting.emit(_filename)
+            if not self._backfilling:
+                self.signals.transmitting.emit(_filename)
 
         elif self._previous_filename != _filename:
             # The filename has changed, and we are still transmitting
@@ -220,30 +218,28 @@ class BzLastFilesTransmitted:
             self._previous_filename = _filename
 
             # We have started transmitting, so set the marker for that
-            self.signals.transmitting.emit(_filename)
+            if not self._backfilling:
+                self.signals.transmitting.emit(_filename)
 
-        # Get the file off of the to_list. I have to lock it so no other thread
-        # reads/writes from it while I do
-        backup_file = self.to_do_files.get_file(str(_filename))  # type: BackupFile
+        # The file may have only just been added to the to_do list
         if backup_file is None:
-            return
+            backup_file = self.to_do_files.get_file(_filename)
+            if backup_file is None:
+                return
 
         if _rate:
-            _rate = _rate.strip()
-            if _rate == "dedup":
-                dedup = True
-            else:
-                dedup = False
+            dedup = _rate == "dedup"
             # Keep track of how many files and bytes were deduplicated
             if dedup:
                 if chunk:
                     backup_file.add_deduped(_chunk_number)
                     # Since we've updated the backup_file, let the chunk_model know
-                    self.backup_status.chunk_model.layoutChanged.emit()
+                    if not self._backfilling:
+                        self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
                     # ic(f"chunk layoutChanged in lastfilestransmitted for dedup")
 
                 else:
-                    file = Path(_filename[15:])
+                    file = Path(_filename)
                     try:
                         backup_file.deduped_bytes += file.stat().st_size
                     except FileNotFoundError:
@@ -254,23 +250,24 @@ class BzLastFilesTransmitted:
                 if chunk:
                     backup_file.add_transmitted(_chunk_number)
                     # Since we've updated the backup_file, let the chunk_model know
-                    self.backup_status.chunk_model.layoutChanged.emit()
+                    if not self._backfilling:
+                        self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
                     # ic(f"chunk layoutChanged in lastfilestransmitted for transmitted")
 
                 else:
                     backup_file.transmitted_bytes += _bytes
                     backup_file.is_deduped = False
 
-            if _rate != "dedup" and _rate != "":
-                _rate = f"{int(_rate[:-10]):,}{_rate[-10:]}"
-
-            backup_file.rate = _rate
+            backup_file.rate = record.display_rate
             backup_file.total_bytes_processed += _bytes
 
         if self._batch:
             backup_file.batch = self._batch
             backup_file.start_time = datetime.now()
-            self.to_do_files.mark_completed(str(backup_file.file_name))
+            # While catching up, the display is refreshed once at the end
+            self.to_do_files.mark_completed(
+                str(backup_file.file_name), notify=not self._backfilling
+            )
 
         self._bytes += _bytes
         return
@@ -288,14 +285,14 @@ class BzLastFilesTransmitted:
                 )
                 time.sleep(60)
             else:
-                with _log_file.open("r") as _log_fd:
+                with _log_file.open("rb") as _log_fd:
                     self._multi_log.log(f"Reading file {_log_file}")
                     if self._first_pass:
-                        _log_fd.seek(0, 2)
+                        self._start_backfill(_log_fd)
 
-                    for _line in self._tail_file(_log_fd):
-                        tell = _log_fd.tell()
-                        self._process_line(_line, tell)
+                    reader = TailReader(_log_fd)
+                    for _line in self._tail_file(reader):
+                        self._process_line(_line, reader.offset)
 
                     self._first_pass = False
                     self._multi_log.log("Finished first pass", module=self._module_name)
@@ -303,15 +300,58 @@ class BzLastFilesTransmitted:
                     _log_file = self._get_latest_logfile_name()
                     self._current_filename = _log_file
 
-    def _tail_file(self, _file) -> str:
-        while True:
-            _line = _file.readline()
+    def _start_backfill(self, _log_fd: BinaryIO) -> None:
+        """
+        Carry on from the checkpoint if this is the log I was reading when I
+        stopped. Otherwise start reading the log Configuration.backfill_window ago,
+        rather than at the end, so that the transfers since then are shown. The
+        start is found with a binary search on the timestamps. Either way, the UI
+        isn't signalled until I have caught up with the end of the log.
+        """
+        offset = self.backup_status.checkpoints.resume_offset(
+            LAST_FILES_TRANSMITTED, self._current_filename
+        )
+        if offset is not None:
+            self._multi_log.log(f"Resuming {self._current_filename} at {offset:,}")
+            _log_fd.seek(offset)
+            self._backfilling = True
+            return
+
+        if not Configuration.backfill:
+            _log_fd.seek(0, 2)
+            return
 
-            if not _line:
-                time.sleep(1)
-                _new_filename = self._get_latest_logfile_name()
-                if _new_filename != self._current_filename:
-                    return
-                continue
+        since = datetime.now() - timedelta(seconds=Configuration.backfill_window)
+        _log_fd.seek(find_first_line_since(_log_fd, since, parse_line_timestamp))
+        self._backfilling = True
+
+    def _finish_backfill(self) -> None:
+        self._backfilling = False
+        self._multi_log.log("Finished backfill", module=self._module_name)
+        self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
+        self.to_do_files.notify_files_changed()
+        if self._previous_filename is not None:
+            self.signals.transmitting.emit(self._previous_filename)
+
+    def _tail_file(self, reader: TailReader) -> Iterator[str]:
+        # Wake up when the log file grows, or a new log file is created
+        with create_watcher(
+            [self._current_filename, self._current_filename.parent]
+        ) as watcher:
+            while True:
+                # Everything read so far has been processed
+                self.backup_status.checkpoints.update(
+                    LAST_FILES_TRANSMITTED, self._current_filename, reader.offset
+                )
+                _lines = reader.read_lines()
+
+                if not _lines:
+                    if self._backfilling:
+                        self._finish_backfill()
+                    watcher.wait(Configuration.log_watch_timeout)
+                    _new_filename = self._get_latest_logfile_name()
+                    if _new_filename != self._current_filename:
+                        return
+                    continue
 
-            yield _line
+                yield from _lines
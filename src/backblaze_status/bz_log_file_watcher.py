@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from io import TextIOWrapper
+from typing import Iterator
 import os
-import time
+from .configuration import Configuration
+from .file_watcher import create_watcher
+from .log_tail import TailReader
 from .utils import MultiLogger
 
 
@@ -16,21 +18,27 @@ class BzLogFileWatcher(ABC):
     def _get_latest_logfile_name(self) -> Path:
         pass
 
-    def _tail_file(self, _file: TextIOWrapper) -> str:
-        while True:
-            _line = _file.readline()
-
-            if not _line:
-                if self._first_pass:
-                    self._multi_log.log("Finished first pass", module=self._module_name)
-                self._first_pass = False
-                time.sleep(1)
-                _new_filename = self._get_latest_logfile_name()
-                if _new_filename != self._current_filename:
-                    return
-                continue
-
-            yield _line
+    def _tail_file(self, reader: TailReader) -> Iterator[str]:
+        # Wake up when the log file grows, or a new log file is created
+        with create_watcher(
+            [self._current_filename, self._current_filename.parent]
+        ) as watcher:
+            while True:
+                _lines = reader.read_lines()
+
+                if not _lines:
+                    if self._first_pass:
+                        self._multi_log.log(
+                            "Finished first pass", module=self._module_name
+                        )
+                    self._first_pass = False
+                    watcher.wait(Configuration.log_watch_timeout)
+                    _new_filename = self._get_latest_logfile_name()
+                    if _new_filename != self._current_filename:
+                        return
+                    continue
+
+                yield from _lines
 
     @abstractmethod
     def _process_line(self, _line) -> None:
@@ -40,11 +48,11 @@ class BzLogFileWatcher(ABC):
         _log_file = self._get_latest_logfile_name()
         self._current_filename = _log_file
         while True:
-            with _log_file.open("r") as _log_fd:
+            with _log_file.open("rb") as _log_fd:
                 self._multi_log.log(f"Reading file {_log_file}")
                 if self._first_pass:
                     _log_fd.seek(0, 2)
-                for _line in self._tail_file(_log_fd):
+                for _line in self._tail_file(TailReader(_log_fd)):
                     self._process_line(_line)
 
                 self._first_pass = False
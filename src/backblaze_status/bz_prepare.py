@@ -1,21 +1,26 @@
 import re
-import select
 import time
 from dataclasses import dataclass, field
-from io import TextIOWrapper
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
 
 from .backup_file import BackupFile
+from .configuration import Configuration
 from .dev_debug import DevDebug
-from .qt_backup_status import QTBackupStatus
-from .to_do_files import ToDoFiles
+from .file_watcher import create_watcher
+from .log_tail import TailReader
+from .to_do_store import ToDoStore
+from .update_bus import UpdateBus
 from .utils import MultiLogger
 
+if TYPE_CHECKING:
+    from .qt_backup_status import QTBackupStatus
+
 
 @dataclass
 class BzPrepare:
-    backup_status: QTBackupStatus
-    to_do_files: ToDoFiles | None = field(default=None, init=False)
+    backup_status: "QTBackupStatus"
+    to_do_files: ToDoStore | None = field(default=None, init=False)
     BZ_LOG_DIR: str = field(
         default="/Library/Backblaze.bzpkg/bzdata/bzbackup/bzdatacenter/bzcurrentlargefile",
         init=False,
@@ -43,37 +48,28 @@ class BzPrepare:
         """
         return Path(self.BZ_LOG_DIR) / "bz_todo_for_chunks.dat"
 
-    def _tail_file(self, _file: TextIOWrapper) -> str:
+    def _tail_file(self, reader: TailReader) -> Iterator[str]:
         _log_file = self._get_latest_logfile_name()
-        while True:
-            if not _log_file.exists():
-                return
-
-            if _log_file.stat().st_size < self.file_size:
-                self.file_size = 0
-                return
-
-            # TODO: Change this from a readline to a select, and then check the file each time
-            # You can do a select() on sys.stdin, and put a timeout on the select, ie:
-            #
-            # rfds, wfds, efds = select.select( [sys.stdin], [], [], 5)
-            #
-            # would give you a five second timeout. If the timeout expired, then rfds
-            # would be an empty list. If the user entered something within five
-            # seconds, then rfds will be a list containing sys.stdin.
-
-            readable, _, _ = select.select([_file], [], [], 0.5)
-            if not readable:
-                time.sleep(0.5)
-                continue
 
-            _line = _file.readline()
-            self.debug.print("bz_prepare.show_line", _line)
-            if not _line:
-                time.sleep(1)
-                continue
-            self.file_size = _log_file.stat().st_size
-            yield _line
+        # Wake up when the chunk file grows, or is removed or replaced
+        with create_watcher([_log_file, _log_file.parent]) as watcher:
+            while True:
+                if not _log_file.exists():
+                    return
+
+                if _log_file.stat().st_size < self.file_size:
+                    self.file_size = 0
+                    return
+
+                _lines = reader.read_lines()
+                if not _lines:
+                    watcher.wait(Configuration.log_watch_timeout)
+                    continue
+                self.file_size = _log_file.stat().st_size
+                if self.debug.enabled and self.debug.is_enabled("bz_prepare.show_line"):
+                    for _line in _lines:
+                        self.debug.print("bz_prepare.show_line", _line)
+                yield from _lines
 
     def read_file(self) -> None:
         _log_file = self._get_latest_logfile_name()
@@ -101,11 +97,11 @@ class BzPrepare:
                 self.previous_file = str(backup_file.file_name)
                 # TODO: Do soemthing to determine that the current file is not the previous file, and if it
                 #  is, then wait for it to be the current?
-                with _log_file.open("r") as _log_fd:
+                with _log_file.open("rb") as _log_fd:
                     # self._multi_log.debug(f"Reading file {_log_file}")
-                    for _line in self._tail_file(_log_fd):
-                        tell = _log_fd.tell()
-                        self._process_line(_line, tell)
+                    reader = TailReader(_log_fd)
+                    for _line in self._tail_file(reader):
+                        self._process_line(_line, reader.offset)
                 self.first_pass = False
 
                 # self.debug.print("bz_prepare.start", f"Log file ended")
@@ -130,6 +126,6 @@ class BzPrepare:
                 backup_file: BackupFile = self.to_do_files.current_file
 
             backup_file.add_prepared(chunk_num)
-            self.backup_status.chunk_model.layoutChanged.emit()
+            self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
             # ic(f"chunk layoutChanged in prepare")
             return
@@ -1,16 +1,52 @@
 import logging
 import re
-import time
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from io import TextIOWrapper
+from datetime import datetime, timedelta
+from functools import partial
+from enum import Enum, auto
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Optional
 
 from .backup_file import BackupFile
-from .qt_backup_status import QTBackupStatus
-from .to_do_files import ToDoFiles
+from .checkpoint import BZ_TRANSMIT
+from .configuration import Configuration
+from .file_watcher import create_watcher
+from .log_directory import LogDirectoryIndex
+from .log_tail import TailReader, find_first_line_since
+from .timestamps import line_timestamp, parse_line_timestamp, parse_utc_timestamp
+from .to_do_store import ToDoStore
+from .update_bus import UpdateBus
 from .utils import MultiLogger
 
+if TYPE_CHECKING:
+    from .qt_backup_status import QTBackupStatus
+
+
+class TransmitLine(Enum):
+    PREPARE = auto()
+    DEDUP = auto()
+    NEW_TO_DO = auto()
+
+
+# Text that only appears in the kind of line it is paired with. A substring check
+# is several times faster than running a regex over every line.
+LINE_MARKERS: tuple[tuple[str, TransmitLine], ...] = (
+    ("Entering PrepareBzLargeFileDirWithLargeFile", TransmitLine.PREPARE),
+    (" for this largefile", TransmitLine.DEDUP),
+    ("Leaving MakeBzDoneFileToDataCenter", TransmitLine.NEW_TO_DO),
+)
+
+
+def classify_line(_line: str) -> Optional[TransmitLine]:
+    """
+    Work out which kind of bztransmit line this is, or None if it is one that
+    BzTransmit ignores
+    """
+    for marker, kind in LINE_MARKERS:
+        if marker in _line:
+            return kind
+    return None
+
 
 @dataclass
 class BzTransmit:
@@ -19,9 +55,9 @@ class BzTransmit:
     certain key lines that give insights into what is happening in the backup
     """
 
-    backup_status: QTBackupStatus
+    backup_status: "QTBackupStatus"
 
-    to_do: ToDoFiles | None = field(default=None, init=False)
+    to_do: ToDoStore | None = field(default=None, init=False)
 
     _total_lines: int = field(default=0, init=False)
     _dedups: int = field(default=0, init=False)
@@ -31,6 +67,7 @@ class BzTransmit:
     _is_batch: bool = field(default=False, init=False)
     _current_filename: Path | None = field(default=None, init=False)
     _first_pass: bool = field(default=True, init=False)
+    _backfilling: bool = field(default=False, init=False)
     BZ_LOG_DIR: str = field(
         default="/Library/Backblaze.bzpkg/bzdata/bzlogs/bztransmit",
         init=False,
@@ -44,112 +81,93 @@ class BzTransmit:
         self._multi_log.log("Starting BzTransmit")
 
         self.go_to_end = True
+        self._log_index = LogDirectoryIndex(self.BZ_LOG_DIR)
 
-        # Compile the match for prepare large file search
-        self.prepare_match_re = re.compile(
-            ".*Entering PrepareBzLargeFileDirWithLargeFile.*"
-        )
-        # Compile the search for dedup
+        # Get the chunk number from a dedup line
         self.dedup_search_re = re.compile("chunk ([^ ]*) for this largefile")
 
-        # Compile the search for new to_do file
-        self.new_to_do_file_re = re.compile("Leaving MakeBzDoneFileToDataCenter")
-
         # Compile duplicate chunk
         self.duplicate_encrypted = re.compile(
             "noCopy code path VERY SUCCESSFUL,.*largeFileName=([^,]*).*_seq([^\.]*)"
         )
 
+        self._line_handlers = {
+            TransmitLine.PREPARE: self._process_prepare,
+            TransmitLine.DEDUP: self._process_dedup,
+            TransmitLine.NEW_TO_DO: self._process_new_to_do,
+        }
+
     def _get_latest_logfile_name(self) -> Path:
         """
-        Scan the log directory for any files that end in .log, and return the one
-        with the newest modification time
+        Return the .log file in the log directory with the newest modification
+        time. The directory is only scanned again when files are added to or
+        removed from it.
 
         :return:
         """
-        last_file = None
-        _dir = Path(self.BZ_LOG_DIR)
-        for _file in _dir.iterdir():
-            if _file.suffix == ".log":
-                if not last_file:
-                    last_file = _file
-                else:
-                    if _file.stat().st_mtime > last_file.stat().st_mtime:
-                        last_file = _file
-        return last_file
+        return self._log_index.latest()
 
     def _process_line(self, _line: str) -> None:
-        _filename: Path | None = None
-        _bytes: int = 0
-        _rate: str | None = None
-        _timestamp: str | None = None
-        _datetime: datetime | None = None
-
-        _line = _line.strip()
-        self._multi_log.log(_line, level=logging.DEBUG)
-
-        # When this matches it means that there a new large file being backed up
-        match_result = self.prepare_match_re.match(_line)
-        if match_result is not None:
-            if _line[4] == "-":
-                # The transmit file uses UTC time
-                _timestamp = _line[0:19]
-                _datetime = (
-                    datetime.strptime(_timestamp, "%Y-%m-%d %H:%M:%S")
-                    .replace(tzinfo=timezone.utc)
-                    .astimezone(tz=None)
-                )
-            else:
-                _timestamp = _line[0:14]
-                _datetime = (
-                    datetime.strptime(_timestamp, "%Y%m%d%H%M%S")
-                    .replace(tzinfo=timezone.utc)
-                    .astimezone(tz=None)
-                )
-            chunk = True
-            _filename = Path(_line.split(": ")[-1].rstrip())
+        if self._multi_log.logger.isEnabledFor(logging.DEBUG):
+            self._multi_log.log(_line.strip(), level=logging.DEBUG)
 
-            if not self.to_do.exists(str(_filename)):
-                self.to_do.add_file(
-                    str(_filename),
-                    is_chunk=chunk,
-                )
-            self.to_do.current_file = self.to_do.get_file(str(_filename))
-            self.backup_status.signals.start_new_file.emit(str(_filename))
+        # Almost every line is one I don't care about, so they are checked once
+        # against the markers and thrown away as early as possible
+        kind = classify_line(_line)
+        if kind is None:
+            return
+        self._line_handlers[kind](_line.strip())
+
+    @staticmethod
+    def _line_datetime(_line: str) -> datetime:
+        # The transmit file uses UTC time
+        return parse_utc_timestamp(line_timestamp(_line))
+
+    def _process_prepare(self, _line: str) -> None:
+        """
+        There is a new large file being backed up
+        """
+        _datetime = self._line_datetime(_line)
+        _filename = _line.split(": ")[-1].rstrip()
 
+        backup_file = self.to_do.get_file(_filename)  # type: BackupFile
+        if backup_file is None:
+            self.to_do.add_file(
+                _filename,
+                is_chunk=True,
+            )
+            backup_file = self.to_do.get_file(_filename)
+        self.to_do.current_file = backup_file
+        if not self._backfilling:
+            self.backup_status.signals.start_new_file.emit(_filename)
+
+    def _process_dedup(self, _line: str) -> None:
+        """
+        A chunk of a large file was already at Backblaze, so it doesn't need to be
+        transmitted
+        """
         _dedup_search_results = self.dedup_search_re.search(_line)
-        if _dedup_search_results is not None:
-            chunk = True
-            chunk_number = int(_dedup_search_results.group(1))
-            _filename = Path(_line.split(": ")[-1].rstrip())
-            _timestamp = _line[0:19]
-            if _timestamp[4] == "-":
-                # The transmit file uses UTC time
-                _datetime = (
-                    datetime.strptime(_timestamp, "%Y-%m-%d %H:%M:%S")
-                    .replace(tzinfo=timezone.utc)
-                    .astimezone(tz=None)
-                )
-            else:
-                _timestamp = _line[0:14]
-                _datetime = (
-                    datetime.strptime(_timestamp, "%Y%m%d%H%M%S")
-                    .replace(tzinfo=timezone.utc)
-                    .astimezone(tz=None)
-                )
+        if _dedup_search_results is None:
+            return
 
-            if not self.to_do.exists(str(_filename)):
-                self.to_do.add_file(
-                    str(_filename),
-                    is_chunk=chunk,
-                )  # add_file locks the backup list itself
+        chunk_number = int(_dedup_search_results.group(1))
+        _filename = _line.split(": ")[-1].rstrip()
+        _datetime = self._line_datetime(_line)
 
-            backup_file = self.to_do.get_file(str(_filename))  # type: BackupFile
-            backup_file.add_deduped(chunk_number)
-            self.backup_status.chunk_model.layoutChanged.emit()
-            # ic(f"chunk layoutChanged in bztransmit for dedup")
-            backup_file.current_chunk = chunk_number
-            backup_file.rate = "bztransmit"
+        backup_file = self.to_do.get_file(_filename)  # type: BackupFile
+        if backup_file is None:
+            self.to_do.add_file(
+                _filename,
+                is_chunk=True,
+            )  # add_file locks the backup list itself
+            backup_file = self.to_do.get_file(_filename)
+
+        backup_file.add_deduped(chunk_number)
+        if not self._backfilling:
+            self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
+        # ic(f"chunk layoutChanged in bztransmit for dedup")
+        backup_file.current_chunk = chunk_number
+        backup_file.rate = "bztransmit"
 
         # _dedup_encrypted_search_results = self.duplicate_encrypted.search(_line)
         # if _dedup_encrypted_search_results is not None:
@@ -186,39 +204,89 @@ class BzTransmit:
         #     backup_file.current_chunk = chunk_number
         #     backup_file.rate = "bztransmit"
 
-        _new_to_do_file_search_results = self.new_to_do_file_re.search(_line)
-        if _new_to_do_file_search_results is not None:
-            # TODO: We need to re-read the to_do file
-            self._multi_log.log(f"There is a new ToDo file. Reread it ({_timestamp})")
-            pass
+    def _process_new_to_do(self, _line: str) -> None:
+        # TODO: We need to re-read the to_do file
+        self._multi_log.log(f"There is a new ToDo file. Reread it ({_line[0:19]})")
 
     def read_file(self) -> None:
         _log_file = self._get_latest_logfile_name()
         self._current_filename = _log_file
         while True:
-            with _log_file.open("r") as _log_fd:
+            with _log_file.open("rb") as _log_fd:
                 self._multi_log.log(f"Reading file {_log_file}")
                 if self._first_pass:
-                    _log_fd.seek(0, 2)
-                for _line in self._tail_file(_log_fd):
+                    self._start_backfill(_log_fd)
+                for _line in self._tail_file(TailReader(_log_fd)):
                     self._process_line(_line)
 
                 self._first_pass = False
                 _log_file = self._get_latest_logfile_name()
                 self._current_filename = _log_file
 
-    def _tail_file(self, _file: TextIOWrapper) -> str:
-        while True:
-            _line = _file.readline()
+    def _start_backfill(self, _log_fd: BinaryIO) -> None:
+        """
+        Carry on from the checkpoint if this is the log I was reading when I
+        stopped. Otherwise start reading the log Configuration.backfill_window ago,
+        rather than at the end, so that the large files started since then are
+        known. The log is in UTC, so the timestamps are compared as aware
+        datetimes.
+        """
+        offset = self.backup_status.checkpoints.resume_offset(
+            BZ_TRANSMIT, self._current_filename
+        )
+        if offset is not None:
+            self._multi_log.log(f"Resuming {self._current_filename} at {offset:,}")
+            _log_fd.seek(offset)
+            self._backfilling = True
+            return
 
-            if not _line:
-                if self._first_pass:
-                    self._multi_log.log("Finished first pass", module=self._module_name)
-                self._first_pass = False
-                time.sleep(1)
-                _new_filename = self._get_latest_logfile_name()
-                if _new_filename != self._current_filename:
-                    return
-                continue
+        if not Configuration.backfill:
+            _log_fd.seek(0, 2)
+            return
+
+        since = datetime.now().astimezone() - timedelta(
+            seconds=Configuration.backfill_window
+        )
+        _log_fd.seek(
+            find_first_line_since(
+                _log_fd, since, partial(parse_line_timestamp, utc=True)
+            )
+        )
+        self._backfilling = True
+
+    def _finish_backfill(self) -> None:
+        self._backfilling = False
+        self._multi_log.log("Finished backfill", module=self._module_name)
+        self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
+        if self.to_do.current_file is not None:
+            self.backup_status.signals.start_new_file.emit(
+                str(self.to_do.current_file.file_name)
+            )
+
+    def _tail_file(self, reader: TailReader) -> Iterator[str]:
+        # Wake up when the log file grows, or a new log file is created
+        with create_watcher(
+            [self._current_filename, self._current_filename.parent]
+        ) as watcher:
+            while True:
+                # Everything read so far has been processed
+                self.backup_status.checkpoints.update(
+                    BZ_TRANSMIT, self._current_filename, reader.offset
+                )
+                _lines = reader.read_lines()
+
+                if not _lines:
+                    if self._backfilling:
+                        self._finish_backfill()
+                    if self._first_pass:
+                        self._multi_log.log(
+                            "Finished first pass", module=self._module_name
+                        )
+                    self._first_pass = False
+                    watcher.wait(Configuration.log_watch_timeout)
+                    _new_filename = self._get_latest_logfile_name()
+                    if _new_filename != self._current_filename:
+                        return
+                    continue
 
-            yield _line
+                yield from _lines
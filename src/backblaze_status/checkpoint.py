@@ -0,0 +1,169 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .configuration import Configuration
+
+# The streams that are checkpointed
+LAST_FILES_TRANSMITTED = "lastfilestransmitted"
+BZ_TRANSMIT = "bztransmit"
+
+
+@dataclass
+class Checkpoint:
+    """
+    How far a log file had been read. The inode and size tell me if it is still
+    the same file when I come back to it.
+    """
+
+    path: str
+    inode: int
+    size: int
+    offset: int
+
+
+class CheckpointStore:
+    """
+    Keeps a checkpoint for each log stream, so that when the monitor is restarted
+    the tailers can carry on from where they stopped, rather than losing the lines
+    written while it was down.
+
+    The tailers update the checkpoints in memory as they go. They are written to
+    disk every Configuration.checkpoint_interval seconds by a background thread,
+    and when the program exits. The file is written to a temporary file first and
+    then renamed over the old one, so it is never left half written.
+    """
+
+    def __init__(self, checkpoint_file: str | Path = None, interval: float = None):
+        if checkpoint_file is None:
+            checkpoint_file = Configuration.checkpoint_file
+        if interval is None:
+            interval = Configuration.checkpoint_interval
+        self.checkpoint_file = Path(checkpoint_file)
+        self._interval = interval
+
+        self._checkpoints: dict[str, Checkpoint] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.checkpoint_file.open("r") as checkpoint_fd:
+                saved = json.load(checkpoint_fd)
+            self._checkpoints = {
+                stream: Checkpoint(**checkpoint) for stream, checkpoint in saved.items()
+            }
+        except (OSError, ValueError, TypeError):
+            # No checkpoints yet, or they can't be read, so start from scratch
+            self._checkpoints = {}
+
+    def get(self, stream: str) -> Optional[Checkpoint]:
+        with self._lock:
+            return self._checkpoints.get(stream)
+
+    def update(self, stream: str, path: str | Path, offset: int) -> None:
+        """
+        Record that the stream has been read up to offset in the file at path
+        """
+        path = str(path)
+        with self._lock:
+            checkpoint = self._checkpoints.get(stream)
+            if (
+                checkpoint is not None
+                and checkpoint.path == path
+                and checkpoint.offset == offset
+            ):
+                return
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        with self._lock:
+            self._checkpoints[stream] = Checkpoint(
+                path, stat.st_ino, stat.st_size, offset
+            )
+            self._dirty = True
+
+    def resume_offset(self, stream: str, path: str | Path) -> Optional[int]:
+        """
+        Return the offset to carry on reading the file at path from, or None if
+        there is no checkpoint for it. The checkpoint is only used if it is still
+        the same file, and it hasn't been truncated.
+        """
+        checkpoint = self.get(stream)
+        if checkpoint is None or checkpoint.path != str(path):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_ino != checkpoint.inode or stat.st_size < checkpoint.size:
+            return None
+        return checkpoint.offset
+
+    def save(self) -> None:
+        """
+        Write the checkpoints to disk, if they have changed
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            saved = {
+                stream: asdict(checkpoint)
+                for stream, checkpoint in self._checkpoints.items()
+            }
+            self._dirty = False
+
+        try:
+            self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd, temp_name = tempfile.mkstemp(
+                dir=self.checkpoint_file.parent,
+                prefix=f".{self.checkpoint_file.name}.",
+            )
+            try:
+                with os.fdopen(temp_fd, "w") as checkpoint_fd:
+                    json.dump(saved, checkpoint_fd, indent=2)
+                    checkpoint_fd.flush()
+                    os.fsync(checkpoint_fd.fileno())
+                os.replace(temp_name, self.checkpoint_file)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+        except OSError:
+            # Try again next time
+            with self._lock:
+                self._dirty = True
+
+    def start(self) -> None:
+        """
+        Start saving the checkpoints on a timer, and when the program exits
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="CheckpointStore", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.save()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.save()
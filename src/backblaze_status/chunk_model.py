@@ -7,14 +7,15 @@ from PyQt6.QtCore import (
     Qt,
     QModelIndex,
     pyqtSlot,
-    QTimer,
     QReadWriteLock,
 )
 from PyQt6.QtGui import QColor
 from enum import IntEnum
 
 from .backup_file import BackupFile
+from .chunk_states import ChunkState
 from .to_do_files import ToDoFiles
+from .update_bus import UpdateBus
 from rich.pretty import pprint
 from icecream import ic
 
@@ -33,6 +34,14 @@ class ChunkModel(QAbstractTableModel):
         Large = 75
         X_Large = 100
 
+    # The color of a cell in each ChunkState
+    StateColors: tuple[QColor, ...] = (
+        QColor("#818a84"),  # The default color
+        QColor("#2575fc"),  # Prepared
+        QColor("#84fab0"),  # Transmitted
+        QColor("#f5a356"),  # Deduped
+    )
+
     def __init__(self, qt):
         from .qt_backup_status import QTBackupStatus
         from .to_do_files import ToDoFiles
@@ -46,12 +55,13 @@ class ChunkModel(QAbstractTableModel):
         self.use_dialog: bool = False
         self.last_reset_table_time: datetime = datetime.now()
 
-        self.update_timer: QTimer = QTimer()
-        self.update_timer.timeout.connect(self.layoutChanged.emit)
-        self.update_timer.start(500)
-
         self.table_size = 0
 
+        # The ChunkState of each cell, row by row, worked out once per update
+        # rather than for each cell as it is painted. The update is run by
+        # QTBackupStatus.updates when the chunks have changed.
+        self.grid: bytes = b""
+
         self.lock: QReadWriteLock = QReadWriteLock(
             recursionMode=QReadWriteLock.RecursionMode.Recursive
         )
@@ -67,14 +77,46 @@ class ChunkModel(QAbstractTableModel):
         # ic(f"set chunk filename to {value}")
         self._file_name = value
         self.reset_table()
-        self.layoutChanged.emit()
+        self.update_grid()
 
-    def calculate_chunk(self, row: int, column: int) -> int:
-        cell_size = self.table_size * self.table_size
-        multiplier = self.current_file.total_chunk_count / cell_size
-        chunk = row * self.table_size + column
-        chunk *= multiplier
-        return int(chunk)
+    def update_grid(self):
+        """
+        Work out the state of each cell from the chunks of the current file, and
+        have the rows with cells that changed repainted
+        """
+        try:
+            self.lock.lockForWrite()
+            old_grid = self.grid
+            to_do: ToDoFiles = self.backup_status.to_do
+            if to_do is not None and self.filename is not None:
+                self.current_file = to_do.get_file(self.filename)
+            if self.current_file is None or self.table_size == 0:
+                self.grid = b""
+            else:
+                self.grid = self.current_file.chunk_raster(
+                    self.table_size * self.table_size
+                )
+            grid = self.grid
+            size = self.table_size
+        finally:
+            self.lock.unlock()
+
+        if len(grid) != len(old_grid):
+            self.layoutChanged.emit()
+            return
+
+        changed_rows = [
+            row
+            for row in range(size)
+            if grid[row * size : (row + 1) * size]
+            != old_grid[row * size : (row + 1) * size]
+        ]
+        if changed_rows:
+            self.dataChanged.emit(
+                self.index(changed_rows[0], 0),
+                self.index(changed_rows[-1], size - 1),
+                [Qt.ItemDataRole.BackgroundRole],
+            )
 
     def reset_table(self):
         try:
@@ -82,6 +124,9 @@ class ChunkModel(QAbstractTableModel):
             self._reset_table()
         finally:
             self.lock.unlock()
+        # The grid has to be worked out again for the new table size, even if no
+        # more chunks come in
+        self.backup_status.updates.mark(UpdateBus.CHUNK_GRID)
 
     def _reset_table(self):
         to_do: ToDoFiles = self.backup_status.to_do
@@ -130,42 +175,17 @@ class ChunkModel(QAbstractTableModel):
                 self.backup_status.chunk_box_table.setRowHeight(spot, pixel_size)
 
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
-        row = index.row()
-        column = index.column()
-
-        to_do: ToDoFiles = self.backup_status.to_do
-        if to_do is None:
-            return
-
-        self.current_file: BackupFile = to_do.get_file(self.filename)
-        if self.current_file is None:
-            return
-
-        chunk = self.calculate_chunk(row, column)  # row * self.rows_columns + column
-
-        # The order is important. Chunks can be in both transmitted and deduped,
-        # and if that happens, they are actually deduped. Also, they will be in
-        # prepared, so the order to return is first deduped, then transmitted,
-        # then prepared
-
         if role == Qt.ItemDataRole.BackgroundRole:
-            if chunk in self.current_file.deduped_chunks:
-                return QColor("#f5a356")
-
-            if chunk in self.current_file.transmitted_chunks:
-                return QColor("#84fab0")
-
-            if chunk in self.current_file.prepared_chunks:
-                return QColor("#2575fc")
-
-            return QColor("#818a84")  # The default color
+            cell = index.row() * self.table_size + index.column()
+            grid = self.grid
+            if cell >= len(grid):
+                return self.StateColors[ChunkState.NONE]
+            return self.StateColors[grid[cell]]
 
     def rowCount(self, index: QModelIndex) -> int:
-        # Subtract two so that no matter what the way things are, we don't go over
         return self.table_size
 
     def columnCount(self, index: QModelIndex) -> int:
-        # Subtract two so that no matter what the way things are, we don't go over
         if self.table_size == 0:
             if (datetime.now() - self.last_reset_table_time).seconds > 5:
                 self.reset_table()
@@ -0,0 +1,158 @@
+import threading
+from collections.abc import Set
+from enum import IntEnum
+from typing import Iterator
+
+
+class ChunkState(IntEnum):
+    """
+    The states a chunk of a large file goes through. A chunk only ever moves up
+    to a later state. One that is deduped after it was transmitted is deduped.
+    """
+
+    NONE = 0
+    PREPARED = 1
+    TRANSMITTED = 2
+    DEDUPED = 3
+
+
+# The states of the four chunks in each possible byte, one per byte
+_UNPACKED = [
+    bytes((byte >> shift) & 3 for shift in (0, 2, 4, 6)) for byte in range(256)
+]
+
+
+class ChunkStates:
+    """
+    The state of every chunk of a large file, in two bits per chunk, so that a
+    50,000 chunk file needs about 12 KB.
+
+    How many chunks are in each state, and the highest chunk that has reached
+    each state, are kept as the states change, so they never need a pass over
+    the chunks.
+
+    The BzPrepare, BzTransmit and BzLastFilesTransmitted threads all set chunks of
+    the same file, and each byte holds four chunks, so set() changes the bits and
+    the totals under a lock.
+    """
+
+    __slots__ = ("_bits", "_counts", "_maxes", "_lock")
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._counts: list[int] = [0] * len(ChunkState)
+        # The highest chunk that has been set to each state. It doesn't go down
+        # when a chunk moves on to a later state.
+        self._maxes: list[int] = [0] * len(ChunkState)
+        self._lock = threading.Lock()
+
+    def __getitem__(self, chunk: int) -> ChunkState:
+        return ChunkState(self.state(chunk))
+
+    def state(self, chunk: int) -> int:
+        byte = chunk >> 2
+        if chunk < 0 or byte >= len(self._bits):
+            return ChunkState.NONE
+        return (self._bits[byte] >> ((chunk & 3) << 1)) & 3
+
+    def set(self, chunk: int, state: ChunkState) -> int:
+        """
+        Move a chunk up to state. A chunk that is already in that state or a later
+        one is left alone.
+
+        :return: The state the chunk was in
+        :raises ValueError: If the chunk number is negative
+        """
+        if chunk < 0:
+            raise ValueError(f"Invalid chunk number {chunk}")
+
+        byte = chunk >> 2
+        shift = (chunk & 3) << 1
+        bits = self._bits
+        with self._lock:
+            if byte >= len(bits):
+                bits.extend(bytes(byte + 1 - len(bits)))
+            old_state = (bits[byte] >> shift) & 3
+            if state > old_state:
+                bits[byte] = (bits[byte] & ~(3 << shift)) | (state << shift)
+                self._counts[old_state] -= 1
+                self._counts[state] += 1
+                if chunk > self._maxes[state]:
+                    self._maxes[state] = chunk
+        return old_state
+
+    def count(self, state: ChunkState) -> int:
+        """
+        How many chunks are in this state now
+        """
+        return self._counts[state]
+
+    def max(self, state: ChunkState) -> int:
+        """
+        The highest chunk that has been set to this state, or 0 if none has
+        """
+        return self._maxes[state]
+
+    def chunks(self, state: ChunkState, at_least: bool = False) -> "ChunkView":
+        return ChunkView(self, state, at_least)
+
+    def raster(self, chunk_count: int, cells: int) -> bytes:
+        """
+        Spread chunks 0 to chunk_count - 1 over cells cells, and return the state
+        of each cell, one per byte. A cell is in the lowest state of the chunks it
+        covers, so it is only shown as done when all of them are. When there are
+        fewer chunks than cells, a chunk covers more than one cell.
+        """
+        if cells <= 0:
+            return b""
+        with self._lock:
+            bits = bytes(self._bits)
+        states = b"".join(map(_UNPACKED.__getitem__, bits))[:chunk_count]
+        states = states.ljust(chunk_count, b"\0")
+        if not states:
+            return bytes(cells)
+
+        step = chunk_count / cells
+        starts = [int(cell * step) for cell in range(cells + 1)]
+        return bytes(
+            min(states[start : max(stop, start + 1)])
+            for start, stop in zip(starts, starts[1:])
+        )
+
+
+class ChunkView(Set):
+    """
+    A read only, set-like view of the chunks in one state, without copying them.
+    Membership and len() don't need a pass over the chunks. If at_least is set,
+    the chunks that have gone on to a later state are included too.
+    """
+
+    __slots__ = ("_states", "_state", "_at_least")
+
+    def __init__(self, states: ChunkStates, state: ChunkState, at_least: bool = False):
+        self._states = states
+        self._state = state
+        self._at_least = at_least
+
+    def __contains__(self, chunk) -> bool:
+        if not isinstance(chunk, int):
+            return False
+        state = self._states.state(chunk)
+        if self._at_least:
+            return state >= self._state
+        return state == self._state
+
+    def __len__(self) -> int:
+        if not self._at_least:
+            return self._states.count(self._state)
+        return sum(
+            self._states.count(state)
+            for state in ChunkState
+            if state >= self._state
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        states = self._states
+        for chunk in range(len(states._bits) * 4):
+            if chunk in self:
+                yield chunk
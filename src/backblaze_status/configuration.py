@@ -10,6 +10,37 @@ class Configuration:
     tb_divisor: int = 1024 * gb_divisor  # 1000000000000
     default_chunk_size: int = 10485760
 
+    # How often the log tailers check their files when they have to poll, and the
+    # longest they wait for a change before looking for a new log file anyway
+    log_poll_interval: float = 1.0
+    log_watch_timeout: float = 10.0
+
+    # The least time between scans of a log directory for a reused older log,
+    # while the newest log isn't being written to
+    log_rescan_interval: float = 60.0
+
+    # When the monitor starts, replay this many seconds of the transmit logs, so
+    # that the transfers already done are shown
+    backfill: bool = True
+    backfill_window: int = 4 * 60 * 60
+
+    # Where the tailers remember how far they have read, and how often it is saved
+    checkpoint_file: str = str(
+        Path.home() / ".config" / "backblaze_status" / "checkpoints.json"
+    )
+    checkpoint_interval: float = 5.0
+
+    # Write the logs from a background thread, through a queue of at most
+    # log_queue_size records. When it is half full, only one in log_debug_sample
+    # DEBUG records is kept.
+    async_logging: bool = False
+    log_queue_size: int = 10000
+    log_debug_sample: int = 10
+
+    # How often, in milliseconds, the GUI updates the parts of the display that
+    # have changed, however often they change
+    ui_update_interval: int = 100
+
     default_feature_flags: dict = {
         "show_progress_bar": {
             "usage": "all",
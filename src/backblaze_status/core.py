@@ -0,0 +1,48 @@
+"""
+The parts of backblaze_status that don't need Qt: the to_do list, the log
+parsers, and the totals kept from them. Importing this doesn't load Qt, so they
+can be used from a command line tool or tests.
+
+HeadlessBackupStatus stands in for QTBackupStatus, with plain Python events in
+place of the Qt signals:
+
+    backup_status = HeadlessBackupStatus()
+    backup_status.signals.transmitting.connect(print)
+    to_do = ToDoStore(backup_status)
+    bz_transmit = BzTransmit(backup_status)
+    bz_transmit.to_do = to_do
+"""
+from .backup_file import BackupFile
+from .backup_file_list import BackupFileList
+from .bz_batch import BzBatch
+from .bz_last_files_transmitted import BzLastFilesTransmitted
+from .bz_prepare import BzPrepare
+from .bz_transmit import BzTransmit
+from .checkpoint import CheckpointStore
+from .events import CoreEvents, Event, ModelEvents
+from .headless import HeadlessBackupStatus
+from .rwlock import ReadWriteLock
+from .to_do_parser import parse_to_do_file
+from .to_do_stats import ToDoStats
+from .to_do_store import ToDoStore
+from .transmitted_record import TransmittedRecord, decode_line
+
+__all__ = [
+    "BackupFile",
+    "BackupFileList",
+    "BzBatch",
+    "BzLastFilesTransmitted",
+    "BzPrepare",
+    "BzTransmit",
+    "CheckpointStore",
+    "CoreEvents",
+    "Event",
+    "HeadlessBackupStatus",
+    "ModelEvents",
+    "ReadWriteLock",
+    "ToDoStats",
+    "ToDoStore",
+    "TransmittedRecord",
+    "decode_line",
+    "parse_to_do_file",
+]
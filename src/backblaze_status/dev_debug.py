@@ -16,6 +16,12 @@ class DevDebug(IceCreamDebugger):
     _enabled: set = set()
     _disabled: set = set()
 
+    # What _found_in_tags() returned for each tag, so that checking a tag for every
+    # log line is a dictionary lookup. It is replaced with an empty one whenever the
+    # tags change, after they have changed, so that a result worked out from the
+    # old tags can only be stored in the old one.
+    _resolved: dict[str, tuple[int, int]] = {}
+
     def __init__(self, enabled_mode: bool = True):
         """
         This class runs in one of two modes, enabled_mode and disabled_mode.
@@ -66,7 +72,13 @@ class DevDebug(IceCreamDebugger):
                  If there is nto a specific match
         """
 
-        found_in_enabled, found_in_disabled = self._found_in_tags(tag)
+        resolved = DevDebug._resolved
+        found = resolved.get(tag)
+        if found is None:
+            found = self._found_in_tags(tag)
+            resolved[tag] = found
+
+        found_in_enabled, found_in_disabled = found
         if found_in_enabled == found_in_disabled:
             # Not found in either, or they are both the same. In that case, if enabled_mode, then it defaults enabled
             #  If disabled mode, it defaults disabled
@@ -100,6 +112,7 @@ class DevDebug(IceCreamDebugger):
         # Add it to enabled, and make sure it's not in disabled
         self._enabled.add(tag)
         self._disabled.discard(tag)
+        DevDebug._resolved = {}
 
         return
 
@@ -108,6 +121,7 @@ class DevDebug(IceCreamDebugger):
         # Add it to disabled and make sure its not in enabled
         self._disabled.add(tag)
         self._enabled.discard(tag)
+        DevDebug._resolved = {}
         return
 
     def show(self):
@@ -126,7 +140,8 @@ class DevDebug(IceCreamDebugger):
             print(f"All tags disabled except: {', '.join(tags)}")
 
     def print(self, tag: str, message: str):
-        if self.is_enabled(tag):
+        # Check that ic() output is on before looking at the tag at all
+        if self.enabled and self.is_enabled(tag):
             self(f"<{tag}> {message}")
 
     def __call__(self, *args):
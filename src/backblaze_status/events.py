@@ -0,0 +1,73 @@
+import threading
+from typing import Callable
+
+
+class Event:
+    """
+    A plain Python stand in for a pyqtSignal, with the same connect() and emit(),
+    so that the to_do list and the log parsers can report what they see without
+    Qt. The callbacks are called straight away, in the thread that emits.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._callbacks: tuple[Callable, ...] = ()
+        self._lock = threading.Lock()
+
+    def connect(self, callback: Callable) -> None:
+        with self._lock:
+            self._callbacks = self._callbacks + (callback,)
+
+    def disconnect(self, callback: Callable) -> None:
+        """
+        :raises ValueError: If the callback isn't connected
+        """
+        with self._lock:
+            callbacks = list(self._callbacks)
+            callbacks.remove(callback)
+            self._callbacks = tuple(callbacks)
+
+    def emit(self, *args) -> None:
+        # The tuple is replaced rather than changed, so emitting doesn't need the
+        # lock, and a callback can connect or disconnect without upsetting this loop
+        for callback in self._callbacks:
+            callback(*args)
+
+
+class CoreEvents:
+    """
+    The data events from Signals, for running without Qt. They have the same
+    names, so the code that emits them doesn't need to know which it has.
+    """
+
+    NAMES: tuple[str, ...] = (
+        "calculate_progress",
+        "to_do_available",
+        "start_new_file",
+        "files_updated",
+        "add_file",
+        "mark_completed",
+        "preparing",
+        "transmitting",
+        "backup_running",
+    )
+
+    def __init__(self, prefix: str = ""):
+        for name in self.NAMES:
+            setattr(self, name, Event(f"{prefix}{name}"))
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.NAMES)
+
+
+class ModelEvents:
+    """
+    Stands in for the table models, whose layoutChanged the to_do list and log
+    parsers emit when the rows they show have changed
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.layoutChanged = Event(f"{prefix}layoutChanged")
+
+    def __iter__(self):
+        return iter((self.layoutChanged,))
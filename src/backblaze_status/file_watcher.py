@@ -0,0 +1,227 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from .configuration import Configuration
+
+
+class FileWatcher(ABC):
+    """
+    Blocks a log tailer until one of the files or directories it is watching
+    changes, instead of having it wake up every second to look.
+
+    A watcher is created for the log file being tailed and the directory it is in,
+    so that both new lines and new log files wake it up.
+    """
+
+    def __init__(self, paths: list[Path]):
+        self.paths = [Path(path) for path in paths]
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    @abstractmethod
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait until something changes, or the timeout runs out
+
+        :param timeout: The most seconds to wait
+        :return: True if something changed, False if the wait timed out
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Checks the size and modification time of the paths every interval. This works
+    everywhere, and is used when there is nothing better.
+    """
+
+    def __init__(self, paths: list[Path], interval: float = None):
+        super().__init__(paths)
+        if interval is None:
+            interval = Configuration.log_poll_interval
+        self._interval = interval
+        self._snapshot = self._stat_paths()
+
+    def _stat_paths(self) -> list[tuple[int, int] | None]:
+        snapshot = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                snapshot.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                snapshot.append(None)
+        return snapshot
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(min(self._interval, deadline - time.monotonic()), 0))
+            snapshot = self._stat_paths()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Uses inotify on Linux. A watch on a directory also reports changes to the files
+    in it.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+
+    WATCH_MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+        | IN_MOVE_SELF
+    )
+
+    _libc = None
+
+    def __init__(self, paths: list[Path]):
+        super().__init__(paths)
+        self._fd = -1
+        libc = self._load_libc()
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        for path in self.paths:
+            watch = libc.inotify_add_watch(
+                self._fd, os.fsencode(path), ctypes.c_uint32(self.WATCH_MASK)
+            )
+            if watch < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"inotify_add_watch failed for {path}")
+
+    @classmethod
+    def _load_libc(cls) -> ctypes.CDLL:
+        if cls._libc is None:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            cls._libc = libc
+        return cls._libc
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+
+        # I only care that something changed, not what it was, so throw the events
+        # away
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if getattr(self, "_fd", -1) >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class KqueueWatcher(FileWatcher):
+    """
+    Uses kqueue on macOS and the BSDs. Unlike inotify, a directory only reports
+    files being added or removed, so the file being tailed has to be watched too.
+    """
+
+    # Open the paths only to get events, so they don't stop a volume unmounting
+    O_EVTONLY = getattr(os, "O_EVTONLY", 0x8000 if sys.platform == "darwin" else 0)
+
+    def __init__(self, paths: list[Path]):
+        super().__init__(paths)
+        self._fds: list[int] = []
+        self._kqueue = select.kqueue()
+
+        fflags = (
+            select.KQ_NOTE_WRITE
+            | select.KQ_NOTE_EXTEND
+            | select.KQ_NOTE_ATTRIB
+            | select.KQ_NOTE_DELETE
+            | select.KQ_NOTE_RENAME
+        )
+        events = []
+        try:
+            for path in self.paths:
+                fd = os.open(path, os.O_RDONLY | self.O_EVTONLY)
+                self._fds.append(fd)
+                events.append(
+                    select.kevent(
+                        fd,
+                        filter=select.KQ_FILTER_VNODE,
+                        flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+                        fflags=fflags,
+                    )
+                )
+            self._kqueue.control(events, 0, 0)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout: float) -> bool:
+        return bool(self._kqueue.control(None, len(self._fds), timeout))
+
+    def close(self) -> None:
+        for fd in getattr(self, "_fds", []):
+            os.close(fd)
+        self._fds = []
+        kqueue = getattr(self, "_kqueue", None)
+        if kqueue is not None:
+            kqueue.close()
+            self._kqueue = None
+
+
+def create_watcher(paths: list[Path]) -> FileWatcher:
+    """
+    Create the best watcher for this platform, falling back to polling if it can't
+    be used, for example when a path doesn't exist or inotify has run out of
+    watches
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            return InotifyWatcher(paths)
+        if hasattr(select, "kqueue"):
+            return KqueueWatcher(paths)
+    except (OSError, AttributeError):
+        pass
+    return PollingWatcher(paths)
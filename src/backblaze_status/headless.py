@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Optional
+
+from .checkpoint import CheckpointStore
+from .dev_debug import DevDebug
+from .events import CoreEvents, Event, ModelEvents
+from .to_do_store import ToDoStore
+from .update_bus import UpdateBus
+
+
+class HeadlessBackupStatus:
+    """
+    The parts of QTBackupStatus that ToDoStore and the log parsers use, with plain
+    Python events in place of the Qt signals and table models, so that they can
+    run without Qt, for a command line tool or tests. Connect callbacks to the
+    events in signals, chunk_model and result_data to be told what happens. Each
+    region marked on updates is passed on straight away to the event it stands
+    for.
+    """
+
+    def __init__(self, checkpoint_file: Optional[str | Path] = None):
+        """
+        :param checkpoint_file: Where to keep the log checkpoints, or None for the
+            configured place
+        """
+        self.signals = CoreEvents()
+        self.chunk_model = ModelEvents("chunk_model.")
+        self.result_data = ModelEvents("result_data.")
+        self.table_moved = Event("reposition_table")
+        self.updates = UpdateBus(immediate=True)
+        self.updates.connect(UpdateBus.CHUNK_GRID, self.chunk_model.layoutChanged.emit)
+        self.updates.connect(UpdateBus.PROGRESS, self.signals.calculate_progress.emit)
+        self.updates.connect(UpdateBus.FILES, self.signals.files_updated.emit)
+        self.updates.connect(UpdateBus.RESULT_ROWS, self.result_data.layoutChanged.emit)
+        self.updates.connect(UpdateBus.TABLE_POSITION, self.reposition_table)
+        self.debug = DevDebug()
+        self.checkpoints = CheckpointStore(checkpoint_file)
+        self.to_do: Optional[ToDoStore] = None
+
+    def events(self) -> list[Event]:
+        """
+        Return all of the events, for connecting to every one of them
+        """
+        return [
+            *self.signals,
+            *self.chunk_model,
+            *self.result_data,
+            self.table_moved,
+        ]
+
+    def reposition_table(self) -> None:
+        self.table_moved.emit()
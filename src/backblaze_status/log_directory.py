@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .configuration import Configuration
+
+
+class LogDirectoryIndex:
+    """
+    Keeps track of the newest log file in a Backblaze log directory.
+
+    The log directories hold months of daily logs, and the tailers ask for the
+    newest one every time they reach the end of their file. While the newest log
+    is still being written to, no other log can have become newer, so the
+    directory is only scanned again when a file is added, removed or renamed in it
+    (which changes its modification time), or when the newest log hasn't been
+    written to for at least rescan_interval seconds since the last scan.
+    Backblaze names its logs by day of the month and rewrites an old one in place
+    when it reuses it, which changes neither the directory nor the log that was
+    the newest, so while the backup is idle the directory is still looked at now
+    and then, but not every time a tailer reaches the end of its file.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        suffix: str = ".log",
+        rescan_interval: Optional[float] = None,
+    ):
+        """
+        :param directory: The log directory
+        :param suffix: The suffix of the log files in it
+        :param rescan_interval: The least time between scans while the newest log
+            isn't being written to, or None for the configured interval
+        """
+        if rescan_interval is None:
+            rescan_interval = Configuration.log_rescan_interval
+        self.directory = Path(directory)
+        self.suffix = suffix
+        self.rescan_interval = rescan_interval
+        self._last_scan: float = 0.0
+        self._directory_mtime: Optional[int] = None
+        self._latest: Optional[Path] = None
+        self._latest_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # How many times the directory has actually been scanned
+        self.scans: int = 0
+
+    def latest(self) -> Optional[Path]:
+        """
+        Return the log file with the newest modification time, or None if there
+        aren't any
+
+        :raises FileNotFoundError: If the directory doesn't exist
+        """
+        directory_mtime = os.stat(self.directory).st_mtime_ns
+        with self._lock:
+            if directory_mtime != self._directory_mtime or self._may_be_stale():
+                self._latest, self._latest_mtime = self._scan()
+                self._directory_mtime = directory_mtime
+                self._last_scan = time.monotonic()
+            return self._latest
+
+    def invalidate(self) -> None:
+        """
+        Forget the newest log, so that the next call to latest() scans again
+        """
+        with self._lock:
+            self._directory_mtime = None
+
+    def _may_be_stale(self) -> bool:
+        """
+        Whether another log may have become newer than the one found last time,
+        because that one hasn't been written to since, and it is time to look
+        """
+        if self._latest is None:
+            return False
+        try:
+            latest_mtime = os.stat(self._latest).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        if latest_mtime != self._latest_mtime:
+            self._latest_mtime = latest_mtime
+            return False
+        return time.monotonic() - self._last_scan >= self.rescan_interval
+
+    def _scan(self) -> tuple[Optional[Path], Optional[int]]:
+        self.scans += 1
+        latest_path = None
+        latest_mtime = None
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                except FileNotFoundError:
+                    # It was removed while I was looking
+                    continue
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_path = entry.path
+                    latest_mtime = mtime
+        if latest_path is None:
+            return None, None
+        return Path(latest_path), latest_mtime
@@ -0,0 +1,150 @@
+import atexit
+import logging
+import queue
+import threading
+from collections import Counter
+from typing import Optional
+
+from .configuration import Configuration
+
+
+class LogQueue:
+    """
+    A bounded queue that MultiLogger instances put their log records on, instead
+    of writing them to the log file and terminal themselves. One background thread
+    takes the records off and hands them to the handlers of the logger they came
+    from, so a slow disk or terminal holds up that thread rather than the parsers.
+
+    A thread logging never waits. When the queue is more than half full, only one
+    in every debug_sample DEBUG records is kept, and when it is full any record is
+    dropped. The records that are dropped are counted, by level.
+    """
+
+    def __init__(self, maxsize: int = None, debug_sample: int = None):
+        if maxsize is None:
+            maxsize = Configuration.log_queue_size
+        if debug_sample is None:
+            debug_sample = Configuration.log_debug_sample
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._sample_above = maxsize // 2
+        self._debug_sample = max(debug_sample, 1)
+        self._debug_count: int = 0
+
+        # The handlers to write the records from each logger to, by logger name
+        self._handlers: dict[str, list[logging.Handler]] = {}
+
+        self._lock = threading.Lock()
+        self.dropped: Counter = Counter()
+        self.sampled: int = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def add_handlers(self, name: str, handlers: list[logging.Handler]) -> None:
+        """
+        Have the records from the logger called name written to handlers
+        """
+        with self._lock:
+            self._handlers[name] = self._handlers.get(name, []) + handlers
+
+    def handler(self) -> logging.Handler:
+        """
+        Return a handler that puts the records for a logger on this queue
+        """
+        return _QueueHandler(self)
+
+    def put(self, record: logging.LogRecord) -> None:
+        if (
+            record.levelno <= logging.DEBUG
+            and self._queue.qsize() >= self._sample_above
+        ):
+            with self._lock:
+                self._debug_count += 1
+                if self._debug_count % self._debug_sample:
+                    self.sampled += 1
+                    return
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return how many records are waiting, how many DEBUG records were sampled
+        out, and how many were dropped at each level
+        """
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "sampled": self.sampled,
+                **{f"dropped_{level}": count for level, count in self.dropped.items()},
+            }
+
+    def start(self) -> None:
+        """
+        Start the thread that writes the records, and have the ones still queued
+        written when the program exits
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="LogQueue", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """
+        Write everything already queued, then stop the thread
+        """
+        if self._thread is None:
+            return
+        # Wait for room for the marker, so that nothing queued before it is lost
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            for handler in self._handlers.get(record.name, ()):
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+
+class _QueueHandler(logging.Handler):
+    def __init__(self, log_queue: LogQueue):
+        super().__init__()
+        self._log_queue = log_queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Do the formatting that needs the arguments here, so the record can be
+            # written by the other thread without them
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._log_queue.put(record)
+        except Exception:
+            self.handleError(record)
+
+
+_log_queue: Optional[LogQueue] = None
+_log_queue_lock = threading.Lock()
+
+
+def get_log_queue() -> LogQueue:
+    """
+    Return the LogQueue that all of the MultiLogger instances share, starting it
+    the first time
+    """
+    global _log_queue
+    with _log_queue_lock:
+        if _log_queue is None:
+            _log_queue = LogQueue()
+            _log_queue.start()
+        return _log_queue
@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import BinaryIO, Callable, Optional
+
+# How much of a log file to read at once. Much bigger blocks are slower, since
+# they no longer fit in the CPU cache while being split and decoded
+DEFAULT_BLOCK_SIZE: int = 64 * 1024
+
+
+class TailReader:
+    """
+    Reads the new lines of a log file that is still being written, in large binary
+    blocks rather than a readline() at a time.
+
+    When the monitor has been asleep, or is starting up, there can be hundreds of
+    thousands of lines waiting, and reading them a block at a time means one read
+    and one decode per block instead of per line. A line that Backblaze hasn't
+    finished writing is kept back, still as bytes, until the rest of it arrives,
+    so a multibyte character split across two reads is never decoded in halves.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+    ):
+        """
+        :param file: The log file, opened in binary mode and positioned where the
+            reading should start
+        :param block_size: How many bytes to read at a time
+        :param encoding: The encoding of the log file
+        :param errors: How to handle bytes that can't be decoded
+        """
+        self._file = file
+        self._block_size = block_size
+        self._encoding = encoding
+        self._errors = errors
+        self._partial = b""
+
+        # The offset in the file just past the last complete line read
+        self.offset: int = file.tell()
+
+    def read_lines(self) -> list[str]:
+        """
+        Read the next block of the file, and return the complete lines in it,
+        without their line endings. Catching up on a large backlog takes several
+        calls, so that it doesn't all have to be held in memory at once.
+
+        :return: The new lines, or an empty list once the end of the file has been
+            reached
+        """
+        while True:
+            block = self._file.read(self._block_size)
+            if not block:
+                return []
+
+            data = self._partial + block if self._partial else block
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                # No complete line yet, so keep reading
+                self._partial = data
+                continue
+
+            self._partial = data[end:]
+            self.offset += end
+            return data[: end - 1].decode(self._encoding, self._errors).split("\n")
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of bytes of an unfinished line waiting for the rest of it
+        """
+        return len(self._partial)
+
+
+def find_first_line_since(
+    file: BinaryIO, since: datetime, parse: Callable[[str], Optional[datetime]]
+) -> int:
+    """
+    Binary search a log file, whose lines are in timestamp order, for the first line
+    with a timestamp at or after since, without reading the lines before it.
+
+    Lines without a timestamp are kept with the line after them. If every line is
+    older than since, the end of the file is returned.
+
+    :param file: The log file, opened in binary mode
+    :param since: The earliest timestamp wanted
+    :param parse: Returns the timestamp of a line, or None if it doesn't have one
+    :return: The byte offset of the start of the line
+    """
+    # All the lines that start before low are older than since, and none of the
+    # lines that start at or after high are. low is always the start of a line.
+    low = 0
+    high = file.seek(0, 2)
+    while low < high:
+        middle = (low + high) // 2
+
+        # Find the start of the first line at or after the middle
+        if middle == low:
+            line_start = low
+        else:
+            file.seek(middle - 1)
+            file.readline()
+            line_start = file.tell()
+
+        # and then the first line from there that has a timestamp
+        file.seek(line_start)
+        line_end = line_start
+        line_time = None
+        while line_time is None and line_end < high:
+            line = file.readline()
+            if not line:
+                break
+            line_end += len(line)
+            line_time = parse(line.decode("utf-8", "replace"))
+
+        if line_time is None:
+            # Nothing from the middle up to high has a timestamp
+            high = middle if line_start >= high else line_start
+        elif line_time < since:
+            low = line_end
+        else:
+            high = line_start
+    return low
@@ -0,0 +1,89 @@
+import threading
+from array import array
+from typing import Iterator, Optional
+
+
+class PathTable:
+    """
+    Interns file paths, giving each one an integer id.
+
+    Almost every file on the to_do list shares a long directory prefix with the
+    files around it (/Volumes/CameraHDD/SecuritySpy/<camera>/<date>/), so each
+    directory is stored only once, and a path is stored as the id of its directory
+    plus its base name. Looking up a path hashes its directory and base name once
+    each, and the full path string is only rebuilt when it is asked for.
+    """
+
+    def __init__(self) -> None:
+        # Directories, including the trailing "/", by directory id
+        self._directories: list[str] = []
+
+        # The directory id and base name of each path, by path id
+        self._path_directories: array = array("l")
+        self._path_names: list[str] = []
+
+        # The path ids of the files in each directory, by directory and base name
+        self._ids: dict[str, tuple[int, dict[str, int]]] = {}
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._path_names)
+
+    def __getitem__(self, path_id: int) -> str:
+        return (
+            self._directories[self._path_directories[path_id]]
+            + self._path_names[path_id]
+        )
+
+    def __contains__(self, path: str) -> bool:
+        return self.find(path) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[path_id] for path_id in range(len(self)))
+
+    @staticmethod
+    def _split(path: str) -> tuple[str, str]:
+        split_point = path.rfind("/") + 1
+        return path[:split_point], path[split_point:]
+
+    def find(self, path: str) -> Optional[int]:
+        """
+        Return the id of the path, or None if it hasn't been interned
+        """
+        directory, name = self._split(path)
+        directory_entry = self._ids.get(directory)
+        if directory_entry is None:
+            return None
+        return directory_entry[1].get(name)
+
+    def intern(self, path: str) -> int:
+        """
+        Return the id of the path, adding it to the table if it is new
+        """
+        directory, name = self._split(path)
+        with self._lock:
+            directory_entry = self._ids.get(directory)
+            if directory_entry is None:
+                directory_entry = (len(self._directories), {})
+                self._directories.append(directory)
+                self._ids[directory] = directory_entry
+
+            directory_id, names = directory_entry
+            path_id = names.get(name)
+            if path_id is None:
+                path_id = len(self._path_names)
+                self._path_directories.append(directory_id)
+                self._path_names.append(name)
+                names[name] = path_id
+            return path_id
+
+    def directory(self, path_id: int) -> str:
+        return self._directories[self._path_directories[path_id]]
+
+    def name(self, path_id: int) -> str:
+        return self._path_names[path_id]
+
+    @property
+    def directory_count(self) -> int:
+        return len(self._directories)
@@ -0,0 +1,82 @@
+from array import array
+from itertools import accumulate
+from typing import Iterable
+
+
+class FenwickTree:
+    """
+    A Fenwick (binary indexed) tree over a list of integers that can grow, so that
+    the sum of any range of positions, and a change to any one value, take
+    O(log n) rather than a pass over the list.
+
+    Node i (counting from 1) holds the sum of the values in positions
+    (i - lowbit(i), i], where lowbit(i) is the lowest set bit of i.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._tree: array = array("q", [0])
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def append(self, value: int) -> None:
+        tree = self._tree
+        node = len(tree)
+        low = node - (node & -node)
+
+        # The nodes below this one that cover (low, node - 1]
+        total = value
+        child = node - 1
+        while child > low:
+            total += tree[child]
+            child -= child & -child
+        tree.append(total)
+
+    def extend(self, values: Iterable[int]) -> None:
+        """
+        Append many values in O(k + log² n), by working out each new node from
+        the running total of the new values
+        """
+        base = len(self)
+        prefix = list(accumulate(values, initial=self.prefix(base)))
+        self._tree.extend(
+            prefix[node - base]
+            - (prefix[low - base] if low >= base else self.prefix(low))
+            for node in range(base + 1, base + len(prefix))
+            for low in (node - (node & -node),)
+        )
+
+    def add(self, position: int, delta: int) -> None:
+        """
+        Add delta to the value at position
+        """
+        tree = self._tree
+        node = position + 1
+        size = len(tree)
+        while node < size:
+            tree[node] += delta
+            node += node & -node
+
+    def prefix(self, stop: int) -> int:
+        """
+        Sum of the values in positions [0, stop)
+        """
+        tree = self._tree
+        node = min(stop, len(tree) - 1)
+        total = 0
+        while node > 0:
+            total += tree[node]
+            node -= node & -node
+        return total
+
+    def range_sum(self, start: int, stop: int) -> int:
+        """
+        Sum of the values in positions [start, stop)
+        """
+        if start >= stop:
+            return 0
+        return self.prefix(stop) - self.prefix(start)
+
+    def clear(self) -> None:
+        del self._tree[1:]
@@ -25,7 +25,9 @@ from icecream import ic, install
 
 from .backup_file import BackupFile
 from .bz_data_table_model import BzDataTableModel
+from .checkpoint import CheckpointStore
 from .chunk_model import ChunkModel
+from .configuration import Configuration
 from .dev_debug import DevDebug
 from .exceptions import CurrentFileNotSet
 from .progress_box import ProgressBox
@@ -34,6 +36,7 @@ from .signals import Signals
 from .to_do_dialog import ToDoDialog
 from .to_do_dialog_model import ToDoDialogModel
 from .to_do_files import ToDoFiles
+from .update_bus import UpdateBus
 from .utils import MultiLogger
 from .worker_to_do import ToDoWorker
 
@@ -92,6 +95,11 @@ class QTBackupStatus(QMainWindow, Ui_MainWindow):
         self.debug.disable("bz_prepare.show_line")
         self.debug.disable("lastfilestransmitted.show_line")
 
+        # Set up the checkpoints, so the log tailers can resume after a restart
+
+        self.checkpoints = CheckpointStore()
+        self.checkpoints.start()
+
         # Set up the system icon, for the task bar
 
         icon_path = os.path.join(
@@ -110,6 +118,10 @@ class QTBackupStatus(QMainWindow, Ui_MainWindow):
         self.signals = Signals()
         self.define_signals()
 
+        # The parts of the display that the other threads have changed, updated
+        # together by update_timer once the models are set up
+        self.updates = UpdateBus()
+
         # Set up data elements
 
         self.previous_file_name = None
@@ -253,6 +265,19 @@ class QTBackupStatus(QMainWindow, Ui_MainWindow):
         interval_timer.timeout.connect(self.result_data.update_interval)
         interval_timer.start(1000)  # 1 second
 
+        # Update the parts of the display that have changed, at most once each
+        # per tick, however many times they were changed
+        self.updates.connect(UpdateBus.CHUNK_GRID, self.chunk_model.update_grid)
+        self.updates.connect(UpdateBus.PROGRESS, self.signals.calculate_progress.emit)
+        self.updates.connect(UpdateBus.FILES, self.signals.files_updated.emit)
+        self.updates.connect(UpdateBus.RESULT_ROWS, self.result_data.layoutChanged.emit)
+        self.updates.connect(UpdateBus.TABLE_POSITION, self.reposition_table)
+
+        self.update_timer = QTimer()
+        self.update_timer.setObjectName("UpdateBus")
+        self.update_timer.timeout.connect(self.updates.flush)
+        self.update_timer.start(Configuration.ui_update_interval)
+
     def define_signals(self):
         self.signals.backup_running.connect(self.set_window_title)
 
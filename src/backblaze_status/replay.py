@@ -0,0 +1,224 @@
+"""
+Replay recorded Backblaze logs through the log parsers, without a live Backblaze
+install or a GUI, and report how fast they were processed.
+
+    python -m backblaze_status.replay --to-do tests/bz_todo_20240202_0.dat \
+        --last-files-transmitted 28.log --transmit 20240202.log --speed 0
+"""
+import heapq
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Optional
+
+import click
+
+from .bz_last_files_transmitted import BzLastFilesTransmitted
+from .bz_prepare import BzPrepare
+from .bz_transmit import BzTransmit
+from .configuration import Configuration
+from .headless import HeadlessBackupStatus
+from .timestamps import parse_line_timestamp
+from .to_do_parser import parse_to_do_file
+from .to_do_store import ToDoStore
+
+
+class ReplayBackupStatus(HeadlessBackupStatus):
+    """
+    A HeadlessBackupStatus that counts how many times each event is emitted
+    """
+
+    def __init__(self, checkpoint_directory: str):
+        super().__init__(Path(checkpoint_directory) / "checkpoints")
+        self.events_emitted: Counter = Counter()
+        for event in self.events():
+            event.connect(partial(self._count, event.name))
+        self.debug.disable("bz_prepare.show_line")
+        self.debug.disable("lastfilestransmitted.show_line")
+
+    def _count(self, name: str, *args) -> None:
+        self.events_emitted[name] += 1
+
+
+@dataclass
+class ReplayResult:
+    lines: Counter = field(default_factory=Counter)
+    events: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+    peak_memory: int = 0
+
+    @property
+    def total_lines(self) -> int:
+        return sum(self.lines.values())
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.events.values())
+
+
+def _peak_memory() -> int:
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _read_stream(
+    name: str, log_file: Path, utc: bool, stream_index: int
+) -> Iterator[tuple[datetime, int, int, str, str]]:
+    """
+    Yield the lines of a log with the time they were written, for merging the logs
+    into one stream. Lines without a timestamp have the time of the line before.
+    """
+    line_time = datetime.min
+    with log_file.open("rb") as log_fd:
+        for line_number, raw_line in enumerate(log_fd):
+            line = raw_line.decode("utf-8", "replace")
+            timestamp = parse_line_timestamp(line, utc=utc)
+            if timestamp is not None:
+                # Compare everything as naive local time
+                line_time = timestamp.replace(tzinfo=None) if utc else timestamp
+            yield line_time, stream_index, line_number, name, line
+
+
+def run_replay(
+    to_do_file: Path,
+    last_files_transmitted: Optional[Path] = None,
+    transmit: Optional[Path] = None,
+    prepare: Optional[Path] = None,
+    speed: float = 0.0,
+) -> ReplayResult:
+    """
+    Feed the recorded logs through the parsers, in timestamp order.
+
+    The bz_todo_for_chunks file for BzPrepare has no timestamps, so its lines are
+    replayed first, against the first file on the to_do list.
+
+    :param to_do_file: The to_do file to load the to_do list from
+    :param last_files_transmitted: A recorded lastfilestransmitted log
+    :param transmit: A recorded bztransmit log
+    :param prepare: A recorded bz_todo_for_chunks.dat
+    :param speed: Replay at this many times the speed the logs were written, or as
+        fast as possible if it is 0
+    :return: The lines processed and signals emitted, and how long it took
+    """
+    # The recorded logs are older than the window that the parsers normally
+    # ignore lines outside of. It is put back afterwards, since it is shared by
+    # everything in the process.
+    backfill_window = Configuration.backfill_window
+    Configuration.backfill_window = sys.maxsize
+    try:
+        with tempfile.TemporaryDirectory() as checkpoint_directory:
+            backup_status = ReplayBackupStatus(checkpoint_directory)
+            result = ReplayResult(events=backup_status.events_emitted)
+
+            to_do = ToDoStore(backup_status)
+            to_do._add_to_do_entries(parse_to_do_file(to_do_file))
+
+            last_files = BzLastFilesTransmitted(backup_status)
+            last_files.to_do_files = to_do
+            bz_transmit = BzTransmit(backup_status)
+            bz_transmit.to_do = to_do
+            bz_prepare = BzPrepare(backup_status)
+            bz_prepare.to_do_files = to_do
+
+            start = time.perf_counter()
+
+            if prepare is not None:
+                if to_do.current_file is None and len(to_do) > 0:
+                    to_do.current_file = to_do[0]
+                with prepare.open("rb") as prepare_fd:
+                    for raw_line in prepare_fd:
+                        bz_prepare._process_line(raw_line.decode("utf-8", "replace"), 0)
+                        result.lines["bz_prepare"] += 1
+
+            streams = []
+            if last_files_transmitted is not None:
+                streams.append(
+                    _read_stream(
+                        "lastfilestransmitted", last_files_transmitted, False, 0
+                    )
+                )
+            if transmit is not None:
+                streams.append(_read_stream("bztransmit", transmit, True, 1))
+
+            first_time: Optional[datetime] = None
+            replay_start = time.perf_counter()
+            for line_time, _, _, name, line in heapq.merge(*streams):
+                if speed > 0 and line_time != datetime.min:
+                    if first_time is None:
+                        first_time = line_time
+                    delay = (line_time - first_time).total_seconds() / speed - (
+                        time.perf_counter() - replay_start
+                    )
+                    if delay > 0:
+                        time.sleep(delay)
+
+                if name == "lastfilestransmitted":
+                    last_files._process_line(line, 0)
+                else:
+                    bz_transmit._process_line(line)
+                result.lines[name] += 1
+
+            result.elapsed = time.perf_counter() - start
+            result.peak_memory = _peak_memory()
+    finally:
+        Configuration.backfill_window = backfill_window
+    return result
+
+
+@click.command()
+@click.option(
+    "--to-do",
+    "to_do_file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="The bz_todo file to load the to_do list from",
+)
+@click.option(
+    "--last-files-transmitted",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="A recorded lastfilestransmitted log",
+)
+@click.option(
+    "--transmit",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="A recorded bztransmit log",
+)
+@click.option(
+    "--prepare",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="A recorded bz_todo_for_chunks.dat",
+)
+@click.option(
+    "--speed",
+    default=0.0,
+    help="Replay at this many times real time, or 0 for as fast as possible",
+)
+def main(
+    to_do_file: Path,
+    last_files_transmitted: Optional[Path],
+    transmit: Optional[Path],
+    prepare: Optional[Path],
+    speed: float,
+) -> None:
+    result = run_replay(to_do_file, last_files_transmitted, transmit, prepare, speed)
+
+    elapsed = max(result.elapsed, 1e-9)
+    for name, count in sorted(result.lines.items()):
+        print(f"{name:22} {count:12,} lines")
+    print(f"{'total':22} {result.total_lines:12,} lines in {result.elapsed:.3f}s")
+    print(f"{'':22} {result.total_lines / elapsed:12,.0f} lines/s")
+    print(f"{'':22} {result.total_events / elapsed:12,.0f} events/s")
+    for name, count in sorted(result.events.items()):
+        print(f"  {name:30} {count:10,}")
+    print(f"peak memory            {result.peak_memory / 1024 / 1024:12,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+from typing import Optional
+
+
+class ReadWriteLock:
+    """
+    A pure Python stand in for QReadWriteLock, with the same lockForRead(),
+    lockForWrite() and unlock(), so that the to_do list can be used without Qt.
+
+    Any number of threads can hold it for reading, or one thread for writing. It
+    is always recursive: a thread that holds it can lock it again, in either mode
+    if it holds it for writing, and must unlock it as many times. Once a thread is
+    waiting to write, no new readers are let in, so that a steady stream of
+    readers can't keep a writer out forever.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        # How many times each reading thread holds the lock
+        self._readers: dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth: int = 0
+        self._writers_waiting: int = 0
+
+    def lockForRead(self) -> None:
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            count = self._readers.get(me)
+            if count is not None:
+                # Already reading, so don't wait behind a waiting writer, which
+                # would be waiting for me
+                self._readers[me] = count + 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers[me] = 1
+
+    def lockForWrite(self) -> None:
+        """
+        :raises RuntimeError: If the thread already holds the lock for reading,
+            since waiting for the other readers could deadlock
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Can't lock for writing while holding a read lock")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def unlock(self) -> None:
+        """
+        :raises RuntimeError: If the thread doesn't hold the lock
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._condition.notify_all()
+                return
+
+            count = self._readers.get(me)
+            if count is None:
+                raise RuntimeError("Unlocking a lock that isn't held")
+            if count > 1:
+                self._readers[me] = count - 1
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._condition.notify_all()
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+# The logs are written many lines a second, so only the last few timestamps are
+# worth remembering
+TIMESTAMP_CACHE_SIZE: int = 64
+
+
+def line_timestamp(line: str) -> str:
+    """
+    Return the timestamp at the start of a Backblaze log line, which is either
+    YYYY-MM-DD HH:MM:SS or YYYYMMDDHHMMSS
+    """
+    if line[4] == "-":
+        return line[0:19]
+    return line[0:14]
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp(timestamp: str) -> datetime:
+    """
+    Convert a YYYY-MM-DD HH:MM:SS or YYYYMMDDHHMMSS timestamp to a naive datetime.
+
+    The fields are always in the same place, so they are sliced out directly
+    rather than going through strptime, and since consecutive lines nearly always
+    share the same second, the last few results are cached.
+
+    :param timestamp: The timestamp string
+    :return: The timestamp as a datetime, with no timezone
+    :raises ValueError: If the timestamp is not in either format
+    """
+    if len(timestamp) == 19 and timestamp[4] == "-":
+        return datetime(
+            int(timestamp[0:4]),
+            int(timestamp[5:7]),
+            int(timestamp[8:10]),
+            int(timestamp[11:13]),
+            int(timestamp[14:16]),
+            int(timestamp[17:19]),
+        )
+    if len(timestamp) == 14 and timestamp.isdigit():
+        return datetime(
+            int(timestamp[0:4]),
+            int(timestamp[4:6]),
+            int(timestamp[6:8]),
+            int(timestamp[8:10]),
+            int(timestamp[10:12]),
+            int(timestamp[12:14]),
+        )
+    raise ValueError(f"Unrecognized timestamp: '{timestamp}'")
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_utc_timestamp(timestamp: str) -> datetime:
+    """
+    Convert a UTC timestamp, like the ones in the bztransmit logs, to an aware
+    datetime in the local timezone
+    """
+    return (
+        parse_timestamp(timestamp).replace(tzinfo=timezone.utc).astimezone(tz=None)
+    )
+
+
+def parse_line_timestamp(line: str, utc: bool = False) -> Optional[datetime]:
+    """
+    Return the timestamp at the start of a log line, or None if the line doesn't
+    start with one
+
+    :param line: The log line
+    :param utc: If the log is in UTC, like bztransmit, convert the timestamp to an
+        aware datetime in the local timezone
+    """
+    try:
+        if utc:
+            return parse_utc_timestamp(line_timestamp(line))
+        return parse_timestamp(line_timestamp(line))
+    except (ValueError, IndexError):
+        return None
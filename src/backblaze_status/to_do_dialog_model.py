@@ -39,7 +39,6 @@ class ToDoDialogFile:
     index: int
     file_size: int
     file_name: str
-    total_backup_size: int
 
 
 class ToDoDialogModel(QAbstractTableModel):
@@ -126,7 +125,10 @@ class ToDoDialogModel(QAbstractTableModel):
                     case ColumnNames.FILE_NAME:
                         return str(row_data.file_name)
                     case ColumnNames.TOTAL_BACKUP_SIZE:
-                        return file_size_string(row_data.total_backup_size)
+                        # The size of this file and all of the files before it
+                        return file_size_string(
+                            self.to_do.to_do_file_list.size_total(0, row_data.index + 1)
+                        )
                     case _:
                         return
 
@@ -152,15 +154,13 @@ class ToDoDialogModel(QAbstractTableModel):
         if self.to_do is None:
             return
 
+        # Read the names and sizes straight from the list, so that a BackupFile
+        # doesn't have to be created for every file on it
         result_list = []
-        total_backup_size = 0
-        for index, file in enumerate(
-            self.to_do.to_do_file_list
-        ):  # type: int, BackupFile
-            total_backup_size += file.file_size
-            to_do_file = ToDoDialogFile(
-                index, file.file_size, str(file.file_name), total_backup_size
-            )
+        for index, (file_name, file_size) in enumerate(
+            self.to_do.to_do_file_list.entries()
+        ):
+            to_do_file = ToDoDialogFile(index, file_size, file_name)
             result_list.append(to_do_file)
         self.display_cache = result_list
 
@@ -0,0 +1,164 @@
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+# To do files at least this big are split up and parsed by a pool of processes
+PARALLEL_THRESHOLD: int = 64 * 1024 * 1024
+
+# The smallest piece of the file worth handing to a separate process
+MINIMUM_RANGE_SIZE: int = 8 * 1024 * 1024
+
+
+@dataclass
+class ToDoEntries:
+    """
+    The files read from a to_do file, in file order. The names and sizes are kept
+    in two parallel columns rather than a list of objects, so that parsing a very
+    large to_do file doesn't need an object per line.
+    """
+
+    names: list[str] = field(default_factory=list)
+    sizes: array = field(default_factory=lambda: array("q"))
+
+    # The byte offset just past the last complete line that was parsed
+    end: int = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _parse_lines(data: bytes) -> tuple[list[bytes], array]:
+    """
+    Split a block of complete to_do lines into the filenames and file sizes
+    """
+    names = []
+    sizes = array("q")
+    for line in data.split(b"\n"):
+        fields = line.split(b"\t", 5)
+        if len(fields) != 6:
+            continue
+        names.append(fields[5].rstrip())
+        sizes.append(int(fields[4]))
+    return names, sizes
+
+
+def _parse_range(file_name: str, start: int, end: int) -> tuple[int, bytes, bytes]:
+    """
+    Parse the lines between two byte offsets in a separate process. The results
+    are sent back as the number of files and two flat byte strings, the newline
+    separated filenames and the raw sizes array, since those are much cheaper to
+    pass between processes than lists of objects. The count is needed to tell a
+    single empty filename from no filenames at all.
+    """
+    with open(file_name, "rb") as tdf:
+        with mmap.mmap(tdf.fileno(), 0, access=mmap.ACCESS_READ) as to_do_map:
+            data = to_do_map[start:end]
+
+    names, sizes = _parse_lines(data)
+    return len(names), b"\n".join(names), sizes.tobytes()
+
+
+def _split_ranges(
+    to_do_map: mmap.mmap, start: int, end: int, parts: int
+) -> list[tuple[int, int]]:
+    """
+    Split the bytes from start to end into about equal ranges, each of which ends
+    just after a newline
+    """
+    boundaries = [start]
+    step = (end - start) // parts
+    for part in range(1, parts):
+        boundary = to_do_map.find(b"\n", start + part * step, end) + 1
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    if boundaries[-1] != end:
+        boundaries.append(end)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _parse_parallel(
+    file_name: str, ranges: list[tuple[int, int]], entries: ToDoEntries
+) -> None:
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        # map() returns the results in the order of the ranges, so the files stay
+        # in to_do file order
+        results = executor.map(
+            _parse_range,
+            [file_name] * len(ranges),
+            [range_start for range_start, _ in ranges],
+            [range_end for _, range_end in ranges],
+        )
+        for count, names, sizes in results:
+            if count:
+                entries.names.extend(names.decode("utf-8", "replace").split("\n"))
+            entries.sizes.frombytes(sizes)
+
+
+def parse_to_do_file(
+    file_name: str | Path, start: int = 0, parallel: Optional[bool] = None
+) -> ToDoEntries:
+    """
+    Parse a to_do file from the byte offset start to the last complete line.
+
+    The file is memory mapped, and split on newlines and tabs at the byte level,
+    so the only per-line Python work is converting the size and decoding the
+    filename. A line that doesn't end in a newline is still being written by
+    Backblaze, so it is left for the next read.
+
+    If there are more than PARALLEL_THRESHOLD bytes to read, the file is split
+    into ranges on line boundaries which are parsed by a pool of processes, and
+    then put back together in file order.
+
+    The lines look like this (tab separated), and the fields that I care about
+    are the fifth, the file size, and the sixth, the filename:
+
+    1	+	000000000056c8d6	0000018d671d7400	8172	/Volumes/CameraHDD/...
+
+    :param file_name: The to_do file to read
+    :param start: The byte offset to start reading from
+    :param parallel: Force the parallel parse on or off. By default it is used
+        when there is more than PARALLEL_THRESHOLD bytes to read.
+    :return: The entries that were read, and the offset the next read starts at
+    """
+    entries = ToDoEntries(end=start)
+    ranges = []
+
+    with open(file_name, "rb") as tdf:
+        if os.fstat(tdf.fileno()).st_size <= start:
+            return entries
+
+        with mmap.mmap(tdf.fileno(), 0, access=mmap.ACCESS_READ) as to_do_map:
+            end = to_do_map.rfind(b"\n", start) + 1
+            if end == 0:
+                return entries
+
+            if parallel is None:
+                parallel = end - start >= PARALLEL_THRESHOLD
+            workers = min(os.cpu_count() or 1, (end - start) // MINIMUM_RANGE_SIZE)
+            if parallel and workers > 1:
+                ranges = _split_ranges(to_do_map, start, end, workers)
+            else:
+                data = to_do_map[start:end]
+
+    if ranges:
+        try:
+            _parse_parallel(str(file_name), ranges, entries)
+            entries.end = end
+            return entries
+        except (BrokenProcessPool, OSError):
+            # Fall back to parsing it all in this process
+            entries = ToDoEntries(end=start)
+            with open(file_name, "rb") as tdf:
+                tdf.seek(start)
+                data = tdf.read(end - start)
+
+    names, sizes = _parse_lines(data)
+    entries.names = [name.decode("utf-8", "replace") for name in names]
+    entries.sizes = sizes
+    entries.end = end
+    return entries
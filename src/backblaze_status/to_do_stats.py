@@ -0,0 +1,150 @@
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .configuration import Configuration
+
+if TYPE_CHECKING:
+    from .backup_file import BackupFile
+
+
+@dataclass(frozen=True)
+class ToDoStats:
+    """
+    The statistics of the to_do list and the files completed in the current run,
+    all read at the same time
+    """
+
+    total_size: int
+    total_large_size: int
+    total_regular_size: int
+    total_file_count: int
+    total_large_file_count: int
+    total_regular_file_count: int
+    total_chunk_count: int
+
+    completed_size: int
+    completed_chunk_count: int
+    completed_chunk_size: int
+    transmitted_file_count: int
+    transmitted_file_size: int
+    transmitted_chunk_count: int
+    transmitted_chunk_size: int
+    duplicate_file_count: int
+    duplicate_file_size: int
+    duplicate_chunk_count: int
+    duplicate_chunk_size: int
+
+    @property
+    def transmitted_size(self) -> int:
+        return self.transmitted_file_size + self.transmitted_chunk_size
+
+    @property
+    def duplicate_size(self) -> int:
+        return self.duplicate_file_size + self.duplicate_chunk_size
+
+
+@dataclass
+class RunTotals:
+    """
+    Running totals of the files completed in one run of the backup.
+
+    A file is added when it is completed, and from then on the BackupFile adds the
+    chunks it is told about, so that the statistics never need to go through the
+    completed file list.
+    """
+
+    run: int
+    completed_size: int = 0
+    transmitted_file_count: int = 0
+    transmitted_file_size: int = 0
+    duplicate_file_count: int = 0
+    duplicate_file_size: int = 0
+    # The transmitted chunks of the files that aren't deduped, and of the large
+    # files, which are what the chunk counts and chunk sizes have always counted
+    transmitted_chunk_count: int = 0
+    large_transmitted_chunk_count: int = 0
+    duplicate_chunk_count: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_file(self, backup_file: "BackupFile") -> None:
+        with self._lock:
+            self.completed_size += backup_file.file_size
+            if not backup_file.is_large_file:
+                if backup_file.is_deduped:
+                    self.duplicate_file_count += 1
+                    self.duplicate_file_size += backup_file.file_size
+                else:
+                    self.transmitted_file_count += 1
+                    self.transmitted_file_size += backup_file.file_size
+
+            transmitted = len(backup_file.transmitted_chunks)
+            if not backup_file.is_deduped:
+                self.transmitted_chunk_count += transmitted
+            if backup_file.is_large_file:
+                self.large_transmitted_chunk_count += transmitted
+                self.duplicate_chunk_count += backup_file.deduped_count
+        backup_file.run_totals = self
+
+    def add_chunk(
+        self, backup_file: "BackupFile", deduped: bool, was_transmitted: bool = False
+    ) -> None:
+        """
+        Count a chunk added to a file that was already completed. A chunk that was
+        transmitted and is now deduped stops being counted as transmitted.
+        """
+        with self._lock:
+            if deduped:
+                if was_transmitted:
+                    if not backup_file.is_deduped:
+                        self.transmitted_chunk_count -= 1
+                    if backup_file.is_large_file:
+                        self.large_transmitted_chunk_count -= 1
+                if backup_file.is_large_file:
+                    self.duplicate_chunk_count += 1
+                return
+            if not backup_file.is_deduped:
+                self.transmitted_chunk_count += 1
+            if backup_file.is_large_file:
+                self.large_transmitted_chunk_count += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """
+        Return the totals, all read at the same time, with the names ToDoStats
+        uses for them
+        """
+        chunk_size = Configuration.default_chunk_size
+        with self._lock:
+            completed_chunk_count = (
+                self.large_transmitted_chunk_count + self.duplicate_chunk_count
+            )
+            return {
+                "completed_size": self.completed_size,
+                "completed_chunk_count": completed_chunk_count,
+                "completed_chunk_size": completed_chunk_count * chunk_size,
+                "transmitted_file_count": self.transmitted_file_count,
+                "transmitted_file_size": self.transmitted_file_size,
+                "transmitted_chunk_count": self.transmitted_chunk_count,
+                "transmitted_chunk_size": self.large_transmitted_chunk_count
+                * chunk_size,
+                "duplicate_file_count": self.duplicate_file_count,
+                "duplicate_file_size": self.duplicate_file_size,
+                "duplicate_chunk_count": self.duplicate_chunk_count,
+                "duplicate_chunk_size": self.duplicate_chunk_count * chunk_size,
+            }
+
+    @property
+    def completed_chunk_count(self) -> int:
+        return self.large_transmitted_chunk_count + self.duplicate_chunk_count
+
+    @property
+    def completed_chunk_size(self) -> int:
+        return self.completed_chunk_count * Configuration.default_chunk_size
+
+    @property
+    def transmitted_chunk_size(self) -> int:
+        return self.large_transmitted_chunk_count * Configuration.default_chunk_size
+
+    @property
+    def duplicate_chunk_size(self) -> int:
+        return self.duplicate_chunk_count * Configuration.default_chunk_size
@@ -0,0 +1,687 @@
+import hashlib
+import os
+import threading
+import time
+from array import array
+from dataclasses import field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .backup_file import BackupFile
+from .backup_file_list import BackupFileList
+from .configuration import Configuration
+from .dev_debug import DevDebug
+from .exceptions import CompletedFileNotFound
+from .locks import Lock
+from .path_table import PathTable
+from .rwlock import ReadWriteLock
+from .to_do_parser import ToDoEntries, parse_to_do_file
+from .to_do_stats import RunTotals, ToDoStats
+from .update_bus import UpdateBus
+from .utils import MultiLogger, file_size_string
+
+
+def debug_print(message: str):
+    thread_name = threading.current_thread().name
+    date = f'{datetime.now().strftime("%Y-%m-%d %H:%M:%S")} <{thread_name}>'
+
+    print(f"{date} {message}")
+
+
+class NotFound(Exception):
+    pass
+
+
+class ToDoStore:
+    """
+    Class to store the list and status of To Do files.
+
+    This is the part of ToDoFiles that doesn't need Qt. It reports changes through
+    backup_status.signals and backup_status.updates, which can be the Qt ones from
+    QTBackupStatus, or the plain Python ones from HeadlessBackupStatus.
+    Here, mark_completed() and add_file() update the list straight away, in the
+    calling thread.
+    """
+
+    # The directory where the to_do files live
+    BZ_DIR: str = "/Library/Backblaze.bzpkg/bzdata/bzbackup/bzdatacenter/"
+
+    # How many bytes from the start of the to_do file are used to detect that
+    # Backblaze has rewritten it, rather than just appended to it
+    FINGERPRINT_SIZE: int = 4096
+
+    def __init__(self, backup_status):
+        # ToDoFiles mixes this in with QObject, which is initialized from here
+        super().__init__()
+
+        # Set up the logger and debugging
+        self._multi_log = MultiLogger(self.__class__.__name__, terminal=True)
+        self._module_name = self.__class__.__name__
+        self._multi_log.log(f"Creating {self._module_name}")
+        self.debug = DevDebug()
+
+        # An instance of the QTBackupStatus or HeadlessBackupStatus
+        self.backup_status = backup_status
+
+        # Lock object
+        self.lock: ReadWriteLock = ReadWriteLock()
+
+        # This holds the list of to do files, in order, and can also look them up by
+        # file_name. It is stored in columns, and a BackupFile is only created for a
+        # file when something asks for it.
+
+        # The file names on both lists are interned in the same table
+        self._paths: PathTable = PathTable()
+
+        self._to_do_file_list: BackupFileList = BackupFileList(self._paths)
+
+        # The _completed_files class contains the list of completed files
+        self._completed_file_list: BackupFileList = BackupFileList(self._paths)
+
+        # Storage for the modification time of the current to do file
+        self._file_modification_time: float = 0.0
+
+        # The byte offset I have read the to do file up to, and a fingerprint of
+        # the start of the file (inode, length, digest), so that when the file
+        # changes I only need to read what was appended to it
+        self._file_offset: int = 0
+        self._file_fingerprint: Optional[tuple[int, int, bytes]] = None
+        self._read_file_name: str = ""
+
+        # Flag for if the backup is currently running
+        self._backup_running: bool = False
+
+        # The current file that is being backed up
+        self._current_file: Optional[BackupFile] = None
+
+        # The current run, and the totals of the files completed in it
+        self._current_run: int = 1
+        self._run_totals: RunTotals = RunTotals(self._current_run)
+
+        # Storage for the current to_do file
+        self._to_do_file_name: str = ""
+
+        # The first file I process off the to do list. This is so that I can accurately
+        # assess the rate
+
+        self._starting_file: Optional[BackupFile] = None
+        self._starting_index: int = 0
+
+    def run(self):
+        """
+        Do the initial read of the to_do file. After this, reread_to_do_list()
+        should be called every so often to pick up changes to it.
+        """
+        self._read()
+        self.backup_status.signals.to_do_available.emit()
+
+    def __len__(self) -> int:
+        return len(self._to_do_file_list.file_list)
+
+    def __getitem__(self, index) -> BackupFile:
+        if isinstance(index, int):
+            return self._to_do_file_list.file_list[index]
+        elif isinstance(index, str):
+            return self._to_do_file_list.file_dict.get(index)
+        else:
+            raise TypeError("Invalid argument type")
+
+    def _read(self, read_existing_file: bool = False) -> None:
+        """
+        This reads the to_do file and stores it in two data structures,
+          - a dictionary so that I can find the file, and
+          - a list, so that I can see what the next files are
+
+          The structure of the file that I care about are the 6th field, which is the filename,
+          and the fifth field, which is the file size.
+
+          When re-reading a file that Backblaze has only appended to, just the new
+          lines are read.
+        :param read_existing_file: True if this is a re-read of the to_do file
+        :return:
+        """
+
+        self._to_do_file_name = self.get_to_do_file()
+
+        with Lock.DB_LOCK:
+            try:
+                file = Path(self._to_do_file_name)
+                stat = file.stat()
+                self._file_modification_time = stat.st_mtime
+            except FileNotFoundError:
+                self._mark_backup_not_running()
+                self._file_modification_time = 0
+                return
+
+            count = 0
+            try:
+                with open(file, "rb") as tdf:
+                    # If this is a re-read of a file that has only been appended
+                    # to, start where the last read left off. Otherwise, read the
+                    # whole file again.
+                    offset = 0
+                    if read_existing_file and self._is_appended(tdf, stat):
+                        offset = self._file_offset
+                    self._file_fingerprint = self._fingerprint(tdf, stat)
+
+                entries = parse_to_do_file(file, offset)
+                count = len(entries)
+                self._add_to_do_entries(entries)
+                self._file_offset = entries.end
+                self._read_file_name = self._to_do_file_name
+
+                self._backup_running = True
+                if read_existing_file:
+                    self._multi_log.log(
+                        f"Added {count:,} lines from To Do file after"
+                        f" re-reading {self._to_do_file_name}"
+                    )
+                else:
+                    self._multi_log.log(
+                        f"Read {count:,} lines from To Do file"
+                        f" {self._to_do_file_name}"
+                    )
+                self.backup_status.signals.backup_running.emit(True)
+                self.backup_status.updates.mark(UpdateBus.FILES)
+                self.backup_status.updates.mark(UpdateBus.RESULT_ROWS)
+            except:
+                pass
+
+    def _add_to_do_entries(self, entries: ToDoEntries) -> None:
+        """
+        Add the files read from the to_do file that aren't already on the list,
+        in a single bulk insert
+        """
+        known_files = self._to_do_file_list
+        new_files: dict[str, int] = {}
+        for todo_filename, todo_file_size in zip(entries.names, entries.sizes):
+            if todo_filename not in known_files and todo_filename not in new_files:
+                new_files[todo_filename] = todo_file_size
+
+        # Only the columns are filled in here. The BackupFile for each of these is
+        # created when something first asks for it.
+        self._to_do_file_list.extend_entries(
+            list(new_files.keys()), array("q", new_files.values())
+        )
+
+    def _fingerprint(self, tdf, stat: os.stat_result) -> tuple[int, int, bytes]:
+        """
+        Fingerprint the start of the to_do file, so that I can tell later if it
+        was rewritten rather than appended to
+        """
+        length = min(stat.st_size, self.FINGERPRINT_SIZE)
+        tdf.seek(0)
+        digest = hashlib.blake2b(tdf.read(length), digest_size=16).digest()
+        return stat.st_ino, length, digest
+
+    def _is_appended(self, tdf, stat: os.stat_result) -> bool:
+        """
+        Returns whether the to_do file is the same file I read last time, with
+        only new data added to the end of it
+        """
+        if (
+            self._file_fingerprint is None
+            or self._read_file_name != self._to_do_file_name
+        ):
+            return False
+
+        inode, length, digest = self._file_fingerprint
+        if stat.st_ino != inode or stat.st_size < self._file_offset:
+            # It's a different file, or it has been truncated
+            return False
+
+        tdf.seek(0)
+        head = tdf.read(length)
+        return hashlib.blake2b(head, digest_size=16).digest() == digest
+
+    def reread_to_do_list(self):
+        """
+        Checks to see if there is a new to_do file, and if there is, reread it
+        """
+        self._to_do_file_name = self.get_to_do_file()
+        if not self.backup_running and self._to_do_file_name is not None:
+            # If the backup is not running already, and there is a new to_do
+            # file, then read it after incrementing the run number
+            self._current_run += 1
+            self._run_totals = RunTotals(self._current_run)
+            self._read()
+            return
+
+        if not self.backup_running and self._to_do_file_name is None:
+            self._multi_log.log(
+                f"Backup not running. Waiting for 1 minute and trying again ..."
+            )
+            return
+
+        # If the backup is running and the to_do file name is not None, then see
+        # if we need to re-read the file because there is new data in it
+        if self.backup_running and self._to_do_file_name is not None:
+            try:
+                file = Path(self._to_do_file_name)
+                stat = file.stat()
+            except FileNotFoundError:
+                # If there is no file, then the backup is complete, then mark it
+                # as complete
+                if self.backup_running:
+                    self._mark_backup_not_running()
+                return
+
+            # Check to see if the modification time has changed. If it has,
+            # then reread the file.
+
+            if self._file_modification_time != stat.st_mtime:
+                self._multi_log.log("To Do file changed, rereading")
+                self._read(read_existing_file=True)
+
+    def _mark_backup_not_running(self):
+        self._multi_log.log("Backup Complete")
+        self._backup_running = False
+        self._to_do_file_list.clear()
+
+        # Start a new path table holding just the completed files, so that the
+        # names of files that were on the to_do list but never completed don't
+        # pile up over the runs
+        self._paths = PathTable()
+        self._completed_file_list.move_paths(self._paths)
+        self._to_do_file_list.move_paths(self._paths)
+        self._file_offset = 0
+        self._file_fingerprint = None
+        self.current_file = None
+        self._starting_file = None
+        self._starting_index = 0
+        self.backup_status.signals.backup_running.emit(False)
+        self.backup_status.updates.mark(UpdateBus.FILES)
+
+    def get_to_do_file(self) -> str:
+        """
+        Get the name of the current to_do file
+        """
+        while True:
+            to_do_file = None
+            # Get the list of to_do and done files in the directory
+            bz_files = sorted(os.listdir(self.BZ_DIR))
+            for file in bz_files:
+                if file[:7] == "bz_todo":
+                    to_do_file = f"{self.BZ_DIR}/{file}"
+
+            # If there is no to_do file, that is because the backup process is not
+            # running, so we will sleep and try again.
+            if not to_do_file:
+                self._multi_log.log(
+                    f"Backup not running. Waiting for 1 minute and trying again ..."
+                )
+                time.sleep(60)
+
+            else:
+                break
+        return to_do_file
+
+    @property
+    def current_file(self) -> BackupFile:
+        """
+        Return the file currently being backed up
+        """
+        return self._current_file
+
+    @current_file.setter
+    def current_file(self, value: BackupFile) -> None:
+        """
+        Set the file that is currently being backed up
+        """
+        self.lock.lockForWrite()
+        self._current_file = value
+        self.lock.unlock()
+
+    @property
+    def to_do_file_list(self) -> BackupFileList:  #  list[BackupFile]:
+        """
+        Return all the files that are remaining on the to_do list
+        """
+        # return self._to_do_file_list.file_list
+        return self._to_do_file_list
+
+    def get_file(self, filename: str) -> Optional[BackupFile]:
+        """
+        Get the backup file with the given filename
+        """
+        self.lock.lockForRead()
+        result = self._to_do_file_list.get(filename)
+        self.lock.unlock()
+        return result
+
+    def exists(self, filename: str) -> bool:
+        """
+        Returns whether the file is in the list
+        :param filename:
+        :return:
+        """
+
+        self.lock.lockForRead()
+        result = filename in self._to_do_file_list
+        self.lock.unlock()
+
+        return result
+
+    # No one is using this function
+    # def get_index(self, filename) -> int:
+    #     if filename in self._file_dict:
+    #         return self._file_dict[filename].list_index
+    #     else:
+    #         raise NotFound
+
+    def mark_completed(self, filename: str, notify: bool = True) -> None:
+        self._mark_completed(filename, notify)
+
+    def _mark_completed(self, filename: str, notify: bool = True) -> None:
+        """
+        Mark a file as completed
+
+        :param filename:
+        :param notify: False to leave the display alone, for a parser catching up
+            on a log, which refreshes it once with notify_files_changed() when it
+            is done
+        :return:
+        """
+        debug_print(f"received mark_completed({filename})")
+
+        completed_file: BackupFile = self.get_file(filename)
+        if completed_file is None:
+            raise CompletedFileNotFound
+
+        if self._starting_file is None:
+            self._starting_file = completed_file
+            self._starting_index = self._to_do_file_list.position(completed_file)
+
+        self.lock.lockForWrite()
+
+        completed_file.completed = True
+        completed_file.end_time = datetime.now()
+        completed_file.completed_run = self._current_run
+
+        if completed_file.start_time is not None:
+            completion_time = (
+                completed_file.end_time - completed_file.start_time
+            ).seconds
+            if completion_time == 0:
+                completed_file.rate = ""
+            else:
+                completed_file.rate = (
+                    f"{file_size_string(completed_file.file_size / completion_time)}"
+                    f" / sec"
+                )
+
+        if completed_file.is_large_file:
+            chunk_duplicate_percentage = (
+                completed_file.deduped_count / completed_file.total_chunk_count
+            )
+            if chunk_duplicate_percentage > 0.75:
+                completed_file.is_deduped_chunks = True
+
+        # Record the new state in the to_do list's columns, and put completed items
+        # on the completed file list
+
+        self._to_do_file_list.refresh(completed_file)
+        self._completed_file_list.append(completed_file)
+        self._run_totals.add_file(completed_file)
+        self.lock.unlock()
+
+        if notify:
+            self.backup_status.updates.mark(UpdateBus.PROGRESS)
+            self.backup_status.updates.mark(UpdateBus.FILES)
+            self.backup_status.updates.mark(UpdateBus.TABLE_POSITION)
+
+    def notify_files_changed(self) -> None:
+        """
+        Have everything shown about the files brought up to date, after files were
+        completed without notifying
+        """
+        self.backup_status.updates.mark(UpdateBus.PROGRESS)
+        self.backup_status.updates.mark(UpdateBus.FILES)
+        self.backup_status.updates.mark(UpdateBus.RESULT_ROWS)
+        self.backup_status.updates.mark(UpdateBus.TABLE_POSITION)
+
+    def add_file(self, filename: str, is_chunk: bool = False):
+        self._add_file(filename, is_chunk)
+
+    def _add_file(
+        self,
+        filename: str,
+        is_chunk: bool = False,
+    ):
+        """
+        Add a file that isn't on the to_do list
+        """
+        if not self.exists(filename):
+            filename_path = Path(filename)
+            self.lock.lockForWrite()
+            try:
+                _stat = filename_path.stat()
+                file_size = _stat.st_size
+            except:
+                file_size = 0
+
+            backup_file = BackupFile(
+                filename_path,
+                file_size,
+            )
+
+            # file_size > self.default_chunk_size:
+            # this is the size of the backblaze chunks
+            if is_chunk:
+                backup_file.total_chunk_count = int(
+                    file_size / Configuration.default_chunk_size
+                )
+                backup_file.is_large_file = True
+
+            self._to_do_file_list.append(backup_file)
+            self.lock.unlock()
+
+    @property
+    def completed_files(self) -> list:
+        return self._completed_file_list.file_list
+
+    @property
+    def backup_running(self) -> bool:
+        return self._backup_running
+
+    @property
+    def remaining_size(self) -> int:
+        to_do_index = self._get_to_do_index()
+        return self._to_do_file_list.size_total(to_do_index)
+
+    def remaining_file_count(self) -> int:
+        to_do_index = self._get_to_do_index()
+        return self._to_do_file_list.file_count(to_do_index)
+
+    # @property
+    # def remaining_files(self) -> list:
+    #     return self._file_list
+
+    def _get_to_do_index(self):
+        if self.current_file is not None:
+            return self._to_do_file_list.position(self.current_file)
+
+        if len(self._completed_file_list) == 0:
+            return 0
+
+        last_completed: BackupFile = self._completed_file_list[-1]
+        try:
+            index = self._to_do_file_list.position(last_completed)
+            return index + 1
+        except ValueError:
+            return 0
+
+    @property
+    def total_size(self) -> int:
+        with Lock.DB_LOCK:
+            return self._to_do_file_list.size_total()
+
+    @property
+    def total_large_size(self) -> int:
+        with Lock.DB_LOCK:
+            return self._to_do_file_list.size_total(large_file=True)
+
+    @property
+    def total_current_large_size(self) -> int:
+        with Lock.DB_LOCK:
+            return self._to_do_file_list.size_total(
+                self._starting_index, large_file=True
+            )
+
+    @property
+    def total_regular_size(self) -> int:
+        with Lock.DB_LOCK:
+            return self._to_do_file_list.size_total(large_file=False)
+
+    @property
+    def total_current_regular_size(self) -> int:
+        with Lock.DB_LOCK:
+            return self._to_do_file_list.size_total(
+                self._starting_index, large_file=False
+            )
+
+    @property
+    def total_file_count(self) -> int:
+        with Lock.DB_LOCK:
+            file_count = len(self._to_do_file_list)
+            return file_count
+
+    @property
+    def total_large_file_count(self) -> int:
+        return self._to_do_file_list.file_count(large_file=True)
+
+    @property
+    def total_current_large_file_count(self) -> int:
+        return self._to_do_file_list.file_count(self._starting_index, large_file=True)
+
+    @property
+    def total_chunk_count(self) -> int:
+        return self._to_do_file_list.chunk_total()
+
+    @property
+    def total_current_chunk_count(self) -> int:
+        return self._to_do_file_list.chunk_total(self._starting_index)
+
+    @property
+    def total_regular_file_count(self) -> int:
+        return self._to_do_file_list.file_count(large_file=False)
+
+    @property
+    def total_current_regular_file_count(self) -> int:
+        return self._to_do_file_list.file_count(
+            self._starting_index, large_file=False
+        )
+
+    @property
+    def completed_file_count(self) -> int:
+        if self._to_do_file_list is None:
+            return 0
+
+        to_do_index = self._get_to_do_index()
+        return to_do_index + 1
+
+    @property
+    def completed_chunk_count(self) -> int:
+        return self._run_totals.completed_chunk_count
+
+    @property
+    def completed_size(self) -> int:
+        return self._run_totals.completed_size
+
+    @property
+    def processed_size(self) -> int:
+        if self._to_do_file_list is None:
+            return 0
+
+        to_do_index = self._get_to_do_index()
+        return self._to_do_file_list.size_total(0, to_do_index)
+
+    @property
+    def processed_file_count(self) -> int:
+        if self._to_do_file_list is None:
+            return 0
+
+        to_do_index = self._get_to_do_index()
+        return to_do_index + 1
+
+    @property
+    def completed_chunk_size(self) -> int:
+        return self._run_totals.completed_chunk_size
+
+    @property
+    def transmitted_size(self) -> int:
+        return self.transmitted_file_size + self.transmitted_chunk_size
+
+    @property
+    def transmitted_file_size(self) -> int:
+        return self._run_totals.transmitted_file_size
+
+    @property
+    def transmitted_chunk_size(self) -> int:
+        return self._run_totals.transmitted_chunk_size
+
+    @property
+    def transmitted_file_count(self) -> int:
+        return self._run_totals.transmitted_file_count
+
+    @property
+    def transmitted_chunk_count(self) -> int:
+        return self._run_totals.transmitted_chunk_count
+
+    @property
+    def duplicate_size(self) -> int:
+        return self.duplicate_file_size + self.duplicate_chunk_size
+
+    @property
+    def duplicate_file_size(self) -> int:
+        return self._run_totals.duplicate_file_size
+
+    @property
+    def duplicate_chunk_size(self) -> int:
+        return self._run_totals.duplicate_chunk_size
+
+    @property
+    def duplicate_file_count(self) -> int:
+        return self._run_totals.duplicate_file_count
+
+    @property
+    def duplicate_chunk_count(self) -> int:
+        return self._run_totals.duplicate_chunk_count
+
+    def stats(self) -> ToDoStats:
+        """
+        Return the totals of the to_do list and of the files completed in this
+        run. They are all kept as files are added and completed, so this doesn't
+        go through either list.
+        """
+        to_do_list = self._to_do_file_list
+        with Lock.DB_LOCK:
+            total_size = to_do_list.size_total()
+            total_large_size = to_do_list.size_total(large_file=True)
+            total_file_count = to_do_list.file_count()
+            total_large_file_count = to_do_list.file_count(large_file=True)
+            total_chunk_count = to_do_list.chunk_total()
+
+        return ToDoStats(
+            total_size=total_size,
+            total_large_size=total_large_size,
+            total_regular_size=total_size - total_large_size,
+            total_file_count=total_file_count,
+            total_large_file_count=total_large_file_count,
+            total_regular_file_count=total_file_count - total_large_file_count,
+            total_chunk_count=total_chunk_count,
+            **self._run_totals.as_dict(),
+        )
+
+    @property
+    def completed_file_list(self) -> BackupFileList:
+        return self._completed_file_list
+
+    @property
+    def current_run(self) -> int:
+        return self._current_run
+
+    @property
+    def starting_index(self) -> int:
+        return self._starting_index
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Optional
+
+# The separator between the fields of a lastfilestransmitted line
+SEPARATOR = " - "
+
+CHUNK_PREFIX = "Chunk"
+BATCH_PREFIX = "Multi"
+
+
+class RecordKind(Enum):
+    SINGLE = auto()
+    CHUNK = auto()
+    BATCH_HEADER = auto()
+    BATCH_MEMBER = auto()
+
+
+@dataclass(slots=True)
+class TransmittedRecord:
+    """
+    One decoded line of the lastfilestransmitted log.
+
+    A batch header has no file name, and a batch member has no rate or byte count,
+    since those are on the batch header.
+    """
+
+    kind: RecordKind
+    timestamp: str
+    file_name: str = ""
+    rate: str = ""
+    byte_count: int = 0
+    chunk_number: int = 0
+
+    @property
+    def display_rate(self) -> str:
+        """
+        The rate with a thousands separator, so "19780 kBits/sec" becomes
+        "19,780 kBits/sec". A "dedup" rate is left alone.
+        """
+        if self.rate == "dedup" or self.rate == "":
+            return self.rate
+        try:
+            return f"{int(self.rate[:-10]):,}{self.rate[-10:]}"
+        except ValueError:
+            return self.rate
+
+
+def decode_line(line: str) -> Optional[TransmittedRecord]:
+    """
+    Decode a line of the lastfilestransmitted log into a record.
+
+    The file name is always the last field, and the fields before it never contain
+    the separator, so one split limited to six fields is all that's needed, even
+    when the file name contains " - " itself. The chunk number and the start of
+    the file name in a chunk line are at fixed offsets, so they are sliced out.
+
+    The lines look like this (each on one line):
+
+    2024-01-03 00:00:10 -  large  - throttle auto     11 - 19780 kBits/sec
+        - 10485760 bytes - /Volumes/CameraHDD4/SecuritySpy/Bedroom Foot/...m4v
+
+    2024-01-03 00:00:10 -  large  - throttle auto     11 - 32091 kBits/sec
+        - 10485760 bytes - Chunk 00012 of /Volumes/CameraHDD4/SecuritySpy/...m4v
+
+    2024-01-01 19:42:53 -  large  - throttle auto     11 - 30985 kBits/sec
+        -  6859241 bytes - Multiple small files batched in one request, the 17 ...
+
+    2024-01-01 19:42:53 -  - /Users/xev/Qt/QtDesignStudio/Qt Design Studio.app/...
+
+    :param line: The line, with the trailing newline stripped
+    :return: The decoded record, or None if the line isn't in any of these formats
+    """
+    fields = line.split(SEPARATOR, 5)
+    if len(fields) < 3:
+        return None
+
+    timestamp = fields[0]
+
+    # A batch member has an empty size field, and the file name straight after it
+    if fields[1].isspace() or not fields[1]:
+        return TransmittedRecord(
+            RecordKind.BATCH_MEMBER, timestamp, SEPARATOR.join(fields[2:])
+        )
+
+    if len(fields) != 6:
+        return None
+    _, _, _, rate, bytes_field, file_name = fields
+
+    # The byte count is right aligned, and followed by " bytes"
+    try:
+        byte_count = int(bytes_field.split(None, 1)[0])
+    except (ValueError, IndexError):
+        byte_count = 0
+
+    if file_name.startswith(CHUNK_PREFIX):
+        # Chunk 00012 of /Volumes/...
+        return TransmittedRecord(
+            RecordKind.CHUNK,
+            timestamp,
+            file_name[15:],
+            rate.strip(),
+            byte_count,
+            int(file_name[6:11], base=16),
+        )
+    if file_name.startswith(BATCH_PREFIX):
+        return TransmittedRecord(
+            RecordKind.BATCH_HEADER, timestamp, "", rate.strip(), byte_count
+        )
+    return TransmittedRecord(
+        RecordKind.SINGLE, timestamp, file_name, rate.strip(), byte_count
+    )
@@ -0,0 +1,66 @@
+import threading
+from collections import Counter
+from typing import Callable
+
+
+class UpdateBus:
+    """
+    Where the to_do list and the log parsers say which parts of the display are out
+    of date, rather than repainting them themselves.
+
+    mark() only notes the region as dirty, so it is cheap and safe from any thread.
+    flush() calls the callbacks of each region marked since the last flush once, in
+    the thread that flushes. The GUI flushes from a timer, so a burst of hundreds
+    of chunks or small files becomes at most one update of each region per tick.
+    With immediate set, mark() flushes straight away, for running without Qt.
+    """
+
+    # Each region is one of the updates that used to be sent straight away, so
+    # that a producer marks just what it used to send.
+
+    # The chunk grid of the current large file
+    CHUNK_GRID: str = "chunk_grid"
+    # The rows of the result table
+    RESULT_ROWS: str = "result_rows"
+    # The position of the result table, which follows the last completed file
+    TABLE_POSITION: str = "table_position"
+    # The list of files, and the totals that come from it
+    FILES: str = "files"
+    # The progress of the run
+    PROGRESS: str = "progress"
+
+    def __init__(self, immediate: bool = False):
+        self.immediate = immediate
+        self._callbacks: dict[str, tuple[Callable, ...]] = {}
+        # A dict rather than a set, so regions are updated in the order marked
+        self._dirty: dict[str, None] = {}
+        self._lock = threading.Lock()
+        self.marked: Counter = Counter()
+        self.dispatched: Counter = Counter()
+
+    def connect(self, region: str, callback: Callable) -> None:
+        with self._lock:
+            self._callbacks[region] = self._callbacks.get(region, ()) + (callback,)
+
+    def mark(self, region: str) -> None:
+        with self._lock:
+            self.marked[region] += 1
+            self._dirty[region] = None
+        if self.immediate:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Call the callbacks of every region marked since the last flush
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            callbacks = [self._callbacks.get(region, ()) for region in dirty]
+            self.dispatched.update(dirty.keys())
+
+        # Outside the lock, so a callback can mark a region for the next flush
+        for region_callbacks in callbacks:
+            for callback in region_callbacks:
+                callback()
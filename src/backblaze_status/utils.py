@@ -1,4 +1,3 @@
-import inspect
 import logging
 import os
 import sys
@@ -12,6 +11,7 @@ from rich.console import Console
 from rich.text import Text
 from datetime import datetime
 from .configuration import Configuration
+from .log_queue import get_log_queue
 
 DIVISOR_SIZE = 1024
 
@@ -36,6 +36,19 @@ def file_size_string(size, sign=False) -> str:
         result /= DIVISOR_SIZE
 
 
+def _caller_name() -> str:
+    """
+    Return the name of the function that called the function calling this.
+
+    This only looks at the one frame, where inspect.stack() builds the frame info,
+    with the source lines, for every frame on the stack.
+    """
+    try:
+        return sys._getframe(2).f_code.co_name
+    except ValueError:
+        return "<module>"
+
+
 class MultiLogger:
     def __init__(
         self,
@@ -47,6 +60,7 @@ class MultiLogger:
         qt=None,
         log_format: str = "%(asctime)s [%(process)d] <%(name)s> %(message)s",
         date_format: str = "%Y-%m-%d %H:%M:%S",
+        async_log: bool = None,
     ):
         """
         Initialize the MultiLogger class.
@@ -56,6 +70,8 @@ class MultiLogger:
             logfile_dir (str, optional): The directory to store log files. Defaults to None.
             default_log_level (int, optional): The default log level. Defaults to logging.INFO.
             terminal (bool, optional): Whether to print log messages to the terminal. Defaults to False.
+            async_log (bool, optional): Whether to write the log messages from the shared
+                background thread. Defaults to Configuration.async_logging.
         """
         self._app_name = app_name
         if logfile_dir is None:
@@ -67,6 +83,9 @@ class MultiLogger:
         self.qt = qt
         self._log_format = log_format
         self._date_format = date_format
+        if async_log is None:
+            async_log = Configuration.async_logging
+        self._async_log = async_log
 
         self._initialize_logger()
         self.logger = logging.getLogger(app_name)
@@ -105,13 +124,21 @@ class MultiLogger:
                 file_handler.setFormatter(
                     logging.Formatter(self._log_format, datefmt=self._date_format)
                 )
-                logger.addHandler(file_handler)
+                handlers: list[logging.Handler] = [file_handler]
                 if self._terminal:
                     stream_handler = logging.StreamHandler(sys.stdout)
                     stream_handler.setFormatter(
                         logging.Formatter(self._log_format, datefmt=self._date_format)
                     )
-                    logger.addHandler(stream_handler)
+                    handlers.append(stream_handler)
+
+                if self._async_log:
+                    log_queue = get_log_queue()
+                    log_queue.add_handlers(self._app_name, handlers)
+                    logger.addHandler(log_queue.handler())
+                else:
+                    for handler in handlers:
+                        logger.addHandler(handler)
             except (PermissionError, FileNotFoundError) as e:
                 print(f"Error initializing logger: {e}")
 
@@ -129,19 +156,16 @@ class MultiLogger:
             level (int, optional): The log level. Defaults to logging.INFO.
             module (str, optional): The name of the module. Defaults to None.
         """
+        # The parsers call this for every log line, mostly at DEBUG, so do nothing
+        # more than this check when the level isn't being logged
+        if not self.logger.isEnabledFor(level):
+            return
+
         if not module:
-            module = inspect.stack()[1].function
-
-        timestamp = datetime.now().strftime("%-I:%M:%S %p")
-        if self.qt:
-            html_log_string = (
-                f'<span style="color:yellow">{timestamp}</span> '
-                f'<span style="color:magenta"> ({module})</span> '
-                f'<span style="color:white"> {str(message)} </span> '
-            )
-            # self.qt.signals.update_log.emit(html_log_string)
+            module = _caller_name()
 
-        elif self.rich_log:
+        if self.rich_log and not self.qt:
+            timestamp = datetime.now().strftime("%-I:%M:%S %p")
             rich_log_text = (
                 Text()
                 .from_markup(f"[yellow]{timestamp}[/] [purple] <{module}>[/] ")
@@ -44,6 +44,8 @@ class StatsBoxWorker(QObject):
         if self.to_do is None:
             return
 
+        stats = self.to_do.stats()
+
         total_regular_files_string = (
             f"Total Regular Files:"
             f" <b>{self.to_do.total_current_regular_file_count:,d} /"
@@ -59,59 +61,59 @@ class StatsBoxWorker(QObject):
         )
 
         transmitted_files_string = (
-            f"Transmitted Files: <b>{self.to_do.transmitted_file_count:,}"
-            f" / {file_size_string(self.to_do.transmitted_file_size)}</b>{'&nbsp;' * 2}"
+            f"Transmitted Files: <b>{stats.transmitted_file_count:,}"
+            f" / {file_size_string(stats.transmitted_file_size)}</b>{'&nbsp;' * 2}"
         )
 
         transmitted_chunks_string = (
             f"Transmitted Chunks: "
-            f"<b>{self.to_do.transmitted_chunk_count:,} / "
-            f"{file_size_string(self.to_do.transmitted_chunk_size)}</b"
+            f"<b>{stats.transmitted_chunk_count:,} / "
+            f"{file_size_string(stats.transmitted_chunk_size)}</b"
             f">{'&nbsp;' * 10}"
         )
 
         duplicate_files_string = (
-            f"Duplicate Files: <b>{self.to_do.duplicate_file_count:,}"
-            f" / {file_size_string(self.to_do.duplicate_file_size)}</b>{'&nbsp;' * 2}"
+            f"Duplicate Files: <b>{stats.duplicate_file_count:,}"
+            f" / {file_size_string(stats.duplicate_file_size)}</b>{'&nbsp;' * 2}"
         )
 
         duplicate_chunks_string = (
-            f"Duplicate Chunks: <b>{self.to_do.duplicate_chunk_count:,}"
-            f" / {file_size_string(self.to_do.duplicate_chunk_size)}</b> {'&nbsp;' * 10}"
+            f"Duplicate Chunks: <b>{stats.duplicate_chunk_count:,}"
+            f" / {file_size_string(stats.duplicate_chunk_size)}</b> {'&nbsp;' * 10}"
         )
 
         combined_files = self.to_do.completed_file_count
         if combined_files == 0:
             percentage_file_duplicate = 0
         else:
-            percentage_file_duplicate = self.to_do.duplicate_file_count / combined_files
+            percentage_file_duplicate = stats.duplicate_file_count / combined_files
             if percentage_file_duplicate > 1:
                 percentage_file_duplicate = 1
 
-        combined_size = self.to_do.completed_size
+        combined_size = stats.completed_size
         if combined_size == 0:
             percentage_size_duplicate = 0
         else:
-            percentage_size_duplicate = self.to_do.duplicate_file_size / combined_size
+            percentage_size_duplicate = stats.duplicate_file_size / combined_size
             if percentage_size_duplicate > 1:
                 percentage_size_duplicate = 1
 
-        combined_chunks = self.to_do.completed_chunk_count
+        combined_chunks = stats.completed_chunk_count
         if combined_chunks == 0:
             percentage_chunk_duplicate = 0
         else:
             percentage_chunk_duplicate = (
-                self.to_do.duplicate_chunk_count / combined_chunks
+                stats.duplicate_chunk_count / combined_chunks
             )
             if percentage_chunk_duplicate > 1:
                 percentage_chunk_duplicate = 1
 
-        combined_chunk_size = self.to_do.completed_chunk_size
+        combined_chunk_size = stats.completed_chunk_size
         if combined_chunk_size == 0:
             percentage_chunk_size_duplicate = 0
         else:
             percentage_chunk_size_duplicate = (
-                self.to_do.duplicate_chunk_size / combined_chunk_size
+                stats.duplicate_chunk_size / combined_chunk_size
             )
             if percentage_chunk_size_duplicate > 1:
                 percentage_chunk_size_duplicate = 1
@@ -124,3 +124,19 @@ class TestBackupFile:
         assert backup_file.row_color == row_color
         assert backup_file.timestamp_color == timestamp_color
         assert backup_file.file_name_color == file_name_color
+
+    #  A BackupFile hashes the same however its chunks change, and only equals itself
+    def test_identity(self):
+        backup_file = BackupFile(Path("example_file.txt"), 1000, is_large_file=True)
+        files = {backup_file}
+        backup_file.add_prepared(1)
+        backup_file.add_transmitted(2)
+        assert backup_file in files
+        assert BackupFile(Path("example_file.txt"), 1000) != backup_file
+
+    #  BackupFiles have no __dict__, and share their colors
+    def test_compact(self):
+        first = BackupFile(Path("first.txt"), 1000)
+        second = BackupFile(Path("second.txt"), 1000)
+        assert not hasattr(first, "__dict__")
+        assert first.row_color == second.row_color == "White"
@@ -0,0 +1,135 @@
+from array import array
+from pathlib import Path
+
+from backblaze_status import BackupFile
+from backblaze_status.backup_file_list import BackupFileList
+from backblaze_status.configuration import Configuration
+from backblaze_status.path_table import PathTable
+
+LARGE_SIZE = Configuration.default_chunk_size * 3
+
+
+def make_list() -> BackupFileList:
+    backup_file_list = BackupFileList()
+    backup_file_list.extend_entries(
+        ["/a", "/b", "/c", "/d"], array("q", [100, LARGE_SIZE, 300, LARGE_SIZE])
+    )
+    return backup_file_list
+
+
+class TestBackupFileList:
+    #  Files added from columns are only turned into BackupFiles when asked for
+    def test_views_are_created_on_demand(self):
+        backup_file_list = make_list()
+        assert len(backup_file_list) == 4
+        assert backup_file_list._views == {}
+
+        backup_file = backup_file_list.get("/b")
+        assert backup_file.file_name == Path("/b")
+        assert backup_file.is_large_file
+        assert backup_file.total_chunk_count == 3
+        assert backup_file.list_index == 1
+
+        # The same BackupFile is returned every time
+        assert backup_file_list["/b"] is backup_file
+        assert backup_file_list[1] is backup_file
+
+    #  Totals are calculated from the columns
+    def test_totals(self):
+        backup_file_list = make_list()
+        assert backup_file_list.size_total() == 400 + 2 * LARGE_SIZE
+        assert backup_file_list.size_total(2) == 300 + LARGE_SIZE
+        assert backup_file_list.size_total(large_file=False) == 400
+        assert backup_file_list.file_count(large_file=True) == 2
+        assert backup_file_list.file_count(1, 3, large_file=False) == 1
+        assert backup_file_list.chunk_total() == 6
+
+    #  Removing a file keeps the positions and totals of the rest correct
+    def test_remove(self):
+        backup_file_list = make_list()
+        backup_file_list.remove(1)
+
+        assert [name for name, _ in backup_file_list.entries()] == ["/a", "/c", "/d"]
+        assert backup_file_list.index("/d") == 2
+        assert not backup_file_list.exists("/b")
+        assert backup_file_list.size_total(1) == 300 + LARGE_SIZE
+        assert backup_file_list.chunk_total() == 3
+
+        backup_file_list.append(BackupFile(Path("/e"), 500))
+        assert backup_file_list.index("/e") == 3
+        assert backup_file_list.file_list.index(backup_file_list.get("/e")) == 3
+        assert backup_file_list.size_total(3) == 500
+
+    #  The whole list totals are kept up to date as files change
+    def test_running_totals(self):
+        backup_file_list = make_list()
+        backup_file = backup_file_list.get("/c")
+        backup_file.is_large_file = True
+        backup_file.total_chunk_count = 2
+        backup_file_list.refresh(backup_file)
+        assert backup_file_list.file_count(large_file=True) == 3
+        assert backup_file_list.size_total(large_file=False) == 100
+        assert backup_file_list.chunk_total() == 8
+
+        backup_file_list.remove(1)
+        assert backup_file_list.size_total() == 400 + LARGE_SIZE
+        assert backup_file_list.size_total(large_file=True) == 300 + LARGE_SIZE
+        assert backup_file_list.chunk_total() == 5
+
+        # The running totals agree with adding up the columns
+        assert backup_file_list.size_total() == sum(backup_file_list._sizes)
+        assert backup_file_list.chunk_total() == sum(backup_file_list._chunk_counts)
+
+        # And so do the prefix sums over part of the list
+        assert backup_file_list.size_total(1, 2) == 300
+        assert backup_file_list.size_total(0, 2, large_file=False) == 100
+        assert backup_file_list.file_count(1, large_file=True) == 2
+        assert backup_file_list.chunk_total(0, 2) == 2
+
+        backup_file_list.clear()
+        assert backup_file_list.size_total() == 0
+        assert backup_file_list.file_count(large_file=True) == 0
+
+    #  Removed rows are left in place until the positions are next needed, and
+    #  then taken out in one pass
+    def test_tombstones(self):
+        backup_file_list = make_list()
+        backup_file_list.extend_entries(["/e", "/f"], array("q", [500, 600]))
+        last = backup_file_list.get("/f")
+        assert backup_file_list.position(last) == 5
+
+        removed = [backup_file_list.get("/b"), backup_file_list.get("/e")]
+        for backup_file in removed:
+            backup_file_list.remove(backup_file)
+        assert backup_file_list._tombstones == 2
+        assert len(backup_file_list) == 4
+
+        assert backup_file_list.position(last) == 3
+        assert backup_file_list._tombstones == 0
+        assert [name for name, _ in backup_file_list.entries()] == [
+            "/a",
+            "/c",
+            "/d",
+            "/f",
+        ]
+        assert backup_file_list.file_list.index(last) == 3
+        assert backup_file_list[3] is last
+
+        # A different BackupFile for the same file is found by its name
+        assert backup_file_list.position(BackupFile(Path("/d"), LARGE_SIZE)) == 2
+
+    #  Moving to a new path table keeps the files and drops the removed names
+    def test_move_paths(self):
+        backup_file_list = make_list()
+        backup_file_list.remove(1)
+
+        paths = PathTable()
+        backup_file_list.move_paths(paths)
+        assert backup_file_list.paths is paths
+        assert list(paths) == ["/a", "/b", "/c", "/d"]
+        assert not backup_file_list.exists("/b")
+        assert backup_file_list.get("/d").file_size == LARGE_SIZE
+        assert backup_file_list.index("/c") == 1
+
+        backup_file_list.append(BackupFile(Path("/e"), 500))
+        assert backup_file_list.index("/e") == 3
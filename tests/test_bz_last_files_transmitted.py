@@ -0,0 +1,65 @@
+from collections import Counter
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from backblaze_status.bz_last_files_transmitted import BzLastFilesTransmitted
+from backblaze_status.configuration import Configuration
+from backblaze_status.core import HeadlessBackupStatus, ToDoStore
+from backblaze_status.to_do_parser import parse_to_do_file
+
+FIXTURE = Path(__file__).parent / "bz_todo_20240202_0.dat"
+THROTTLE = " -  large  - throttle auto     11 - "
+
+
+def batch_lines(names: list[str]) -> list[str]:
+    """
+    The lastfilestransmitted lines for one batch of small files
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        f"{now}{THROTTLE}30985 kBits/sec -  6859241 bytes - Multiple small files"
+        f" batched in one request, the {len(names)} files are listed below:\n",
+        *(f"{now} -  - {name}\n" for name in names),
+    ]
+
+
+def count_event(emitted: Counter, name: str, *args) -> None:
+    emitted[name] += 1
+
+
+class TestBackfill:
+    #  Files completed while catching up on the log don't update the display one
+    #  by one. It is brought up to date once when the backfill finishes.
+    def test_backfill_events(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Configuration, "backfill_window", 60 * 60)
+        backup_status = HeadlessBackupStatus(tmp_path / "checkpoints.json")
+        emitted = Counter()
+        for event in backup_status.events():
+            event.connect(partial(count_event, emitted, event.name))
+        backup_status.debug.disable("lastfilestransmitted.show_line")
+
+        to_do = ToDoStore(backup_status)
+        to_do._add_to_do_entries(parse_to_do_file(FIXTURE))
+        last_files = BzLastFilesTransmitted(backup_status)
+        last_files.to_do_files = to_do
+        names = [str(to_do[index].file_name) for index in range(20)]
+
+        last_files._backfilling = True
+        for line in batch_lines(names):
+            last_files._process_line(line, 0)
+        assert len(to_do.completed_files) == 20
+        assert emitted == Counter()
+
+        last_files._finish_backfill()
+        assert emitted["calculate_progress"] == 1
+        assert emitted["files_updated"] == 1
+        assert emitted["result_data.layoutChanged"] == 1
+        assert emitted["reposition_table"] == 1
+
+        # Once caught up, each completed file is shown as it happens
+        emitted.clear()
+        names = [str(to_do[index].file_name) for index in range(20, 23)]
+        for line in batch_lines(names):
+            last_files._process_line(line, 0)
+        assert emitted["files_updated"] == 3
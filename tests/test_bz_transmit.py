@@ -0,0 +1,29 @@
+from backblaze_status.bz_transmit import TransmitLine, classify_line
+
+
+class TestClassifyLine:
+    #  Each of the lines BzTransmit acts on is recognized
+    def test_known_lines(self):
+        assert (
+            classify_line(
+                "2024-02-02 10:11:12 - Entering PrepareBzLargeFileDirWithLargeFile: "
+                "/Volumes/CameraHDD/a.m4v"
+            )
+            == TransmitLine.PREPARE
+        )
+        assert (
+            classify_line(
+                "2024-02-02 10:11:12 - chunk 0000a for this largefile was deduped: "
+                "/Volumes/CameraHDD/a.m4v"
+            )
+            == TransmitLine.DEDUP
+        )
+        assert (
+            classify_line("2024-02-02 10:11:12 - Leaving MakeBzDoneFileToDataCenter")
+            == TransmitLine.NEW_TO_DO
+        )
+
+    #  Everything else is ignored
+    def test_other_lines(self):
+        assert classify_line("2024-02-02 10:11:12 - HttpClient::Post - 200") is None
+        assert classify_line("") is None
@@ -0,0 +1,44 @@
+from backblaze_status.checkpoint import CheckpointStore
+
+
+class TestCheckpointStore:
+    #  A checkpoint saved by one store is picked up by the next one
+    def test_resume(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_text("first\nsecond\n")
+        checkpoint_file = tmp_path / "checkpoints.json"
+
+        store = CheckpointStore(checkpoint_file)
+        store.update("bztransmit", log_file, 6)
+        store.save()
+        assert checkpoint_file.exists()
+
+        with log_file.open("a") as log:
+            log.write("third\n")
+
+        resumed = CheckpointStore(checkpoint_file)
+        assert resumed.resume_offset("bztransmit", log_file) == 6
+
+    #  A different, replaced or truncated file isn't resumed
+    def test_identity(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_text("first\nsecond\n")
+        store = CheckpointStore(tmp_path / "checkpoints.json")
+        store.update("bztransmit", log_file, 6)
+
+        assert store.resume_offset("bztransmit", tmp_path / "2.log") is None
+        assert store.resume_offset("lastfilestransmitted", log_file) is None
+
+        log_file.write_text("new\n")
+        assert store.resume_offset("bztransmit", log_file) is None
+
+        replacement = tmp_path / "replacement.log"
+        replacement.write_text("first\nsecond\nthird\n")
+        replacement.replace(log_file)
+        assert store.resume_offset("bztransmit", log_file) is None
+
+    #  An unreadable checkpoint file is ignored
+    def test_corrupt(self, tmp_path):
+        checkpoint_file = tmp_path / "checkpoints.json"
+        checkpoint_file.write_text("{not json")
+        assert CheckpointStore(checkpoint_file).get("bztransmit") is None
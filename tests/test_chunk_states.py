@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from backblaze_status.chunk_states import ChunkState, ChunkStates
+
+
+class TestChunkStates:
+    #  Chunks only move up to later states, and the counts follow them
+    def test_set(self):
+        states = ChunkStates()
+        assert states[10] == ChunkState.NONE
+
+        assert states.set(5, ChunkState.PREPARED) == ChunkState.NONE
+        assert states.set(5, ChunkState.TRANSMITTED) == ChunkState.PREPARED
+        assert states.set(5, ChunkState.DEDUPED) == ChunkState.TRANSMITTED
+        assert states.set(5, ChunkState.TRANSMITTED) == ChunkState.DEDUPED
+        assert states[5] == ChunkState.DEDUPED
+        assert states[4] == ChunkState.NONE
+        assert states[6] == ChunkState.NONE
+
+        assert states.count(ChunkState.PREPARED) == 0
+        assert states.count(ChunkState.TRANSMITTED) == 0
+        assert states.count(ChunkState.DEDUPED) == 1
+
+    #  The highest chunk set to each state is kept
+    def test_max(self):
+        states = ChunkStates()
+        assert states.max(ChunkState.TRANSMITTED) == 0
+        for chunk in (3, 9, 7):
+            states.set(chunk, ChunkState.PREPARED)
+            states.set(chunk, ChunkState.TRANSMITTED)
+        states.set(9, ChunkState.DEDUPED)
+
+        assert states.max(ChunkState.PREPARED) == 9
+        assert states.max(ChunkState.TRANSMITTED) == 9
+        assert states.max(ChunkState.DEDUPED) == 9
+
+    #  The views see later changes and behave like sets
+    def test_views(self):
+        states = ChunkStates()
+        prepared = states.chunks(ChunkState.PREPARED, at_least=True)
+        transmitted = states.chunks(ChunkState.TRANSMITTED)
+        for chunk in range(6):
+            states.set(chunk, ChunkState.PREPARED)
+        states.set(2, ChunkState.TRANSMITTED)
+        states.set(4, ChunkState.DEDUPED)
+
+        assert len(prepared) == 6
+        assert 4 in prepared
+        assert 6 not in prepared
+        assert set(transmitted) == {2}
+        assert transmitted == {2}
+        assert list(states.chunks(ChunkState.DEDUPED)) == [4]
+
+    #  Negative chunk numbers are rejected
+    def test_negative(self):
+        with pytest.raises(ValueError):
+            ChunkStates().set(-1, ChunkState.PREPARED)
+
+    #  Each cell shows the lowest state of the chunks spread over it
+    def test_raster(self):
+        states = ChunkStates()
+        for chunk in range(8):
+            states.set(chunk, ChunkState.PREPARED)
+        for chunk in range(3):
+            states.set(chunk, ChunkState.TRANSMITTED)
+        states.set(0, ChunkState.DEDUPED)
+        states.set(1, ChunkState.DEDUPED)
+
+        assert states.raster(10, 5) == bytes((3, 1, 1, 1, 0))
+        assert states.raster(2, 4) == bytes((3, 3, 3, 3))
+        assert states.raster(4, 8) == bytes((3, 3, 3, 3, 2, 2, 1, 1))
+        assert ChunkStates().raster(0, 3) == bytes(3)
+
+    #  Chunks that share a byte can be set from several threads at once
+    def test_threads(self):
+        states = ChunkStates()
+        chunk_count = 4000
+
+        def set_chunks(offset: int):
+            for chunk in range(offset, chunk_count, 4):
+                states.set(chunk, ChunkState.PREPARED)
+                states.set(chunk, ChunkState.TRANSMITTED)
+
+        threads = [threading.Thread(target=set_chunks, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert states.count(ChunkState.TRANSMITTED) == chunk_count
+        assert states.count(ChunkState.PREPARED) == 0
+        assert len(states.chunks(ChunkState.TRANSMITTED)) == chunk_count
+        assert all(
+            states[chunk] == ChunkState.TRANSMITTED for chunk in range(chunk_count)
+        )
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+
+from backblaze_status.core import HeadlessBackupStatus, ToDoStore
+
+
+class TestCore:
+    #  The core can be imported without loading Qt
+    def test_no_qt(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, backblaze_status.core;"
+                " print(any(name.startswith('PyQt6') for name in sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
+
+    #  The to_do list reports its changes through the plain Python events
+    def test_events(self, tmp_path):
+        backup_status = HeadlessBackupStatus(tmp_path / "checkpoints.json")
+        completed = []
+        updates = []
+        backup_status.signals.files_updated.connect(lambda: updates.append(True))
+        backup_status.table_moved.connect(lambda: completed.append(True))
+
+        to_do = ToDoStore(backup_status)
+        file_name = tmp_path / "file"
+        file_name.write_bytes(b"x" * 100)
+        to_do.add_file(str(file_name))
+        assert to_do.exists(str(file_name))
+
+        to_do.mark_completed(str(file_name))
+        assert to_do.get_file(str(file_name)).completed
+        assert len(to_do.completed_files) == 1
+        assert updates == [True]
+        assert completed == [True]
+
+        stats = to_do.stats()
+        assert stats.total_file_count == 1
+        assert stats.total_size == 100
+        assert stats.completed_size == 100
+        assert stats.transmitted_file_count == 1
+        assert stats.transmitted_size == to_do.transmitted_size == 100
+
+    #  Each change sends just the events it always has
+    def test_event_names(self, tmp_path):
+        backup_status = HeadlessBackupStatus(tmp_path / "checkpoints.json")
+        emitted = []
+        for event in backup_status.events():
+            event.connect(lambda *args, name=event.name: emitted.append(name))
+
+        to_do = ToDoStore(backup_status)
+        file_name = tmp_path / "file"
+        file_name.write_bytes(b"x" * 100)
+        to_do.add_file(str(file_name))
+
+        emitted.clear()
+        to_do.mark_completed(str(file_name))
+        assert emitted == ["calculate_progress", "files_updated", "reposition_table"]
+
+        emitted.clear()
+        to_do._mark_backup_not_running()
+        assert emitted == ["backup_running", "files_updated"]
@@ -0,0 +1,28 @@
+from backblaze_status.dev_debug import DevDebug
+
+
+class TestDevDebug:
+    #  A tag's resolution is cached, and the cache is dropped when tags change
+    def test_resolved_cache(self):
+        debug = DevDebug(enabled_mode=True)
+        assert debug.is_enabled("cache_test.a.b")
+        assert "cache_test.a.b" in DevDebug._resolved
+
+        debug.disable("cache_test.a")
+        assert "cache_test.a.b" not in DevDebug._resolved
+        assert debug.is_disabled("cache_test.a.b")
+
+        debug.enable("cache_test.a.b")
+        assert debug.is_enabled("cache_test.a.b")
+        assert debug.is_disabled("cache_test.a.c")
+
+    #  The cache is shared by all instances, but each keeps its own mode
+    def test_mode(self):
+        enabled = DevDebug(enabled_mode=True)
+        disabled = DevDebug(enabled_mode=False)
+        assert enabled.is_enabled("mode_test.a")
+        assert disabled.is_disabled("mode_test.a")
+
+        disabled.enable("mode_test")
+        assert enabled.is_enabled("mode_test.a")
+        assert disabled.is_enabled("mode_test.a")
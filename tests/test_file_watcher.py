@@ -0,0 +1,55 @@
+import sys
+import threading
+
+import pytest
+
+from backblaze_status.file_watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    create_watcher,
+)
+
+
+def append_later(path, text, delay=0.2):
+    def append():
+        with path.open("a") as log:
+            log.write(text)
+
+    timer = threading.Timer(delay, append)
+    timer.start()
+    return timer
+
+
+class TestFileWatcher:
+    #  Polling notices a file growing, and times out when nothing changes
+    def test_polling(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_text("first\n")
+
+        with PollingWatcher([log_file, tmp_path], interval=0.05) as watcher:
+            assert not watcher.wait(0.2)
+            timer = append_later(log_file, "second\n")
+            assert watcher.wait(5)
+            timer.join()
+
+    #  inotify wakes up as soon as the file is written to
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+    def test_inotify(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_text("first\n")
+
+        with InotifyWatcher([log_file, tmp_path]) as watcher:
+            assert not watcher.wait(0.1)
+            timer = append_later(log_file, "second\n")
+            assert watcher.wait(5)
+            timer.join()
+
+    #  A new file in a watched directory wakes up the platform watcher
+    def test_new_file(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_text("first\n")
+
+        with create_watcher([log_file, tmp_path]) as watcher:
+            timer = append_later(tmp_path / "2.log", "new\n")
+            assert watcher.wait(5)
+            timer.join()
@@ -0,0 +1,75 @@
+import os
+import time
+
+from backblaze_status.log_directory import LogDirectoryIndex
+
+
+def write_log(path, mtime):
+    path.write_text("line\n")
+    os.utime(path, (mtime, mtime))
+
+
+class TestLogDirectoryIndex:
+    #  The newest .log file is found, and other files are ignored
+    def test_latest(self, tmp_path):
+        write_log(tmp_path / "1.log", 1000)
+        write_log(tmp_path / "2.log", 2000)
+        write_log(tmp_path / "3.txt", 3000)
+
+        index = LogDirectoryIndex(tmp_path)
+        assert index.latest() == tmp_path / "2.log"
+
+    #  The directory is only scanned again once a file is added to it
+    def test_rescan_on_new_file(self, tmp_path):
+        write_log(tmp_path / "1.log", 1000)
+        index = LogDirectoryIndex(tmp_path)
+        assert index.latest() == tmp_path / "1.log"
+
+        with (tmp_path / "1.log").open("a") as log:
+            log.write("more\n")
+        assert index.latest() == tmp_path / "1.log"
+        assert index.scans == 1
+
+        # Make sure the directory mtime moves on
+        time.sleep(0.05)
+        write_log(tmp_path / "2.log", time.time() + 10)
+        assert index.latest() == tmp_path / "2.log"
+        assert index.scans == 2
+
+    #  An empty directory has no latest log
+    def test_empty(self, tmp_path):
+        assert LogDirectoryIndex(tmp_path).latest() is None
+
+    #  An older log rewritten in place, which doesn't change the directory, is found
+    def test_rewritten_in_place(self, tmp_path):
+        write_log(tmp_path / "1.log", 1000)
+        write_log(tmp_path / "2.log", 2000)
+        index = LogDirectoryIndex(tmp_path, rescan_interval=0)
+        assert index.latest() == tmp_path / "2.log"
+
+        directory_mtime = os.stat(tmp_path).st_mtime_ns
+        with (tmp_path / "1.log").open("r+") as log:
+            log.truncate(0)
+            log.write("new day\n")
+        os.utime(tmp_path / "1.log", (3000, 3000))
+        assert os.stat(tmp_path).st_mtime_ns == directory_mtime
+
+        assert index.latest() == tmp_path / "1.log"
+
+    #  While nothing is written, the directory is only scanned once per interval
+    def test_idle(self, tmp_path, monkeypatch):
+        for day in range(1, 31):
+            write_log(tmp_path / f"{day}.log", 1000 + day)
+        clock = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+        index = LogDirectoryIndex(tmp_path, rescan_interval=60)
+        for _ in range(10):
+            assert index.latest() == tmp_path / "30.log"
+        assert index.scans == 1
+
+        # Once the interval has passed, a reused older log is found
+        write_log(tmp_path / "1.log", 5000)
+        clock[0] += 61
+        assert index.latest() == tmp_path / "1.log"
+        assert index.scans == 2
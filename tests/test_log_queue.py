@@ -0,0 +1,59 @@
+import logging
+from backblaze_status.log_queue import LogQueue
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(self.format(record))
+
+
+def make_logger(name: str, log_queue: LogQueue) -> tuple[logging.Logger, ListHandler]:
+    handler = ListHandler()
+    log_queue.add_handlers(name, [handler])
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [log_queue.handler()]
+    return logger, handler
+
+
+class TestLogQueue:
+    #  Records are written by the background thread, to their own logger's handlers
+    def test_written(self):
+        log_queue = LogQueue(maxsize=100)
+        log_queue.start()
+        first, first_handler = make_logger("TestLogQueue.first", log_queue)
+        second, second_handler = make_logger("TestLogQueue.second", log_queue)
+
+        first.info("one %d", 1)
+        second.info("two")
+        log_queue.stop()
+
+        assert first_handler.records == ["one 1"]
+        assert second_handler.records == ["two"]
+
+    #  While the writer isn't keeping up, logging doesn't wait: a DEBUG flood is
+    #  sampled, and records that don't fit are dropped
+    def test_full(self):
+        log_queue = LogQueue(maxsize=10, debug_sample=5)
+        logger, handler = make_logger("TestLogQueue.full", log_queue)
+
+        # The writer isn't started until the end, so nothing is taken off the queue
+        for number in range(20):
+            logger.debug("debug %d", number)
+        for number in range(10):
+            logger.info("info %d", number)
+
+        log_queue.start()
+        log_queue.stop()
+
+        # 5 DEBUG records fill the queue to half, then 1 in 5 of the other 15 is
+        # kept, and the INFO records fill the rest
+        assert log_queue.sampled == 12
+        assert len(handler.records) == 10
+        assert log_queue.dropped["INFO"] == 8
+        assert log_queue.stats()["dropped_INFO"] == 8
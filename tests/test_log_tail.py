@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from backblaze_status.log_tail import TailReader, find_first_line_since
+from backblaze_status.timestamps import parse_line_timestamp
+
+
+class TestTailReader:
+    #  Complete lines are returned, and an unfinished one waits for the rest of it
+    def test_partial_line(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_bytes(b"first\nsecond\nthi")
+
+        with log_file.open("rb") as log:
+            reader = TailReader(log)
+            assert reader.read_lines() == ["first", "second"]
+            assert reader.read_lines() == []
+            assert reader.offset == len(b"first\nsecond\n")
+            assert reader.pending == 3
+
+            with log_file.open("ab") as appender:
+                appender.write(b"rd\n")
+
+            assert reader.read_lines() == ["third"]
+            assert reader.offset == log_file.stat().st_size
+            assert reader.pending == 0
+
+    #  A line longer than a block, with a multibyte character split between blocks
+    def test_small_blocks(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_bytes("/Volumes/Café/movie.m4v\nnext\n".encode())
+
+        with log_file.open("rb") as log:
+            reader = TailReader(log, block_size=4)
+            lines = []
+            while _lines := reader.read_lines():
+                lines.extend(_lines)
+
+        assert lines == ["/Volumes/Café/movie.m4v", "next"]
+
+    #  Reading starts from wherever the file was positioned
+    def test_start_at_end(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_bytes(b"old\n")
+
+        with log_file.open("rb") as log:
+            log.seek(0, 2)
+            reader = TailReader(log)
+            with log_file.open("ab") as appender:
+                appender.write(b"new\n")
+            assert reader.read_lines() == ["new"]
+
+
+class TestFindFirstLineSince:
+    #  The first line at or after the time is found, along with any lines just
+    #  before it that have no timestamp
+    def test_find(self, tmp_path):
+        log_file = tmp_path / "1.log"
+        log_file.write_bytes(
+            b"2024-01-01 10:00:00 - a\n"
+            b"2024-01-01 10:30:00 - b\n"
+            b"continued\n"
+            b"2024-01-01 11:00:00 - c\n"
+            b"2024-01-01 11:30:00 - d\n"
+        )
+
+        with log_file.open("rb") as log:
+            offset = find_first_line_since(
+                log, datetime(2024, 1, 1, 10, 45), parse_line_timestamp
+            )
+            log.seek(offset)
+            assert log.readline() == b"continued\n"
+
+            assert (
+                find_first_line_since(log, datetime(2024, 1, 1), parse_line_timestamp)
+                == 0
+            )
+            assert find_first_line_since(
+                log, datetime(2024, 1, 2), parse_line_timestamp
+            ) == log_file.stat().st_size
@@ -0,0 +1,34 @@
+import logging
+
+from backblaze_status.utils import MultiLogger
+
+
+class TestMultiLogger:
+    #  Without a module, the message is tagged with the calling function
+    def test_caller_name(self, tmp_path):
+        multi_log = MultiLogger("TestCallerName", logfile_dir=str(tmp_path))
+
+        def process_line():
+            multi_log.log("a line")
+
+        process_line()
+        multi_log.log("given", module="elsewhere")
+        for handler in multi_log.logger.handlers:
+            handler.flush()
+
+        lines = (tmp_path / "TestCallerName.log").read_text().splitlines()
+        assert lines[0].endswith("<process_line> a line")
+        assert lines[1].endswith("<elsewhere> given")
+
+    #  Levels that aren't enabled are dropped before the message is looked at
+    def test_disabled_level(self, tmp_path):
+        multi_log = MultiLogger("TestDisabledLevel", logfile_dir=str(tmp_path))
+
+        class Unprintable:
+            def __str__(self):
+                raise AssertionError("formatted a disabled message")
+
+        multi_log.log(Unprintable(), level=logging.DEBUG)
+        for handler in multi_log.logger.handlers:
+            handler.flush()
+        assert (tmp_path / "TestDisabledLevel.log").read_text() == ""
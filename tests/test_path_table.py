@@ -0,0 +1,32 @@
+from backblaze_status.path_table import PathTable
+
+
+class TestPathTable:
+    #  Paths in the same directory share the directory, and get their own ids
+    def test_intern(self):
+        paths = PathTable()
+        first = paths.intern("/Volumes/CameraHDD/SecuritySpy/Patio/2024-02-01/a.m4v")
+        second = paths.intern("/Volumes/CameraHDD/SecuritySpy/Patio/2024-02-01/b.m4v")
+
+        assert first != second
+        assert paths.directory_count == 1
+        assert paths[first] == "/Volumes/CameraHDD/SecuritySpy/Patio/2024-02-01/a.m4v"
+        assert paths.name(second) == "b.m4v"
+
+    #  Interning the same path again returns the same id
+    def test_intern_is_idempotent(self):
+        paths = PathTable()
+        path_id = paths.intern("/Users/xev/file.txt")
+        assert paths.intern("/Users/xev/file.txt") == path_id
+        assert len(paths) == 1
+
+    #  Paths that haven't been interned aren't found
+    def test_find(self):
+        paths = PathTable()
+        path_id = paths.intern("/Users/xev/file.txt")
+
+        assert paths.find("/Users/xev/file.txt") == path_id
+        assert paths.find("/Users/xev/other.txt") is None
+        assert paths.find("/Users/other/file.txt") is None
+        assert "/Users/xev/file.txt" in paths
+        assert list(paths) == ["/Users/xev/file.txt"]
@@ -0,0 +1,33 @@
+import random
+
+from backblaze_status.prefix_sums import FenwickTree
+
+
+class TestFenwickTree:
+    #  Range sums agree with summing the values, however the tree was built
+    def test_range_sum(self):
+        values = [random.randrange(-50, 1000) for _ in range(300)]
+        appended = FenwickTree()
+        for value in values:
+            appended.append(value)
+        extended = FenwickTree(values[:7])
+        extended.extend(values[7:150])
+        extended.extend(values[150:])
+
+        assert appended._tree == extended._tree
+        for start, stop in [(0, 300), (0, 0), (5, 6), (17, 255), (128, 300), (299, 300)]:
+            assert extended.range_sum(start, stop) == sum(values[start:stop])
+
+    #  Changing a value changes every range that includes it
+    def test_add(self):
+        values = list(range(100))
+        tree = FenwickTree(values)
+        tree.add(40, -40)
+        values[40] = 0
+        assert tree.prefix(41) == sum(values[:41])
+        assert tree.range_sum(41, 100) == sum(values[41:])
+        assert tree.prefix(1000) == sum(values)
+
+        tree.clear()
+        assert len(tree) == 0
+        assert tree.prefix(10) == 0
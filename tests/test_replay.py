@@ -0,0 +1,67 @@
+import heapq
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backblaze_status.configuration import Configuration
+from backblaze_status.replay import _read_stream, run_replay
+
+FIXTURE = Path(__file__).parent / "bz_todo_20240202_0.dat"
+THROTTLE = " -  large  - throttle auto     11 - "
+
+
+def local_time(second: int) -> str:
+    return datetime(2024, 2, 2, 10, 0, second).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def utc_time(second: int) -> str:
+    moment = datetime(2024, 2, 2, 10, 0, second).astimezone(timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class TestReadStream:
+    #  Logs in local time and UTC are merged in the order the lines were written,
+    #  and a line without a timestamp stays after the line before it
+    def test_merge_order(self, tmp_path):
+        last_files = tmp_path / "last_files.log"
+        last_files.write_text(f"{local_time(1)} - first\n{local_time(3)} - fourth\n")
+        transmit = tmp_path / "transmit.log"
+        transmit.write_text(f"{utc_time(2)} - second\nthird\n")
+
+        merged = heapq.merge(
+            _read_stream("lastfilestransmitted", last_files, False, 0),
+            _read_stream("bztransmit", transmit, True, 1),
+        )
+        assert [
+            (name, line.rstrip().rsplit(" ", 1)[-1])
+            for _, _, _, name, line in merged
+        ] == [
+            ("lastfilestransmitted", "first"),
+            ("bztransmit", "second"),
+            ("bztransmit", "third"),
+            ("lastfilestransmitted", "fourth"),
+        ]
+
+
+class TestRunReplay:
+    #  The recorded lines go through the parsers, and the backfill window is put
+    #  back afterwards
+    def test_run_replay(self, tmp_path):
+        names = [line.split("\t")[5] for line in FIXTURE.read_text().splitlines()[:3]]
+        last_files = tmp_path / "last_files.log"
+        last_files.write_text(
+            "".join(
+                f"{local_time(second)}{THROTTLE}19780 kBits/sec -    81720 bytes"
+                f" - {name}\n"
+                for second, name in enumerate(names)
+            )
+        )
+        transmit = tmp_path / "transmit.log"
+        transmit.write_text(f"{utc_time(1)} - HttpClient::Post - status 200\n")
+
+        backfill_window = Configuration.backfill_window
+        result = run_replay(FIXTURE, last_files, transmit)
+
+        assert Configuration.backfill_window == backfill_window
+        assert result.lines == {"lastfilestransmitted": 3, "bztransmit": 1}
+        assert result.events["transmitting"] == 3
+        assert result.total_lines == 4
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from backblaze_status.rwlock import ReadWriteLock
+
+
+class TestReadWriteLock:
+    #  A thread can take the lock again, and a writer can also read
+    def test_recursive(self):
+        lock = ReadWriteLock()
+        lock.lockForWrite()
+        lock.lockForWrite()
+        lock.lockForRead()
+        lock.unlock()
+        lock.unlock()
+        lock.unlock()
+
+        lock.lockForRead()
+        lock.lockForRead()
+        lock.unlock()
+        lock.unlock()
+        with pytest.raises(RuntimeError):
+            lock.unlock()
+
+    #  A reader can't upgrade to a writer
+    def test_upgrade(self):
+        lock = ReadWriteLock()
+        lock.lockForRead()
+        with pytest.raises(RuntimeError):
+            lock.lockForWrite()
+        lock.unlock()
+
+    #  Readers share the lock, but a writer waits for them to finish
+    def test_writer_waits(self):
+        lock = ReadWriteLock()
+        lock.lockForRead()
+
+        reader_done = threading.Event()
+
+        def read():
+            lock.lockForRead()
+            lock.unlock()
+            reader_done.set()
+
+        threading.Thread(target=read).start()
+        assert reader_done.wait(5)
+
+        written = threading.Event()
+
+        def write():
+            lock.lockForWrite()
+            written.set()
+            lock.unlock()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        assert not written.wait(0.1)
+        lock.unlock()
+        writer.join(5)
+        assert written.is_set()
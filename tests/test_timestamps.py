@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from backblaze_status.timestamps import (
+    line_timestamp,
+    parse_timestamp,
+    parse_utc_timestamp,
+)
+
+
+class TestTimestamps:
+    #  Both log timestamp formats give the same result as strptime
+    def test_formats(self):
+        assert parse_timestamp("2024-02-02 10:11:12") == datetime.strptime(
+            "2024-02-02 10:11:12", "%Y-%m-%d %H:%M:%S"
+        )
+        assert parse_timestamp("20240202101112") == datetime.strptime(
+            "20240202101112", "%Y%m%d%H%M%S"
+        )
+
+    #  The timestamp is taken from the start of a line in either format
+    def test_line_timestamp(self):
+        assert line_timestamp("2024-02-02 10:11:12 - rest") == "2024-02-02 10:11:12"
+        assert line_timestamp("20240202101112 - rest") == "20240202101112"
+
+    #  UTC timestamps are converted to the local timezone
+    def test_utc(self):
+        expected = (
+            datetime(2024, 2, 2, 10, 11, 12)
+            .replace(tzinfo=timezone.utc)
+            .astimezone(tz=None)
+        )
+        assert parse_utc_timestamp("2024-02-02 10:11:12") == expected
+
+    #  Anything else is rejected, just like strptime
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_timestamp("2024/02/02 10:11:12")
+        with pytest.raises(ValueError):
+            parse_timestamp("2024-13-02 10:11:12")
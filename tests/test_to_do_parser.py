@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from backblaze_status import to_do_parser
+from backblaze_status.to_do_parser import parse_to_do_file
+
+FIXTURE = Path(__file__).parent / "bz_todo_20240202_0.dat"
+
+
+class TestParseToDoFile:
+    #  Every line of the fixture is read, in file order
+    def test_reads_whole_file(self):
+        entries = parse_to_do_file(FIXTURE)
+
+        lines = FIXTURE.read_text().splitlines()
+        assert len(entries) == len(lines)
+        assert entries.end == FIXTURE.stat().st_size
+
+        first_fields = lines[0].split("\t")
+        assert entries.names[0] == first_fields[5]
+        assert entries.sizes[0] == int(first_fields[4])
+
+    #  A line that hasn't been finished yet is left for the next read
+    def test_partial_line_is_not_read(self, tmp_path):
+        to_do_file = tmp_path / "bz_todo.dat"
+        to_do_file.write_bytes(
+            b"1\t+\t01\t02\t100\t/Volumes/a.m4v\n1\t+\t03\t04\t200\t/Volumes/b"
+        )
+
+        entries = parse_to_do_file(to_do_file)
+        assert entries.names == ["/Volumes/a.m4v"]
+        assert list(entries.sizes) == [100]
+
+        with to_do_file.open("ab") as appender:
+            appender.write(b".m4v\n")
+
+        entries = parse_to_do_file(to_do_file, entries.end)
+        assert entries.names == ["/Volumes/b.m4v"]
+        assert list(entries.sizes) == [200]
+        assert entries.end == to_do_file.stat().st_size
+
+    #  Reading from the end of the file returns nothing
+    def test_nothing_new(self, tmp_path):
+        to_do_file = tmp_path / "bz_todo.dat"
+        to_do_file.write_bytes(b"1\t+\t01\t02\t100\t/Volumes/a.m4v\n")
+
+        entries = parse_to_do_file(to_do_file, to_do_file.stat().st_size)
+        assert len(entries) == 0
+        assert entries.end == to_do_file.stat().st_size
+
+    #  The parallel parse splits the file on line boundaries and merges the
+    #  pieces back together in file order
+    def test_parallel_matches_serial(self, monkeypatch):
+        monkeypatch.setattr(to_do_parser, "MINIMUM_RANGE_SIZE", 1024)
+        monkeypatch.setattr(to_do_parser.os, "cpu_count", lambda: 4)
+
+        serial = parse_to_do_file(FIXTURE, parallel=False)
+        parallel = parse_to_do_file(FIXTURE, parallel=True)
+        assert parallel.names == serial.names
+        assert parallel.sizes == serial.sizes
+        assert parallel.end == serial.end
+
+    #  A range whose only file has an empty filename keeps the names and sizes
+    #  lined up
+    def test_parallel_empty_filename(self, tmp_path):
+        lines = [
+            b"1\t+\t01\t02\t5\t/x\n",
+            b"1\t+\t03\t04\t7\t\n",
+            b"1\t+\t05\t06\t9\t/y\n",
+        ]
+        to_do_file = tmp_path / "bz_todo.dat"
+        to_do_file.write_bytes(b"".join(lines))
+
+        ranges = []
+        start = 0
+        for line in lines:
+            ranges.append((start, start + len(line)))
+            start += len(line)
+
+        entries = to_do_parser.ToDoEntries()
+        to_do_parser._parse_parallel(str(to_do_file), ranges, entries)
+        assert entries.names == ["/x", "", "/y"]
+        assert list(entries.sizes) == [5, 7, 9]
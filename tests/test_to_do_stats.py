@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from backblaze_status.backup_file import BackupFile
+from backblaze_status.configuration import Configuration
+from backblaze_status.to_do_stats import RunTotals
+
+CHUNK_SIZE = Configuration.default_chunk_size
+
+
+class TestRunTotals:
+    #  Completed files are added up by kind
+    def test_add_file(self):
+        run_totals = RunTotals(1)
+        run_totals.add_file(BackupFile(Path("/a"), 100))
+        run_totals.add_file(BackupFile(Path("/b"), 200, is_deduped=True))
+
+        large_file = BackupFile(Path("/c"), 5 * CHUNK_SIZE, is_large_file=True)
+        large_file.add_deduped(0)
+        large_file.add_transmitted(1)
+        large_file.add_transmitted(2)
+        run_totals.add_file(large_file)
+
+        totals = run_totals.as_dict()
+        assert totals["completed_size"] == 300 + 5 * CHUNK_SIZE
+        assert totals["transmitted_file_count"] == 1
+        assert totals["transmitted_file_size"] == 100
+        assert totals["duplicate_file_count"] == 1
+        assert totals["duplicate_file_size"] == 200
+        assert totals["transmitted_chunk_count"] == 2
+        assert totals["transmitted_chunk_size"] == 2 * CHUNK_SIZE
+        assert totals["duplicate_chunk_count"] == 1
+        assert totals["completed_chunk_count"] == 3
+
+    #  Chunks added to a file after it is completed are counted once
+    def test_add_chunk(self):
+        run_totals = RunTotals(1)
+        large_file = BackupFile(Path("/c"), 5 * CHUNK_SIZE, is_large_file=True)
+        run_totals.add_file(large_file)
+        assert large_file.run_totals is run_totals
+
+        large_file.add_transmitted(3)
+        large_file.add_transmitted(3)
+        large_file.add_deduped(4)
+        large_file.add_deduped(4)
+        assert run_totals.transmitted_chunk_count == 1
+        assert run_totals.duplicate_chunk_count == 1
+        assert run_totals.completed_chunk_size == 2 * CHUNK_SIZE
+
+    #  A transmitted chunk that is then deduped is counted as deduped only
+    def test_transmitted_then_deduped(self):
+        run_totals = RunTotals(1)
+        large_file = BackupFile(Path("/c"), 5 * CHUNK_SIZE, is_large_file=True)
+        run_totals.add_file(large_file)
+
+        large_file.add_transmitted(1)
+        large_file.add_deduped(1)
+        large_file.add_transmitted(1)
+        assert run_totals.transmitted_chunk_count == 0
+        assert run_totals.duplicate_chunk_count == 1
+        assert run_totals.completed_chunk_count == 1
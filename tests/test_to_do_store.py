@@ -0,0 +1,94 @@
+import pytest
+
+from backblaze_status import to_do_store
+from backblaze_status.core import HeadlessBackupStatus, ToDoStore
+
+
+def to_do_line(number: int, prefix: str = "a") -> bytes:
+    return f"1\t+\t01\t02\t{100 + number}\t/Volumes/{prefix}{number:04}.m4v\n".encode()
+
+
+def to_do_lines(count: int, prefix: str = "a", start: int = 0) -> bytes:
+    return b"".join(to_do_line(number, prefix) for number in range(start, count))
+
+
+@pytest.fixture
+def to_do(tmp_path, monkeypatch):
+    """
+    A ToDoStore reading a to_do file in tmp_path, that records the offset each
+    read of the file starts at
+    """
+    offsets = []
+    parse_to_do_file = to_do_store.parse_to_do_file
+
+    def recording_parse(file_name, start=0, *args, **kwargs):
+        offsets.append(start)
+        return parse_to_do_file(file_name, start, *args, **kwargs)
+
+    monkeypatch.setattr(to_do_store, "parse_to_do_file", recording_parse)
+
+    store = ToDoStore(HeadlessBackupStatus(tmp_path / "checkpoints.json"))
+    store.BZ_DIR = str(tmp_path)
+    store.offsets = offsets
+    return store
+
+
+class TestReread:
+    #  Lines appended to the to_do file are read from where the last read ended
+    def test_append(self, tmp_path, to_do):
+        to_do_file = tmp_path / "bz_todo_20240202_0.dat"
+        to_do_file.write_bytes(to_do_lines(10))
+        to_do._read()
+        assert len(to_do) == 10
+
+        with to_do_file.open("ab") as appender:
+            appender.write(to_do_lines(15, start=10))
+        to_do._read(read_existing_file=True)
+
+        assert to_do.offsets == [0, len(to_do_lines(10))]
+        assert len(to_do) == 15
+        assert to_do["/Volumes/a0014.m4v"].file_size == 114
+
+    #  A file rewritten in place, the same size or bigger, is read again from the
+    #  start
+    @pytest.mark.parametrize("extra_lines", [0, 5])
+    def test_rewritten(self, tmp_path, to_do, extra_lines):
+        to_do_file = tmp_path / "bz_todo_20240202_0.dat"
+        to_do_file.write_bytes(to_do_lines(10))
+        inode = to_do_file.stat().st_ino
+        to_do._read()
+
+        with to_do_file.open("r+b") as rewriter:
+            rewriter.write(to_do_lines(10 + extra_lines, prefix="b"))
+        assert to_do_file.stat().st_ino == inode
+        to_do._read(read_existing_file=True)
+
+        assert to_do.offsets == [0, 0]
+        assert "/Volumes/b0000.m4v" in to_do._to_do_file_list
+
+    #  A truncated file is read again from the start
+    def test_truncated(self, tmp_path, to_do):
+        to_do_file = tmp_path / "bz_todo_20240202_0.dat"
+        to_do_file.write_bytes(to_do_lines(10))
+        to_do._read()
+
+        with to_do_file.open("r+b") as truncater:
+            truncater.truncate(len(to_do_lines(3)))
+        to_do._read(read_existing_file=True)
+
+        assert to_do.offsets == [0, 0]
+
+
+class TestEndOfRun:
+    #  Only the names of the completed files are kept once a run ends
+    def test_paths_dropped(self, tmp_path, to_do):
+        (tmp_path / "bz_todo_20240202_0.dat").write_bytes(to_do_lines(10))
+        to_do._read()
+        to_do.mark_completed("/Volumes/a0003.m4v")
+        assert len(to_do._paths) == 10
+
+        to_do._mark_backup_not_running()
+        assert list(to_do._paths) == ["/Volumes/a0003.m4v"]
+        assert len(to_do) == 0
+        assert to_do.completed_files[0].file_name.name == "a0003.m4v"
+        assert "/Volumes/a0003.m4v" in to_do._completed_file_list
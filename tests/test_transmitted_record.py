@@ -0,0 +1,46 @@
+from backblaze_status.transmitted_record import RecordKind, decode_line
+
+PREFIX = "2024-01-03 00:00:10 -  large  - throttle auto     11 - "
+
+
+class TestDecodeLine:
+    #  A file transmitted on its own, with hyphens in its name
+    def test_single(self):
+        record = decode_line(
+            PREFIX + "19780 kBits/sec - 10485760 bytes - /Volumes/a - b - c.m4v"
+        )
+        assert record.kind == RecordKind.SINGLE
+        assert record.timestamp == "2024-01-03 00:00:10"
+        assert record.file_name == "/Volumes/a - b - c.m4v"
+        assert record.rate == "19780 kBits/sec"
+        assert record.display_rate == "19,780 kBits/sec"
+        assert record.byte_count == 10485760
+
+    #  A chunk of a large file, which has a hex chunk number
+    def test_chunk(self):
+        record = decode_line(
+            PREFIX + "dedup - 10485760 bytes - Chunk 0001a of /Volumes/a.m4v"
+        )
+        assert record.kind == RecordKind.CHUNK
+        assert record.file_name == "/Volumes/a.m4v"
+        assert record.chunk_number == 0x1A
+        assert record.display_rate == "dedup"
+
+    #  The header and the members of a batch of small files
+    def test_batch(self):
+        header = decode_line(
+            PREFIX + "30985 kBits/sec -  6859241 bytes - Multiple small files "
+            "batched in one request, the 17 files are listed below:"
+        )
+        assert header.kind == RecordKind.BATCH_HEADER
+        assert header.byte_count == 6859241
+
+        member = decode_line("2024-01-01 19:42:53 -  - /Users/xev/lib - GLSL.dylib")
+        assert member.kind == RecordKind.BATCH_MEMBER
+        assert member.file_name == "/Users/xev/lib - GLSL.dylib"
+        assert member.rate == ""
+
+    #  Lines in any other format aren't decoded
+    def test_unrecognized(self):
+        assert decode_line("") is None
+        assert decode_line("2024-01-03 00:00:10 - only - three") is None
@@ -0,0 +1,43 @@
+from backblaze_status.update_bus import UpdateBus
+
+
+class TestUpdateBus:
+    #  Regions marked many times are updated once per flush
+    def test_coalesce(self):
+        bus = UpdateBus()
+        updates = []
+        bus.connect(UpdateBus.CHUNK_GRID, lambda: updates.append("grid"))
+        bus.connect(UpdateBus.PROGRESS, lambda: updates.append("progress"))
+
+        for _ in range(100):
+            bus.mark(UpdateBus.CHUNK_GRID)
+        bus.mark(UpdateBus.PROGRESS)
+        assert updates == []
+
+        bus.flush()
+        assert updates == ["grid", "progress"]
+        bus.flush()
+        assert updates == ["grid", "progress"]
+        assert bus.marked[UpdateBus.CHUNK_GRID] == 100
+        assert bus.dispatched[UpdateBus.CHUNK_GRID] == 1
+
+    #  A region marked by a callback is updated on the next flush
+    def test_mark_in_callback(self):
+        bus = UpdateBus()
+        updates = []
+        bus.connect(UpdateBus.PROGRESS, lambda: bus.mark(UpdateBus.RESULT_ROWS))
+        bus.connect(UpdateBus.RESULT_ROWS, lambda: updates.append("rows"))
+
+        bus.mark(UpdateBus.PROGRESS)
+        bus.flush()
+        assert updates == []
+        bus.flush()
+        assert updates == ["rows"]
+
+    #  Without Qt, marking a region updates it straight away
+    def test_immediate(self):
+        bus = UpdateBus(immediate=True)
+        updates = []
+        bus.connect(UpdateBus.PROGRESS, lambda: updates.append("progress"))
+        bus.mark(UpdateBus.PROGRESS)
+        assert updates == ["progress"]